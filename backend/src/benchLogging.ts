@@ -0,0 +1,109 @@
+import { EventEmitter } from 'events';
+import * as fs from 'fs';
+import * as os from 'os';
+import path from 'path';
+import winston from 'winston';
+import { ACCESS_LOG_SAMPLE_RATE, LogFormat, buildLogger, createAccessLog } from './utils/logger';
+
+// Benchmark: push the same request mix through the pretty (Morgan line into
+// three files) and compact (sampled JSON lines, batched) logging pipelines.
+// Usage: npm run bench:logging -- [requests] [sampleRate]
+
+const REQUESTS = parseInt(process.argv[2] || '100000');
+const SAMPLE_RATE = process.argv[3] !== undefined ? parseFloat(process.argv[3]) : ACCESS_LOG_SAMPLE_RATE;
+const CHUNK = 1000;
+const SETTLE_MS = 600;
+
+const USER_AGENT = 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36';
+
+interface Scenario {
+  name: string;
+  format: LogFormat;
+  // Returns a function that logs one finished request
+  setup: (logger: winston.Logger) => (status: number) => void;
+}
+
+const statusFor = (i: number) => (i % 100 === 0 ? 500 : i % 50 === 0 ? 404 : 200);
+
+const morganLine = (status: number) =>
+  `127.0.0.1 - - [${new Date().toUTCString()}] "GET /api/telescopes HTTP/1.1" ${status} 1532 "-" "${USER_AGENT}"`;
+
+// Drives the real access log middleware with a minimal request/response pair
+const structured = (sampleRate: number) => (logger: winston.Logger) => {
+  const middleware = createAccessLog(logger, sampleRate);
+  return (status: number) => {
+    const req: any = { method: 'GET', originalUrl: '/api/telescopes', ip: '127.0.0.1', get: () => USER_AGENT };
+    const res: any = Object.assign(new EventEmitter(), { statusCode: status, getHeader: () => '1532' });
+    middleware(req, res, () => undefined);
+    res.emit('finish');
+  };
+};
+
+const scenarios: Scenario[] = [
+  { name: 'pretty (morgan, 3 files)', format: 'pretty', setup: logger => status => logger.http(morganLine(status)) },
+  { name: 'compact (unsampled)', format: 'compact', setup: structured(1) },
+  { name: `compact (sample ${SAMPLE_RATE})`, format: 'compact', setup: structured(SAMPLE_RATE) }
+];
+
+const directorySize = (dir: string) =>
+  fs.readdirSync(dir).reduce((total, file) => total + fs.statSync(path.join(dir, file)).size, 0);
+
+// Time until the last byte reached disk: poll until the files stop growing
+const waitForDisk = async (dir: string): Promise<number> => {
+  let size = directorySize(dir);
+  let lastChange = Date.now();
+  while (Date.now() - lastChange < SETTLE_MS) {
+    await new Promise(resolve => setTimeout(resolve, 20));
+    const current = directorySize(dir);
+    if (current !== size) {
+      size = current;
+      lastChange = Date.now();
+    }
+  }
+  return lastChange;
+};
+
+const runScenario = async (scenario: Scenario) => {
+  const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'observatory-log-bench-'));
+  // http level, so the pretty pipeline really writes its Morgan lines
+  const logger = buildLogger({ format: scenario.format, logDir: dir, level: 'http' });
+  const logRequest = scenario.setup(logger);
+
+  const cpuBefore = process.cpuUsage();
+  const started = Date.now();
+  for (let i = 0; i < REQUESTS; i++) {
+    logRequest(statusFor(i));
+    // Yield like a server would between requests, so I/O can proceed
+    if (i % CHUNK === CHUNK - 1) await new Promise(resolve => setImmediate(resolve));
+  }
+  const issued = Date.now();
+  const finished = await waitForDisk(dir);
+  const cpu = process.cpuUsage(cpuBefore);
+
+  const result = {
+    scenario: scenario.name,
+    issueMs: issued - started,
+    totalMs: Math.max(finished, issued) - started,
+    cpuMs: Math.round((cpu.user + cpu.system) / 1000),
+    requestsPerSec: Math.round(REQUESTS / ((Math.max(finished, issued) - started) / 1000)),
+    files: fs.readdirSync(dir).length,
+    diskMB: Math.round((directorySize(dir) / 1024 / 1024) * 10) / 10
+  };
+
+  logger.close();
+  fs.rmSync(dir, { recursive: true, force: true });
+  return result;
+};
+
+const benchLogging = async () => {
+  console.log(`Logging ${REQUESTS} requests per scenario (98% 2xx, 1% 4xx, 1% 5xx)`);
+  const results: Awaited<ReturnType<typeof runScenario>>[] = [];
+  for (const scenario of scenarios) {
+    results.push(await runScenario(scenario));
+  }
+  console.table(results);
+  console.log('cpuMs includes the polling used to detect when writes finished');
+  process.exit(0);
+};
+
+benchLogging();
@@ -0,0 +1,145 @@
+import dotenv from 'dotenv';
+import { closeRedis, getRedis } from './utils/redis';
+import {
+  MemoryRateLimitStore,
+  RateLimitDecision,
+  RateLimitRule,
+  RateLimitStore,
+  RedisRateLimitStore
+} from './utils/rateLimitStore';
+
+// Check the Redis GCRA script against the in-process store, then time both.
+// Needs REDIS_URL pointing at a Redis-compatible server, e.g. the redis service
+// from docker-compose.yml: `python3 deploy.py bench ratelimit --redis`.
+// Usage: npm run bench:ratelimit -- [checks] [keys]
+
+dotenv.config();
+
+const CHECKS = parseInt(process.argv[2] || '20000');
+const KEYS = parseInt(process.argv[3] || '1000');
+const CONCURRENCY = 100;
+const READY_TIMEOUT_MS = 5000;
+// Scheduling and the Redis round trip both move "now" between two checks
+const TOLERANCE_MS = 60;
+
+const RULE: RateLimitRule = { windowMs: 2000, max: 5 };
+const INTERVAL_MS = RULE.windowMs / RULE.max;
+
+const sleep = (ms: number) => new Promise(resolve => setTimeout(resolve, ms));
+
+const near = (actual: number, expected: number) => Math.abs(actual - expected) <= TOLERANCE_MS;
+
+// The behaviour both stores must agree on: a burst of `max`, a refusal with the
+// right Retry-After, one more request once that has passed, and a full bucket
+// after a whole window
+const conformance = async (store: RateLimitStore, prefix: string): Promise<string[]> => {
+  const failures: string[] = [];
+  const key = `${prefix}:conformance`;
+  const expect = (ok: boolean, message: string) => {
+    if (!ok) failures.push(message);
+  };
+
+  for (let i = 0; i < RULE.max; i++) {
+    const decision = await store.consume(key, RULE);
+    expect(decision.allowed, `burst request ${i + 1} of ${RULE.max} was refused`);
+    expect(decision.remaining === RULE.max - 1 - i, `burst request ${i + 1}: remaining ${decision.remaining}, expected ${RULE.max - 1 - i}`);
+  }
+
+  const refused = await store.consume(key, RULE);
+  expect(!refused.allowed, 'request past the burst was allowed');
+  expect(near(refused.retryAfterMs, INTERVAL_MS), `retryAfterMs ${refused.retryAfterMs}, expected ~${INTERVAL_MS}`);
+  expect(near(refused.resetMs, RULE.windowMs), `resetMs ${refused.resetMs}, expected ~${RULE.windowMs}`);
+
+  await sleep(refused.retryAfterMs + TOLERANCE_MS);
+  const refilled = await store.consume(key, RULE);
+  expect(refilled.allowed, 'request after Retry-After was refused');
+  expect(refilled.remaining === 0, `after Retry-After: remaining ${refilled.remaining}, expected 0`);
+
+  await sleep(RULE.windowMs + TOLERANCE_MS);
+  const full = await store.consume(key, RULE);
+  expect(full.allowed && full.remaining === RULE.max - 1, `after a full window: remaining ${full.remaining}, expected ${RULE.max - 1}`);
+
+  return failures;
+};
+
+const throughput = async (store: RateLimitStore, prefix: string) => {
+  const rule: RateLimitRule = { windowMs: 60000, max: 100 };
+  const latencies: number[] = [];
+  let allowed = 0;
+  const started = Date.now();
+
+  for (let done = 0; done < CHECKS; done += CONCURRENCY) {
+    const batch = Array.from({ length: Math.min(CONCURRENCY, CHECKS - done) }, async (_, i) => {
+      const begun = process.hrtime.bigint();
+      const decision: RateLimitDecision = await store.consume(`${prefix}:${(done + i) % KEYS}`, rule);
+      latencies.push(Number(process.hrtime.bigint() - begun) / 1e6);
+      if (decision.allowed) allowed++;
+    });
+    await Promise.all(batch);
+  }
+
+  const elapsed = (Date.now() - started) / 1000;
+  latencies.sort((a, b) => a - b);
+  return {
+    checksPerSec: Math.round(CHECKS / elapsed),
+    p50Ms: Math.round(latencies[Math.floor(latencies.length * 0.5)] * 100) / 100,
+    p99Ms: Math.round(latencies[Math.floor(latencies.length * 0.99)] * 100) / 100,
+    allowed
+  };
+};
+
+const waitForRedis = async () => {
+  const redis = getRedis();
+  if (!redis) {
+    throw new Error('REDIS_URL is not set; start one with `docker-compose up -d redis` and use redis://localhost:6379');
+  }
+  if (redis.status === 'ready') return redis;
+  await new Promise<void>((resolve, reject) => {
+    const timer = setTimeout(() => reject(new Error(`Redis at ${process.env.REDIS_URL} not ready after ${READY_TIMEOUT_MS}ms`)), READY_TIMEOUT_MS);
+    redis.once('ready', () => {
+      clearTimeout(timer);
+      resolve();
+    });
+  });
+  return redis;
+};
+
+const benchRateLimit = async () => {
+  const prefix = `bench:${process.pid}:${Date.now()}`;
+  let failed = false;
+
+  try {
+    const redis = new RedisRateLimitStore(await waitForRedis(), new MemoryRateLimitStore(KEYS * 2));
+    const stores: RateLimitStore[] = [new MemoryRateLimitStore(KEYS * 2), redis];
+    const results: Record<string, any>[] = [];
+    for (const store of stores) {
+      const failures = await conformance(store, `${prefix}:${store.name}`);
+      for (const failure of failures) {
+        console.error(`${store.name}: ${failure}`);
+      }
+      failed = failed || failures.length > 0;
+      results.push({
+        store: store.name,
+        conformance: failures.length === 0 ? 'ok' : `${failures.length} failed`,
+        ...(await throughput(store, `${prefix}:${store.name}`))
+      });
+    }
+
+    // The Redis store quietly limits locally when a command fails, which would
+    // make everything above a second run of the memory store
+    if (redis.stats().fallbacks > 0) {
+      console.error('redis: some checks fell back to the local store; is the server reachable?');
+      failed = true;
+    }
+    console.log(`${CHECKS} checks over ${KEYS} keys, ${CONCURRENCY} in flight`);
+    console.table(results);
+  } catch (error: any) {
+    console.error(`Rate limit bench failed: ${error.message}`);
+    failed = true;
+  }
+
+  await closeRedis();
+  process.exit(failed ? 1 : 0);
+};
+
+benchRateLimit();
@@ -0,0 +1,91 @@
+import cluster, { Worker } from 'cluster';
+import os from 'os';
+import { createServer } from 'http';
+import dotenv from 'dotenv';
+import { setupMaster } from '@socket.io/sticky';
+import { setupPrimary } from '@socket.io/cluster-adapter';
+import logger from './utils/logger';
+import { serveClusterRateLimits } from './utils/rateLimitStore';
+
+dotenv.config();
+
+const PORT = process.env.PORT || 30001;
+const WORKERS = Math.max(1, parseInt(process.env.WEB_CONCURRENCY || String(os.cpus().length)));
+const RESTART_DELAY_MS = 1000;
+const SHUTDOWN_TIMEOUT_MS = 15000;
+
+// Multi-core entry point: the primary owns the port and hands each connection
+// to a worker, keeping a Socket.IO session on the worker that accepted it.
+// Workers run the normal API from index.ts.
+if (cluster.isPrimary) {
+  // Under ts-node the workers need the TypeScript loader too
+  if (__filename.endsWith('.ts')) {
+    cluster.setupPrimary({ execArgv: [...process.execArgv, '-r', 'ts-node/register'] });
+  }
+
+  const httpServer = createServer();
+  setupMaster(httpServer, { loadBalancingMethod: 'least-connection' });
+  setupPrimary();
+
+  // Without Redis the workers' rate limits are kept here, so a client gets the
+  // configured limit rather than one per worker
+  serveClusterRateLimits();
+  if (!process.env.REDIS_URL) {
+    logger.warn('REDIS_URL is not set: rate limits are shared by this host\'s workers only, ' +
+      'so every additional replica adds its own full allowance');
+  }
+
+  // One worker runs the one-off startup tasks (backfills, rollup rebuild)
+  const leaders = new Set<number>();
+  let shuttingDown = false;
+
+  const fork = (leader: boolean): Worker => {
+    const worker = cluster.fork({ CLUSTER_LEADER: leader ? 'true' : 'false' });
+    if (leader) leaders.add(worker.id);
+    return worker;
+  };
+
+  for (let i = 0; i < WORKERS; i++) {
+    fork(i === 0);
+  }
+
+  cluster.on('exit', (worker, code, signal) => {
+    const leader = leaders.delete(worker.id);
+    if (shuttingDown) {
+      if (Object.keys(cluster.workers || {}).length === 0) {
+        logger.info('All workers stopped.');
+        process.exit(0);
+      }
+      return;
+    }
+    logger.error('Cluster worker died, restarting', { pid: worker.process.pid, code, signal });
+    setTimeout(() => fork(leader), RESTART_DELAY_MS);
+  });
+
+  httpServer.listen(PORT, () => {
+    logger.info('Observatory Booking API cluster started', {
+      port: PORT,
+      workers: WORKERS,
+      primaryPid: process.pid
+    });
+  });
+
+  const shutdown = (signal: string) => {
+    if (shuttingDown) return;
+    shuttingDown = true;
+    logger.info(`Received ${signal}. Stopping cluster workers...`);
+    httpServer.close();
+    for (const worker of Object.values(cluster.workers || {})) {
+      worker?.process.kill('SIGTERM');
+    }
+    setTimeout(() => {
+      logger.error('Workers did not stop in time, forcefully shutting down');
+      process.exit(1);
+    }, SHUTDOWN_TIMEOUT_MS).unref();
+  };
+
+  process.on('SIGTERM', () => shutdown('SIGTERM'));
+  process.on('SIGINT', () => shutdown('SIGINT'));
+} else {
+  import('./index');
+}
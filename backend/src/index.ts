@@ -3,14 +3,17 @@ import cors from 'cors';
 import helmet from 'helmet';
 import dotenv from 'dotenv';
 import mongoose from 'mongoose';
-import rateLimit from 'express-rate-limit';
 import { createServer } from 'http';
 import { Server } from 'socket.io';
 import morgan from 'morgan';
+import cluster from 'cluster';
+import { setupWorker } from '@socket.io/sticky';
+import { createAdapter as createClusterAdapter } from '@socket.io/cluster-adapter';
+import { createAdapter as createRedisAdapter } from '@socket.io/redis-adapter';
 
 // Import utilities
-import logger, { logStream, logBusinessEvent } from './utils/logger';
-import { startMetricsLogging, collectMetrics, getMetricsHandler } from './utils/metrics';
+import logger, { logStream, logBusinessEvent, logFormat, accessLog } from './utils/logger';
+import { startMetricsLogging, collectMetrics, trackRequestContext, getMetricsHandler } from './utils/metrics';
 import { healthCheckHandler, detailedHealthHandler } from './utils/healthMonitor';
 
 // Import middleware
@@ -32,6 +35,10 @@ import monitoringRoutes from './routes/monitoring';
 import { authenticateToken } from './middleware/auth';
 import { errorHandler } from './middleware/errorHandler';
 import reminderService from './services/reminderService';
+import emailService from './services/emailService';
+import { backfillReservationSlots } from './models/Booking';
+import analyticsService from './services/analyticsService';
+import { closeRedis, createRedisConnection } from './utils/redis';
 
 dotenv.config();
 
@@ -50,10 +57,32 @@ const io = new Server(server, {
   }
 });
 
-// Enhanced rate limiting with different tiers
-const generalLimiter = createAdvancedRateLimit({ windowMs: 15 * 60 * 1000, max: 100 });
-const authLimiter = createAdvancedRateLimit({ windowMs: 15 * 60 * 1000, max: 20 });
-const apiLimiter = createAdvancedRateLimit({ windowMs: 15 * 60 * 1000, max: 200 });
+// Room broadcasts have to reach sockets held by other workers and replicas:
+// Redis pub/sub spans hosts, the cluster adapter only the workers of cluster.ts
+const pubClient = createRedisConnection('socket.io-pub');
+const subClient = createRedisConnection('socket.io-sub');
+if (pubClient && subClient) {
+  io.adapter(createRedisAdapter(pubClient, subClient));
+} else if (cluster.isWorker) {
+  io.adapter(createClusterAdapter());
+}
+
+// Under cluster.ts only one worker runs the one-off startup tasks
+const runStartupTasks = !cluster.isWorker || process.env.CLUSTER_LEADER === 'true';
+
+// Enhanced rate limiting with different tiers, one tier charged per request
+const rateLimiter = createAdvancedRateLimit({
+  tiers: [
+    { name: 'auth', paths: ['/api/auth'], windowMs: 15 * 60 * 1000, max: 20 },
+    {
+      name: 'api',
+      paths: ['/api/bookings', '/api/telescopes', '/api/users', '/api/admin', '/api/monitoring'],
+      windowMs: 15 * 60 * 1000,
+      max: 200
+    },
+    { name: 'general', windowMs: 15 * 60 * 1000, max: 100 }
+  ]
+});
 
 // Security and monitoring middleware
 app.use(helmet({
@@ -77,27 +106,28 @@ app.use(cors({
   credentials: true
 }));
 
-// Logging middleware
-app.use(morgan('combined', { stream: logStream }));
+// Logging middleware: sampled JSON access records in compact mode, Morgan otherwise
+app.use(logFormat === 'compact' ? accessLog : morgan('combined', { stream: logStream }));
 
 // Monitoring middleware
 app.use(healthCheck);
 app.use(collectMetrics);
 app.use(securityMonitor);
 app.use(apiVersioning);
-app.use(validateContentType);
+app.use(validateContentType(['application/json', 'application/x-www-form-urlencoded']));
 
-app.use(generalLimiter);
+app.use(rateLimiter);
 app.use(express.json({ limit: '10mb' }));
 app.use(express.urlencoded({ extended: true, limit: '10mb' }));
+app.use(trackRequestContext);
 
-// Routes with specific rate limiting
-app.use('/api/auth', authLimiter, authRoutes);
-app.use('/api/bookings', apiLimiter, authenticateToken, bookingRoutes);
-app.use('/api/telescopes', apiLimiter, telescopeRoutes);
-app.use('/api/users', apiLimiter, authenticateToken, userRoutes);
-app.use('/api/admin', apiLimiter, authenticateToken, adminRoutes);
-app.use('/api/monitoring', apiLimiter, monitoringRoutes);
+// Routes
+app.use('/api/auth', authRoutes);
+app.use('/api/bookings', authenticateToken, bookingRoutes);
+app.use('/api/telescopes', telescopeRoutes);
+app.use('/api/users', authenticateToken, userRoutes);
+app.use('/api/admin', authenticateToken, adminRoutes);
+app.use('/api/monitoring', monitoringRoutes);
 
 // Enhanced health check endpoints
 app.get('/api/health', healthCheckHandler);
@@ -136,8 +166,12 @@ app.get('/api/auth/health', (req, res) => {
 const gracefulShutdown = (signal: string) => {
   logger.info(`Received ${signal}. Starting graceful shutdown...`);
   
-  server.close(() => {
+  server.close(async () => {
     logger.info('HTTP server closed.');
+
+    const drained = await emailService.shutdown(5000);
+    logger.info(drained ? 'Email queue drained.' : 'Email queue not empty at shutdown.');
+    await closeRedis();
     
     mongoose.connection.close().then(() => {
       logger.info('MongoDB connection closed.');
@@ -196,6 +230,23 @@ const connectDB = async () => {
     const mongoURI = process.env.MONGODB_URI || 'mongodb://localhost:27017/observatory-booking';
     await mongoose.connect(mongoURI);
     logger.info('MongoDB connected successfully', { mongoURI: mongoURI.replace(/\/\/[^@]+@/, '//***@') });
+
+    if (!runStartupTasks) return;
+
+    const backfilled = await backfillReservationSlots();
+    if (backfilled > 0) {
+      logger.info('Backfilled booking slot reservations', { count: backfilled });
+    }
+
+    const rolledUp = await analyticsService.ensureRollups();
+    if (rolledUp > 0) {
+      logger.info('Built analytics rollups', { bookings: rolledUp });
+    }
+
+    const queued = await reminderService.backfillReminders();
+    if (queued > 0) {
+      logger.info('Queued reminders for existing bookings', { bookings: queued });
+    }
   } catch (error) {
     logger.error('MongoDB connection error:', error);
     process.exit(1);
@@ -219,6 +270,13 @@ connectDB().then(() => {
     environment: process.env.NODE_ENV || 'development'
   });
   
+  if (cluster.isWorker) {
+    // The primary in cluster.ts owns the port and passes connections over IPC
+    setupWorker(io);
+    logger.info('Cluster worker ready', { pid: process.pid, leader: runStartupTasks });
+    return;
+  }
+
   server.listen(PORT, () => {
     logger.info(`Observatory Booking API server started`, {
       port: PORT,
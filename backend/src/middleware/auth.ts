@@ -1,22 +1,43 @@
 import { Request, Response, NextFunction } from 'express';
 import jwt from 'jsonwebtoken';
-import { User } from '../models/User';
+import catalogCache from '../services/catalogCache';
 
 interface AuthRequest extends Request {
   user?: any;
+  tokenPayload?: any;
 }
 
+const bearerToken = (req: Request): string | undefined => {
+  const authHeader = req.headers['authorization'];
+  return authHeader && authHeader.split(' ')[1];
+};
+
+// Verified payload of the bearer token, or null. Verified once per request:
+// the rate limiter reads it before authenticateToken runs.
+export const verifiedToken = (req: AuthRequest): any => {
+  if (req.tokenPayload === undefined) {
+    const token = bearerToken(req);
+    try {
+      req.tokenPayload = token ? jwt.verify(token, process.env.JWT_SECRET || 'fallback-secret') : null;
+    } catch (error) {
+      req.tokenPayload = null;
+    }
+  }
+  return req.tokenPayload;
+};
+
 export const authenticateToken = async (req: AuthRequest, res: Response, next: NextFunction) => {
   try {
-    const authHeader = req.headers['authorization'];
-    const token = authHeader && authHeader.split(' ')[1];
-
-    if (!token) {
+    if (!bearerToken(req)) {
       return res.status(401).json({ error: 'Access token required' });
     }
 
-    const decoded = jwt.verify(token, process.env.JWT_SECRET || 'fallback-secret') as any;
-    const user = await User.findById(decoded.userId).select('-password');
+    const decoded = verifiedToken(req);
+    if (!decoded) {
+      return res.status(403).json({ error: 'Invalid or expired token' });
+    }
+
+    const user = await catalogCache.getUser(decoded.userId);
     
     if (!user) {
       return res.status(401).json({ error: 'Invalid token' });
@@ -1,6 +1,8 @@
 import { Request, Response, NextFunction } from 'express';
 import logger, { logPerformance, logSecurityEvent } from '../utils/logger';
-import rateLimit from 'express-rate-limit';
+import { registerMetricsSource } from '../utils/metrics';
+import { RateLimitDecision, RateLimitRule, getRateLimitStore } from '../utils/rateLimitStore';
+import { verifiedToken } from './auth';
 import { v4 as uuidv4 } from 'uuid';
 
 // Request tracking middleware
@@ -88,33 +90,84 @@ export const securityMonitor = (req: Request, res: Response, next: NextFunction)
   next();
 };
 
-// Enhanced rate limiting with different tiers
+// Rate limiting can be switched off for local benchmark runs, never in production
+const rateLimitDisabled = process.env.DISABLE_RATE_LIMIT === 'true' && process.env.NODE_ENV !== 'production';
+
+export interface RateLimitTier extends RateLimitRule {
+  name: string;
+  // Path prefixes the tier covers; the first tier without paths covers the rest
+  paths?: string[];
+}
+
+const rateLimitCounts = new Map<string, { allowed: number; limited: number }>();
+
+registerMetricsSource('rateLimit', () => ({
+  store: getRateLimitStore().name,
+  ...getRateLimitStore().stats(),
+  tiers: Object.fromEntries(rateLimitCounts)
+}));
+
+const matchesPath = (path: string, prefix: string) => path === prefix || path.startsWith(`${prefix}/`);
+
+// Authenticated clients get their own budget wherever they connect from;
+// anonymous ones share their IP's
+const clientKey = (req: Request): string => {
+  const token = verifiedToken(req);
+  return token?.userId ? `user:${token.userId}` : `ip:${req.ip || 'unknown'}`;
+};
+
+// Enhanced rate limiting with different tiers. Mounted once: each request is
+// charged to exactly one tier, picked by path, in the shared store.
 export const createAdvancedRateLimit = (options: {
-  windowMs: number;
-  max: number;
-  message?: string;
+  tiers: RateLimitTier[];
   keyGenerator?: (req: Request) => string;
 }) => {
-  return rateLimit({
-    windowMs: options.windowMs,
-    max: options.max,
-    message: options.message || 'Too many requests from this IP',
-    keyGenerator: options.keyGenerator || ((req) => req.ip || 'unknown'),
-    standardHeaders: true,
-    legacyHeaders: false,
-    handler: (req, res) => {
-      logSecurityEvent('rate_limit_exceeded', {
-        ip: req.ip,
-        url: req.url,
-        userAgent: req.get('User-Agent')
-      });
-      
-      res.status(429).json({
-        error: 'Too many requests',
-        retryAfter: Math.ceil(options.windowMs / 1000)
-      });
+  const keyGenerator = options.keyGenerator || clientKey;
+  const tierFor = (path: string) =>
+    options.tiers.find(tier => tier.paths?.some(prefix => matchesPath(path, prefix))) ||
+    options.tiers.find(tier => !tier.paths);
+  for (const tier of options.tiers) {
+    rateLimitCounts.set(tier.name, { allowed: 0, limited: 0 });
+  }
+
+  return async (req: Request, res: Response, next: NextFunction) => {
+    const tier = rateLimitDisabled ? undefined : tierFor(req.path);
+    if (!tier) return next();
+
+    let decision: RateLimitDecision;
+    try {
+      decision = await getRateLimitStore().consume(`${tier.name}:${keyGenerator(req)}`, tier);
+    } catch (error: any) {
+      logger.error('Rate limit check failed', { tier: tier.name, error: error.message });
+      return next();
     }
-  });
+
+    const counts = rateLimitCounts.get(tier.name)!;
+    res.setHeader('RateLimit-Policy', `${tier.max};w=${Math.ceil(tier.windowMs / 1000)}`);
+    res.setHeader('RateLimit-Limit', String(tier.max));
+    res.setHeader('RateLimit-Remaining', String(decision.remaining));
+    res.setHeader('RateLimit-Reset', String(Math.ceil(decision.resetMs / 1000)));
+
+    if (decision.allowed) {
+      counts.allowed++;
+      return next();
+    }
+
+    counts.limited++;
+    logSecurityEvent('rate_limit_exceeded', {
+      ip: req.ip,
+      url: req.url,
+      tier: tier.name,
+      userAgent: req.get('User-Agent')
+    });
+
+    const retryAfter = Math.ceil(decision.retryAfterMs / 1000);
+    res.setHeader('Retry-After', String(retryAfter));
+    res.status(429).json({
+      error: 'Too many requests',
+      retryAfter
+    });
+  };
 };
 
 // API versioning middleware
@@ -0,0 +1,141 @@
+import mongoose, { Document, Schema } from 'mongoose';
+
+export type RollupGranularity = 'hour' | 'day' | 'month';
+
+export const ROLLUP_GRANULARITIES: RollupGranularity[] = ['hour', 'day', 'month'];
+export const USAGE_STATUSES = ['confirmed', 'completed'];
+
+export interface IAnalyticsRollup extends Document {
+  granularity: RollupGranularity;
+  bucket: Date;
+  telescope: mongoose.Types.ObjectId;
+  total?: number;
+  statuses?: Record<string, number>;
+  usageCount?: number;
+  bookedHours?: number;
+  peakHours?: Record<string, number>;
+}
+
+// Counters for bookings created in one UTC hour/day/month on one telescope.
+// Counters are only ever $inc'ed, so missing fields read as zero.
+const analyticsRollupSchema = new Schema<IAnalyticsRollup>({
+  granularity: {
+    type: String,
+    enum: ROLLUP_GRANULARITIES,
+    required: true
+  },
+  bucket: {
+    type: Date,
+    required: true
+  },
+  telescope: {
+    type: Schema.Types.ObjectId,
+    ref: 'Telescope',
+    required: true
+  },
+  total: Number,
+  statuses: {
+    pending: Number,
+    confirmed: Number,
+    cancelled: Number,
+    completed: Number
+  },
+  usageCount: Number,
+  bookedHours: Number,
+  // Usage bookings by UTC start hour, keyed '0'..'23'
+  peakHours: Schema.Types.Mixed
+}, {
+  versionKey: false
+});
+
+analyticsRollupSchema.index({ granularity: 1, bucket: 1, telescope: 1 }, { unique: true });
+
+export const AnalyticsRollup = mongoose.model<IAnalyticsRollup>('AnalyticsRollup', analyticsRollupSchema);
+
+// The parts of a booking the rollups depend on
+export interface BookingFacts {
+  telescope: string;
+  status: string;
+  createdAt: Date;
+  startTime: Date;
+  endTime: Date;
+}
+
+export const bookingFacts = (booking: any): BookingFacts | null => {
+  if (!booking || !booking.telescope || !booking.status || !booking.createdAt || !booking.startTime || !booking.endTime) {
+    return null;
+  }
+  const telescope = booking.telescope._id || booking.telescope;
+  return {
+    telescope: String(telescope),
+    status: booking.status,
+    createdAt: new Date(booking.createdAt),
+    startTime: new Date(booking.startTime),
+    endTime: new Date(booking.endTime)
+  };
+};
+
+export const rollupBucket = (time: Date, granularity: RollupGranularity): Date => {
+  switch (granularity) {
+    case 'hour':
+      return new Date(Math.floor(time.getTime() / 3600000) * 3600000);
+    case 'day':
+      return new Date(Date.UTC(time.getUTCFullYear(), time.getUTCMonth(), time.getUTCDate()));
+    case 'month':
+      return new Date(Date.UTC(time.getUTCFullYear(), time.getUTCMonth(), 1));
+  }
+};
+
+export type RollupDeltas = Map<string, { granularity: RollupGranularity; bucket: Date; telescope: string; inc: Record<string, number> }>;
+
+// Add one booking's counters, multiplied by sign, into every granularity's bucket
+export const accumulateBooking = (deltas: RollupDeltas, facts: BookingFacts, sign: number): void => {
+  const counters: Record<string, number> = {
+    total: sign,
+    [`statuses.${facts.status}`]: sign
+  };
+  if (USAGE_STATUSES.includes(facts.status)) {
+    counters.usageCount = sign;
+    counters.bookedHours = sign * (facts.endTime.getTime() - facts.startTime.getTime()) / 3600000;
+    counters[`peakHours.${facts.startTime.getUTCHours()}`] = sign;
+  }
+
+  for (const granularity of ROLLUP_GRANULARITIES) {
+    const bucket = rollupBucket(facts.createdAt, granularity);
+    const key = `${granularity}:${bucket.getTime()}:${facts.telescope}`;
+    let delta = deltas.get(key);
+    if (!delta) {
+      delta = { granularity, bucket, telescope: facts.telescope, inc: {} };
+      deltas.set(key, delta);
+    }
+    for (const [field, value] of Object.entries(counters)) {
+      delta.inc[field] = (delta.inc[field] || 0) + value;
+    }
+  }
+};
+
+export const writeRollupDeltas = async (deltas: RollupDeltas): Promise<void> => {
+  const operations: any[] = [];
+  for (const { granularity, bucket, telescope, inc } of deltas.values()) {
+    const nonZero = Object.fromEntries(Object.entries(inc).filter(([, value]) => value !== 0));
+    if (Object.keys(nonZero).length === 0) continue;
+    operations.push({
+      updateOne: {
+        filter: { granularity, bucket, telescope },
+        update: { $inc: nonZero },
+        upsert: true
+      }
+    });
+  }
+  if (operations.length > 0) {
+    await AnalyticsRollup.bulkWrite(operations, { ordered: false });
+  }
+};
+
+// Move a booking's contribution from its old state to its new one; either side may be null
+export const applyBookingChange = async (before: BookingFacts | null, after: BookingFacts | null): Promise<void> => {
+  const deltas: RollupDeltas = new Map();
+  if (before) accumulateBooking(deltas, before, -1);
+  if (after) accumulateBooking(deltas, after, 1);
+  await writeRollupDeltas(deltas);
+};
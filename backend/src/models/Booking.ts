@@ -1,4 +1,6 @@
 import mongoose, { Document, Schema } from 'mongoose';
+import { applyBookingChange, bookingFacts } from './AnalyticsRollup';
+import { scheduleReminders } from './Reminder';
 
 export interface IBooking extends Document {
   _id: string;
@@ -11,6 +13,7 @@ export interface IBooking extends Document {
   notes?: string;
   reminderSent?: boolean;
   immediateReminderSent?: boolean;
+  slots?: Date[];
   createdAt: Date;
   updatedAt: Date;
 }
@@ -55,36 +58,190 @@ const bookingSchema = new Schema<IBooking>({
   immediateReminderSent: {
     type: Boolean,
     default: false
+  },
+  // Reservation buckets held by an active booking; unique per telescope
+  slots: {
+    type: [Date],
+    default: undefined,
+    select: false
   }
 }, {
-  timestamps: true
+  timestamps: true,
+  toJSON: {
+    transform: (_doc, ret) => {
+      delete ret.slots;
+      return ret;
+    }
+  }
 });
 
+export const ACTIVE_BOOKING_STATUSES = ['pending', 'confirmed'];
+export const RESERVATION_SLOT_MINUTES = 15;
+export const BOOKING_CONFLICT_MESSAGE = 'Time slot is already booked';
+
+// Bookings start and end on reservation slot boundaries. A booking ending
+// mid-slot would hold the whole slot and clash with one starting right after it.
+export const isReservationAligned = (time: Date): boolean =>
+  time.getTime() % (RESERVATION_SLOT_MINUTES * 60 * 1000) === 0;
+
+// Every reservation bucket touched by [startTime, endTime)
+export const reservationSlots = (startTime: Date, endTime: Date): Date[] => {
+  const slotMs = RESERVATION_SLOT_MINUTES * 60 * 1000;
+  const slots: Date[] = [];
+  const first = Math.floor(startTime.getTime() / slotMs) * slotMs;
+  for (let slot = first; slot < endTime.getTime(); slot += slotMs) {
+    slots.push(new Date(slot));
+  }
+  return slots;
+};
+
 // Index for efficient queries
 bookingSchema.index({ telescope: 1, startTime: 1, endTime: 1 });
-bookingSchema.index({ user: 1, createdAt: -1 });
-
-// Prevent overlapping bookings
-bookingSchema.pre('save', async function(next) {
-  if (this.isNew || this.isModified('startTime') || this.isModified('endTime')) {
-    const overlapping = await mongoose.model('Booking').findOne({
-      telescope: this.telescope,
-      _id: { $ne: this._id },
-      status: { $in: ['pending', 'confirmed'] },
-      $or: [
-        {
-          startTime: { $lt: this.endTime },
-          endTime: { $gt: this.startTime }
-        }
-      ]
-    });
-    
-    if (overlapping) {
-      const error = new Error('Time slot is already booked');
-      return next(error);
+// Keyset pagination walks (createdAt, _id); the _id suffix keeps ties in index order
+bookingSchema.index({ user: 1, createdAt: -1, _id: -1 });
+bookingSchema.index({ createdAt: -1, _id: -1 });
+bookingSchema.index({ status: 1, createdAt: -1, _id: -1 });
+
+// Prevent overlapping bookings: two active bookings can never hold the same
+// telescope/slot pair, so the insert itself is the conflict check
+bookingSchema.index(
+  { telescope: 1, slots: 1 },
+  { unique: true, partialFilterExpression: { slots: { $exists: true } } }
+);
+
+bookingSchema.pre('save', function(next) {
+  if (!ACTIVE_BOOKING_STATUSES.includes(this.status)) {
+    if (this.isNew || this.isModified('status')) {
+      // slots is usually not selected, so force the $unset
+      this.slots = undefined;
+      this.markModified('slots');
     }
+  } else if (this.isNew || this.isModified('startTime') || this.isModified('endTime') || this.isModified('status')) {
+    this.slots = reservationSlots(this.startTime, this.endTime);
   }
   next();
 });
 
+// Keep reservations, analytics rollups and reminders in step with status
+// changes made through findByIdAndUpdate
+bookingSchema.pre('findOneAndUpdate', async function() {
+  const update: any = this.getUpdate() || {};
+  const status = update.status ?? update.$set?.status;
+  if (!status) return;
+
+  const current = await this.model.findOne(this.getQuery())
+    .select('telescope status createdAt startTime endTime reminderSent immediateReminderSent')
+    .lean<IBooking>();
+  (this as any)._rollupChange = current && {
+    before: bookingFacts(current),
+    after: bookingFacts({ ...current, status })
+  };
+  (this as any)._reminderChange = current && reminderRequest({ ...current, status });
+
+  if (!ACTIVE_BOOKING_STATUSES.includes(status)) {
+    update.$unset = { ...update.$unset, slots: 1 };
+  } else if (current) {
+    update.$set = { ...update.$set, slots: reservationSlots(current.startTime, current.endTime) };
+  }
+  this.setUpdate(update);
+});
+
+// Remember each loaded booking's rollup-relevant state so a later save can
+// move its counters instead of recounting
+bookingSchema.post('init', function() {
+  this.$locals.rollupFacts = bookingFacts(this);
+});
+
+bookingSchema.pre('save', function(next) {
+  const tracked = this.isNew || ['status', 'telescope', 'startTime', 'endTime'].some(path => this.isModified(path));
+  this.$locals.rollupBefore = tracked ? (this.isNew ? null : this.$locals.rollupFacts || undefined) : undefined;
+  this.$locals.remindersChanged = this.isNew || this.isModified('status') || this.isModified('startTime');
+  next();
+});
+
+const reminderRequest = (booking: any) => ({
+  _id: booking._id,
+  startTime: booking.startTime,
+  active: ACTIVE_BOOKING_STATUSES.includes(booking.status),
+  sent: { daily: !!booking.reminderSent, immediate: !!booking.immediateReminderSent }
+});
+
+const recordReminderChange = async (request: ReturnType<typeof reminderRequest>) => {
+  try {
+    await scheduleReminders(request);
+  } catch (error) {
+    console.error(`Scheduling reminders for booking ${request._id} failed:`, error);
+  }
+};
+
+const recordRollupChange = async (before: any, after: any) => {
+  try {
+    await applyBookingChange(before, after);
+  } catch (error) {
+    // Rollups can be rebuilt from bookings, so never fail the write over them
+    console.error('Analytics rollup update failed:', error);
+  }
+};
+
+// Rollup and reminder writes run after the booking write has returned, off the
+// request path. Neither is load-bearing there: rollups are $inc deltas that
+// can be rebuilt from bookings, and the reminder sender re-checks each
+// booking's status before mailing, so a late or reordered write is harmless.
+bookingSchema.post('save', function(doc: IBooking) {
+  const before = doc.$locals.rollupBefore;
+  // undefined means untracked, or an existing booking loaded without these fields
+  if (before === undefined) return;
+  const after = bookingFacts(doc);
+  doc.$locals.rollupBefore = undefined;
+  doc.$locals.rollupFacts = after;
+  recordRollupChange(before, after);
+});
+
+bookingSchema.post('save', function(doc: IBooking) {
+  if (!doc.$locals.remindersChanged) return;
+  doc.$locals.remindersChanged = false;
+  recordReminderChange(reminderRequest(doc));
+});
+
+bookingSchema.post('findOneAndUpdate', function(doc: IBooking | null) {
+  const change = (this as any)._rollupChange;
+  if (!doc || !change) return;
+  recordRollupChange(change.before, change.after);
+  recordReminderChange((this as any)._reminderChange);
+});
+
+const translateSlotConflict = (error: any, _res: any, next: (err?: any) => void) => {
+  if (error && error.code === 11000 && error.keyPattern && error.keyPattern.slots) {
+    return next(new Error(BOOKING_CONFLICT_MESSAGE));
+  }
+  next(error);
+};
+
+bookingSchema.post('save', translateSlotConflict);
+bookingSchema.post('findOneAndUpdate', translateSlotConflict);
+
 export const Booking = mongoose.model<IBooking>('Booking', bookingSchema);
+
+// Give bookings created before slot reservations existed their slots
+export const backfillReservationSlots = async (): Promise<number> => {
+  let updated = 0;
+  const cursor = Booking.find({
+    status: { $in: ACTIVE_BOOKING_STATUSES },
+    endTime: { $gt: new Date() },
+    slots: { $exists: false }
+  }).select('startTime endTime').lean().cursor();
+
+  for await (const booking of cursor) {
+    try {
+      await Booking.updateOne(
+        { _id: booking._id },
+        { $set: { slots: reservationSlots(booking.startTime, booking.endTime) } }
+      );
+      updated++;
+    } catch (error: any) {
+      if (error.code !== 11000) throw error;
+      // Pre-existing overlap; leave it for an admin to resolve
+    }
+  }
+  return updated;
+};
@@ -0,0 +1,119 @@
+import mongoose, { Document, Schema } from 'mongoose';
+import moment from 'moment';
+
+export type ReminderKind = 'daily' | 'immediate';
+export type ReminderState = 'pending' | 'claimed' | 'sent' | 'failed' | 'expired' | 'cancelled';
+
+export interface IReminder extends Document {
+  booking: mongoose.Types.ObjectId;
+  kind: ReminderKind;
+  dueAt: Date;
+  expiresAt: Date;
+  state: ReminderState;
+  attempts: number;
+  claimToken?: string;
+  claimedAt?: Date;
+  sentAt?: Date;
+  lastError?: string;
+}
+
+const reminderSchema = new Schema<IReminder>({
+  booking: {
+    type: Schema.Types.ObjectId,
+    ref: 'Booking',
+    required: true
+  },
+  kind: {
+    type: String,
+    enum: ['daily', 'immediate'],
+    required: true
+  },
+  dueAt: {
+    type: Date,
+    required: true
+  },
+  // Reminders still unsent at this point are dropped rather than sent late
+  expiresAt: {
+    type: Date,
+    required: true
+  },
+  state: {
+    type: String,
+    enum: ['pending', 'claimed', 'sent', 'failed', 'expired', 'cancelled'],
+    default: 'pending'
+  },
+  attempts: {
+    type: Number,
+    default: 0
+  },
+  claimToken: String,
+  claimedAt: Date,
+  sentAt: Date,
+  lastError: String
+}, {
+  timestamps: true
+});
+
+// One reminder of each kind per booking
+reminderSchema.index({ booking: 1, kind: 1 }, { unique: true });
+// The scheduler's claim query: due reminders in a given state
+reminderSchema.index({ state: 1, dueAt: 1 });
+reminderSchema.index({ claimToken: 1 }, { sparse: true });
+
+export const Reminder = mongoose.model<IReminder>('Reminder', reminderSchema);
+
+const DAILY_REMINDER_HOUR = 10;
+const IMMEDIATE_REMINDER_MINUTES = 120;
+
+// Due and expiry times for each reminder a booking starting at startTime should get
+export const reminderTimes = (startTime: Date): { kind: ReminderKind; dueAt: Date; expiresAt: Date }[] => {
+  const start = moment(startTime);
+  const immediateDue = start.clone().subtract(IMMEDIATE_REMINDER_MINUTES, 'minutes');
+  return [
+    // 10 AM the day before, superseded once the immediate reminder is due
+    {
+      kind: 'daily',
+      dueAt: start.clone().subtract(1, 'day').startOf('day').hour(DAILY_REMINDER_HOUR).toDate(),
+      expiresAt: immediateDue.toDate()
+    },
+    { kind: 'immediate', dueAt: immediateDue.toDate(), expiresAt: start.toDate() }
+  ];
+};
+
+// Queue (or reschedule) reminders for an active booking, or cancel them
+// for one that is no longer active
+export const scheduleReminders = async (booking: { _id: any; startTime: Date; active: boolean; sent?: Partial<Record<ReminderKind, boolean>> }): Promise<void> => {
+  if (!booking.active) {
+    await Reminder.updateMany(
+      { booking: booking._id, state: { $in: ['pending', 'claimed', 'failed'] } },
+      { $set: { state: 'cancelled' }, $unset: { claimToken: 1 } }
+    );
+    return;
+  }
+
+  const now = Date.now();
+  const operations = reminderTimes(booking.startTime)
+    .filter(({ kind, expiresAt }) => expiresAt.getTime() > now && !booking.sent?.[kind])
+    .map(({ kind, dueAt, expiresAt }) => ({
+      updateOne: {
+        filter: { booking: booking._id, kind, state: { $ne: 'sent' } },
+        update: {
+          $set: { dueAt, expiresAt, state: 'pending', attempts: 0 },
+          $unset: { claimToken: 1, lastError: 1 }
+        },
+        upsert: true
+      }
+    }));
+  if (operations.length === 0) return;
+
+  try {
+    await Reminder.bulkWrite(operations, { ordered: false });
+  } catch (error: any) {
+    // A duplicate key here means the reminder was already sent; leave it
+    const writeErrors: any[] = [].concat(error.writeErrors || []);
+    const duplicatesOnly = error.code === 11000 || (writeErrors.length > 0 && writeErrors.every(e => e.code === 11000));
+    if (!duplicatesOnly) {
+      throw error;
+    }
+  }
+};
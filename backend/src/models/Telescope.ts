@@ -1,4 +1,5 @@
 import mongoose, { Document, Schema } from 'mongoose';
+import { RESERVATION_SLOT_MINUTES } from './Booking';
 
 export interface ITelescope extends Document {
   _id: string;
@@ -13,6 +14,11 @@ export interface ITelescope extends Document {
   location: string;
   isActive: boolean;
   maintenanceSchedule?: Date;
+  observingSchedule?: {
+    startHour: number;
+    slotMinutes: number;
+    slotCount: number;
+  };
   createdAt: Date;
   updatedAt: Date;
 }
@@ -41,7 +47,23 @@ const telescopeSchema = new Schema<ITelescope>({
     type: Boolean,
     default: true
   },
-  maintenanceSchedule: Date
+  maintenanceSchedule: Date,
+  // Bookable slots per night, starting at startHour local time
+  observingSchedule: {
+    startHour: { type: Number, min: 0, max: 23, default: 18 },
+    // Whole reservation slots, so every offered slot can be booked
+    slotMinutes: {
+      type: Number,
+      min: RESERVATION_SLOT_MINUTES,
+      max: 240,
+      default: 60,
+      validate: {
+        validator: (minutes: number) => minutes % RESERVATION_SLOT_MINUTES === 0,
+        message: `slotMinutes must be a multiple of ${RESERVATION_SLOT_MINUTES}`
+      }
+    },
+    slotCount: { type: Number, min: 1, max: 48, default: 12 }
+  }
 }, {
   timestamps: true
 });
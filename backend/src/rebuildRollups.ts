@@ -0,0 +1,25 @@
+import mongoose from 'mongoose';
+import dotenv from 'dotenv';
+import analyticsService from './services/analyticsService';
+
+dotenv.config();
+
+// Batch job: recount every analytics rollup from the bookings collection
+const rebuildRollups = async () => {
+  try {
+    const mongoURI = process.env.MONGODB_URI || 'mongodb://localhost:27017/observatory-booking';
+    await mongoose.connect(mongoURI);
+    console.log('Connected to MongoDB');
+
+    const started = Date.now();
+    const processed = await analyticsService.rebuildRollups();
+    console.log(`Rebuilt analytics rollups from ${processed} bookings in ${Date.now() - started}ms`);
+
+    process.exit(0);
+  } catch (error) {
+    console.error('Error rebuilding analytics rollups:', error);
+    process.exit(1);
+  }
+};
+
+rebuildRollups();
@@ -1,9 +1,11 @@
 import express from 'express';
 import { body, validationResult } from 'express-validator';
-import moment from 'moment';
-import { Booking } from '../models/Booking';
-import { Telescope } from '../models/Telescope';
-import { User } from '../models/User';
+import { Booking, BOOKING_CONFLICT_MESSAGE } from '../models/Booking';
+import availabilityService from '../services/availabilityService';
+import analyticsService from '../services/analyticsService';
+import dashboardStatsService from '../services/dashboardStatsService';
+import { EXPORT_FORMATS, exportHeaders, streamBookingExport } from '../services/exportService';
+import { afterCursor, cursorSort, decodeCursor, pageSize, toPage } from '../utils/pagination';
 
 const router = express.Router();
 
@@ -15,78 +17,26 @@ const requireAdmin = (req: any, res: any, next: any) => {
   next();
 };
 
-// Get dashboard statistics
+// Get dashboard statistics, from a snapshot refreshed every few seconds
 router.get('/stats', requireAdmin, async (req: any, res) => {
   try {
-    const today = moment().startOf('day');
-    const thisWeek = moment().startOf('week');
-    const thisMonth = moment().startOf('month');
-
-    const [
-      totalBookings,
-      todayBookings,
-      weekBookings,
-      monthBookings,
-      totalUsers,
-      activeUsers,
-      totalTelescopes,
-      activeTelescopes,
-      pendingBookings,
-      confirmedBookings,
-      recentBookings
-    ] = await Promise.all([
-      Booking.countDocuments(),
-      Booking.countDocuments({ 
-        createdAt: { $gte: today.toDate() } 
-      }),
-      Booking.countDocuments({ 
-        createdAt: { $gte: thisWeek.toDate() } 
-      }),
-      Booking.countDocuments({ 
-        createdAt: { $gte: thisMonth.toDate() } 
-      }),
-      User.countDocuments(),
-      User.countDocuments({ 
-        lastLoginAt: { $gte: moment().subtract(30, 'days').toDate() } 
-      }),
-      Telescope.countDocuments(),
-      Telescope.countDocuments({ isActive: true }),
-      Booking.countDocuments({ status: 'pending' }),
-      Booking.countDocuments({ status: 'confirmed' }),
-      Booking.find()
-        .populate('user', 'name email')
-        .populate('telescope', 'name location')
-        .sort({ createdAt: -1 })
-        .limit(10)
-    ]);
+    const snapshot = await dashboardStatsService.getSnapshot();
 
     res.json({
-      statistics: {
-        bookings: {
-          total: totalBookings,
-          today: todayBookings,
-          thisWeek: weekBookings,
-          thisMonth: monthBookings,
-          pending: pendingBookings,
-          confirmed: confirmedBookings
-        },
-        users: {
-          total: totalUsers,
-          active: activeUsers
-        },
-        telescopes: {
-          total: totalTelescopes,
-          active: activeTelescopes
-        }
-      },
-      recentBookings
+      statistics: snapshot.statistics,
+      recentBookings: snapshot.recentBookings,
+      snapshot: {
+        generatedAt: snapshot.generatedAt,
+        ageMs: dashboardStatsService.ageMs(snapshot)
+      }
     });
   } catch (error) {
     res.status(500).json({ error: 'Server error' });
   }
 });
 
-// Get all bookings with filters
+// Get all bookings with filters, a page at a time in creation order:
+// ?limit=N&cursor=<nextCursor from the previous page>&sortOrder=desc|asc
 router.get('/bookings', requireAdmin, async (req: any, res) => {
   try {
     const { 
@@ -94,9 +44,6 @@ router.get('/bookings', requireAdmin, async (req: any, res) => {
       telescope, 
       startDate, 
       endDate, 
-      page = 1, 
-      limit = 20,
-      sortBy = 'createdAt',
       sortOrder = 'desc'
     } = req.query;
 
@@ -110,28 +57,30 @@ router.get('/bookings', requireAdmin, async (req: any, res) => {
       if (endDate) filter.startTime.$lte = new Date(endDate);
     }
 
-    const skip = (parseInt(page) - 1) * parseInt(limit);
-    const sortOptions: any = {};
-    sortOptions[sortBy] = sortOrder === 'desc' ? -1 : 1;
+    const direction = sortOrder === 'asc' ? 1 : -1;
+    const limit = pageSize(req.query.limit);
+    if (req.query.cursor) {
+      const cursor = decodeCursor(String(req.query.cursor));
+      if (!cursor) {
+        return res.status(400).json({ error: 'Invalid cursor' });
+      }
+      Object.assign(filter, afterCursor(cursor, direction));
+    }
 
-    const [bookings, total] = await Promise.all([
-      Booking.find(filter)
-        .populate('user', 'name email')
-        .populate('telescope', 'name location')
-        .sort(sortOptions)
-        .skip(skip)
-        .limit(parseInt(limit)),
-      Booking.countDocuments(filter)
-    ]);
+    const rows = await Booking.find(filter, 'user telescope startTime endTime purpose status notes createdAt')
+      .sort(cursorSort(direction))
+      .limit(limit + 1)
+      .populate('user', 'name email')
+      .populate('telescope', 'name location')
+      .lean();
 
+    const { items, nextCursor } = toPage(rows, limit);
     res.json({
-      bookings,
+      bookings: items,
       pagination: {
-        current: parseInt(page),
-        pages: Math.ceil(total / parseInt(limit)),
-        total,
-        hasNext: skip + bookings.length < total,
-        hasPrev: parseInt(page) > 1
+        limit,
+        nextCursor,
+        hasNext: nextCursor !== null
       }
     });
   } catch (error) {
@@ -169,6 +118,8 @@ router.patch('/bookings/:id/status', requireAdmin, [
       return res.status(404).json({ error: 'Booking not found' });
     }
 
+    availabilityService.bookingChanged(booking);
+
     // Emit real-time update
     const io = req.app.get('io');
     io.to(`telescope-${booking.telescope._id}`).emit('booking-updated', booking);
@@ -178,192 +129,53 @@ router.patch('/bookings/:id/status', requireAdmin, [
       message: 'Booking status updated successfully',
       booking
     });
-  } catch (error) {
+  } catch (error: any) {
+    if (error.message === BOOKING_CONFLICT_MESSAGE) {
+      return res.status(400).json({ error: error.message });
+    }
     res.status(500).json({ error: 'Server error' });
   }
 });
 
-// Get booking analytics
+// Get booking analytics, served from pre-aggregated per-telescope rollups
 router.get('/analytics', requireAdmin, async (req: any, res) => {
   try {
     const { period = '30d' } = req.query;
-    
-    let startDate: moment.Moment;
-    let groupBy: string;
-    
-    switch (period) {
-      case '7d':
-        startDate = moment().subtract(7, 'days');
-        groupBy = '%Y-%m-%d';
-        break;
-      case '30d':
-        startDate = moment().subtract(30, 'days');
-        groupBy = '%Y-%m-%d';
-        break;
-      case '3m':
-        startDate = moment().subtract(3, 'months');
-        groupBy = '%Y-%m';
-        break;
-      case '1y':
-        startDate = moment().subtract(1, 'year');
-        groupBy = '%Y-%m';
-        break;
-      default:
-        startDate = moment().subtract(30, 'days');
-        groupBy = '%Y-%m-%d';
-    }
-
-    const [
-      bookingTrends,
-      statusBreakdown,
-      telescopeUsage,
-      peakHours
-    ] = await Promise.all([
-      // Booking trends over time
-      Booking.aggregate([
-        {
-          $match: {
-            createdAt: { $gte: startDate.toDate() }
-          }
-        },
-        {
-          $group: {
-            _id: { $dateToString: { format: groupBy, date: '$createdAt' } },
-            count: { $sum: 1 },
-            confirmed: {
-              $sum: { $cond: [{ $eq: ['$status', 'confirmed'] }, 1, 0] }
-            },
-            cancelled: {
-              $sum: { $cond: [{ $eq: ['$status', 'cancelled'] }, 1, 0] }
-            }
-          }
-        },
-        { $sort: { _id: 1 } }
-      ]),
 
-      // Status breakdown
-      Booking.aggregate([
-        {
-          $match: {
-            createdAt: { $gte: startDate.toDate() }
-          }
-        },
-        {
-          $group: {
-            _id: '$status',
-            count: { $sum: 1 }
-          }
-        }
-      ]),
-
-      // Telescope usage
-      Booking.aggregate([
-        {
-          $match: {
-            createdAt: { $gte: startDate.toDate() },
-            status: { $in: ['confirmed', 'completed'] }
-          }
-        },
-        {
-          $lookup: {
-            from: 'telescopes',
-            localField: 'telescope',
-            foreignField: '_id',
-            as: 'telescopeInfo'
-          }
-        },
-        {
-          $unwind: '$telescopeInfo'
-        },
-        {
-          $group: {
-            _id: '$telescope',
-            name: { $first: '$telescopeInfo.name' },
-            count: { $sum: 1 },
-            totalHours: {
-              $sum: {
-                $divide: [
-                  { $subtract: ['$endTime', '$startTime'] },
-                  1000 * 60 * 60
-                ]
-              }
-            }
-          }
-        },
-        { $sort: { count: -1 } }
-      ]),
-
-      // Peak usage hours
-      Booking.aggregate([
-        {
-          $match: {
-            createdAt: { $gte: startDate.toDate() },
-            status: { $in: ['confirmed', 'completed'] }
-          }
-        },
-        {
-          $group: {
-            _id: { $hour: '$startTime' },
-            count: { $sum: 1 }
-          }
-        },
-        { $sort: { _id: 1 } }
-      ])
-    ]);
+    const analytics = await analyticsService.getAnalytics(period);
 
     res.json({
       period,
-      analytics: {
-        bookingTrends,
-        statusBreakdown,
-        telescopeUsage,
-        peakHours
-      }
+      analytics
     });
   } catch (error) {
     res.status(500).json({ error: 'Server error' });
   }
 });
 
-// Export booking data
+// Export booking data as a stream: ?format=json|csv|ndjson&gzip=true
 router.get('/export', requireAdmin, async (req: any, res) => {
   try {
-    const { format = 'json', startDate, endDate } = req.query;
-    
+    const { format = 'json', startDate, endDate, gzip } = req.query;
+
+    if (!EXPORT_FORMATS.includes(format)) {
+      return res.status(400).json({ error: `Format must be one of: ${EXPORT_FORMATS.join(', ')}` });
+    }
+
     const filter: any = {};
     if (startDate) filter.createdAt = { $gte: new Date(startDate) };
     if (endDate) filter.createdAt = { ...filter.createdAt, $lte: new Date(endDate) };
 
-    const bookings = await Booking.find(filter)
-      .populate('user', 'name email')
-      .populate('telescope', 'name location')
-      .sort({ createdAt: -1 });
-
-    if (format === 'csv') {
-      const csv = [
-        'ID,User Name,User Email,Telescope,Location,Start Time,End Time,Purpose,Status,Created At',
-        ...bookings.map(booking => [
-          booking._id,
-          (booking.user as any).name,
-          (booking.user as any).email,
-          (booking.telescope as any).name,
-          (booking.telescope as any).location,
-          booking.startTime.toISOString(),
-          booking.endTime.toISOString(),
-          booking.purpose.replace(/,/g, ';'),
-          booking.status,
-          booking.createdAt.toISOString()
-        ].join(','))
-      ].join('\n');
-
-      res.setHeader('Content-Type', 'text/csv');
-      res.setHeader('Content-Disposition', 'attachment; filename=bookings.csv');
-      res.send(csv);
+    const compressed = gzip === 'true' || gzip === '1';
+    res.set(exportHeaders(format, compressed));
+    await streamBookingExport(res, filter, format, compressed);
+  } catch (error) {
+    if (res.headersSent) {
+      // The client already has a partial file; cut the connection so it is not mistaken for a complete one
+      res.destroy();
     } else {
-      res.json({ bookings });
+      res.status(500).json({ error: 'Server error' });
     }
-  } catch (error) {
-    res.status(500).json({ error: 'Server error' });
   }
 });
 
@@ -3,6 +3,7 @@ import bcrypt from 'bcryptjs';
 import jwt from 'jsonwebtoken';
 import { body, validationResult } from 'express-validator';
 import { User } from '../models/User';
+import catalogCache from '../services/catalogCache';
 
 const router = express.Router();
 
@@ -120,7 +121,7 @@ router.get('/verify', async (req, res) => {
     }
 
     const decoded = jwt.verify(token, process.env.JWT_SECRET || 'fallback-secret') as any;
-    const user = await User.findById(decoded.userId).select('-password');
+    const user = await catalogCache.getUser(decoded.userId);
 
     if (!user) {
       return res.status(401).json({ error: 'Invalid token' });
@@ -1,12 +1,21 @@
 import express from 'express';
+import mongoose from 'mongoose';
 import { body, validationResult } from 'express-validator';
 import moment from 'moment';
-import { Booking } from '../models/Booking';
-import { Telescope } from '../models/Telescope';
+import { Booking, BOOKING_CONFLICT_MESSAGE, RESERVATION_SLOT_MINUTES, isReservationAligned } from '../models/Booking';
 import emailService from '../services/emailService';
+import availabilityService from '../services/availabilityService';
+import catalogCache from '../services/catalogCache';
+import { afterCursor, cursorSort, decodeCursor, pageSize, toPage } from '../utils/pagination';
 
 const router = express.Router();
 
+const MAX_AVAILABILITY_DAYS = 31;
+
+// Night keys for ?date=YYYY-MM-DD&days=N, capped to a month
+const requestedNights = (date: string, days?: string) =>
+  availabilityService.nightKeys(date, Math.min(parseInt(days || '1') || 1, MAX_AVAILABILITY_DAYS));
+
 // Helper function to check for booking conflicts
 const checkBookingConflicts = async (
   telescopeId: string, 
@@ -33,14 +42,100 @@ const checkBookingConflicts = async (
   return await Booking.findOne(query);
 };
 
-// Get all bookings for a user
+// Fields shown in booking lists
+const LIST_FIELDS = 'telescope startTime endTime purpose status notes createdAt';
+
+// Get the user's bookings, newest first, a page at a time:
+// ?limit=N&cursor=<nextCursor from the previous page>
 router.get('/', async (req: any, res) => {
   try {
-    const bookings = await Booking.find({ user: req.user._id })
+    const limit = pageSize(req.query.limit);
+    const filter: any = { user: req.user._id };
+    if (req.query.cursor) {
+      const cursor = decodeCursor(String(req.query.cursor));
+      if (!cursor) {
+        return res.status(400).json({ error: 'Invalid cursor' });
+      }
+      Object.assign(filter, afterCursor(cursor));
+    }
+
+    const rows = await Booking.find(filter, LIST_FIELDS)
+      .sort(cursorSort())
+      .limit(limit + 1)
       .populate('telescope', 'name location')
-      .sort({ createdAt: -1 });
+      .lean();
 
-    res.json(bookings);
+    const { items, nextCursor } = toPage(rows, limit);
+    res.json({ bookings: items, nextCursor });
+  } catch (error) {
+    res.status(500).json({ error: 'Server error' });
+  }
+});
+
+// Batch availability for a date range and a set of telescopes, streamed as
+// NDJSON with one { telescope, night, slots } line per telescope-night
+router.get('/availability', async (req, res) => {
+  try {
+    const { from, to, telescopes } = req.query;
+
+    if (!from) {
+      return res.status(400).json({ error: 'From date parameter required' });
+    }
+
+    const start = moment(from as string, 'YYYY-MM-DD', true);
+    const end = to ? moment(to as string, 'YYYY-MM-DD', true) : start.clone();
+    if (!start.isValid() || !end.isValid() || end.isBefore(start)) {
+      return res.status(400).json({ error: 'Invalid date range' });
+    }
+
+    const days = end.diff(start, 'days') + 1;
+    if (days > MAX_AVAILABILITY_DAYS) {
+      return res.status(400).json({ error: `Date range cannot exceed ${MAX_AVAILABILITY_DAYS} days` });
+    }
+
+    let telescopeIds: string[];
+    if (telescopes) {
+      telescopeIds = String(telescopes).split(',').map(id => id.trim()).filter(Boolean);
+      if (telescopeIds.length === 0 || !telescopeIds.every(id => mongoose.isValidObjectId(id))) {
+        return res.status(400).json({ error: 'Invalid telescope IDs' });
+      }
+    } else {
+      telescopeIds = await availabilityService.activeTelescopeIds();
+    }
+
+    const entries = availabilityService.streamAvailability(
+      telescopeIds,
+      availabilityService.nightKeys(start.format('YYYY-MM-DD'), days)
+    );
+
+    // Pull the first entry before committing to a 200, so a failed range query still gets a 500
+    let next = await entries.next();
+    res.status(200).type('application/x-ndjson');
+    while (!next.done) {
+      res.write(JSON.stringify(next.value) + '\n');
+      next = await entries.next();
+    }
+    res.end();
+  } catch (error) {
+    if (res.headersSent) {
+      res.end(JSON.stringify({ error: 'Server error' }) + '\n');
+    } else {
+      res.status(500).json({ error: 'Server error' });
+    }
+  }
+});
+
+// Get available time slots for every active telescope
+router.get('/available', async (req, res) => {
+  try {
+    const { date, days } = req.query;
+
+    if (!date) {
+      return res.status(400).json({ error: 'Date parameter required' });
+    }
+
+    const nights = requestedNights(date as string, days as string);
+    res.json(await availabilityService.getAvailabilityForAll(nights));
   } catch (error) {
     res.status(500).json({ error: 'Server error' });
   }
@@ -50,57 +145,27 @@ router.get('/', async (req: any, res) => {
 router.get('/available/:telescopeId', async (req, res) => {
   try {
     const { telescopeId } = req.params;
-    const { date } = req.query;
+    const { date, days } = req.query;
 
     if (!date) {
       return res.status(400).json({ error: 'Date parameter required' });
     }
 
-    const startOfDay = moment(date as string).startOf('day').toDate();
-    const endOfDay = moment(date as string).endOf('day').toDate();
-
-    // Get existing bookings for the day
-    const existingBookings = await Booking.find({
-      telescope: telescopeId,
-      status: { $in: ['pending', 'confirmed'] },
-      startTime: { $gte: startOfDay, $lte: endOfDay }
-    }).sort({ startTime: 1 });
-
-    // Generate available slots (assuming 1-hour slots from 6 PM to 6 AM)
-    const availableSlots = [];
-    const timeSlots = [
-      '18:00', '19:00', '20:00', '21:00', '22:00', '23:00',
-      '00:00', '01:00', '02:00', '03:00', '04:00', '05:00'
-    ];
-
-    for (const time of timeSlots) {
-      const slotStart = moment(date as string).set({
-        hour: parseInt(time.split(':')[0]),
-        minute: parseInt(time.split(':')[1]),
-        second: 0
-      });
-
-      // If it's past midnight, add a day
-      if (parseInt(time.split(':')[0]) < 12) {
-        slotStart.add(1, 'day');
+    if (days) {
+      const nights = requestedNights(date as string, days as string);
+      const availability = await availabilityService.getAvailability([telescopeId], nights);
+      if (!availability[telescopeId]) {
+        return res.status(404).json({ error: 'Telescope not found' });
       }
+      return res.json(availability[telescopeId]);
+    }
 
-      const slotEnd = slotStart.clone().add(1, 'hour');
-
-      // Check if slot conflicts with existing booking
-      const isBooked = existingBookings.some(booking => {
-        const bookingStart = moment(booking.startTime);
-        const bookingEnd = moment(booking.endTime);
-        return slotStart.isBefore(bookingEnd) && slotEnd.isAfter(bookingStart);
-      });
-
-      if (!isBooked && slotStart.isAfter(moment())) {
-        availableSlots.push({
-          startTime: slotStart.toISOString(),
-          endTime: slotEnd.toISOString(),
-          display: slotStart.format('HH:mm') + ' - ' + slotEnd.format('HH:mm')
-        });
-      }
+    const availableSlots = await availabilityService.getAvailabilityForTelescope(
+      telescopeId,
+      moment(date as string).format('YYYY-MM-DD')
+    );
+    if (!availableSlots) {
+      return res.status(404).json({ error: 'Telescope not found' });
     }
 
     res.json(availableSlots);
@@ -132,36 +197,24 @@ router.post('/', [
       return res.status(400).json({ error: 'End time must be after start time' });
     }
 
+    if (!isReservationAligned(start.toDate()) || !isReservationAligned(end.toDate())) {
+      return res.status(400).json({
+        error: `Start and end times must be on ${RESERVATION_SLOT_MINUTES}-minute boundaries`
+      });
+    }
+
     if (start.isSameOrBefore(moment())) {
       return res.status(400).json({ error: 'Cannot book past time slots' });
     }
 
     // Check if telescope exists and is active
-    const telescopeDoc = await Telescope.findById(telescope);
+    const telescopeDoc = await catalogCache.getTelescope(telescope);
     if (!telescopeDoc || !telescopeDoc.isActive) {
       return res.status(400).json({ error: 'Telescope not available' });
     }
 
-    // Check for time slot conflicts using helper function
-    const conflictingBooking = await checkBookingConflicts(
-      telescope,
-      start.toDate(),
-      end.toDate()
-    );
-
-    if (conflictingBooking) {
-      return res.status(400).json({ 
-        error: 'Time slot is already booked',
-        conflictingBooking: {
-          id: conflictingBooking._id,
-          startTime: conflictingBooking.startTime,
-          endTime: conflictingBooking.endTime,
-          status: conflictingBooking.status
-        }
-      });
-    }
-
-    // Auto-confirm booking since there are no conflicts
+    // Auto-confirm booking; the unique slot reservation index rejects the
+    // insert atomically if another active booking overlaps
     const booking = new Booking({
       user: req.user._id,
       telescope,
@@ -169,18 +222,45 @@ router.post('/', [
       endTime: end.toDate(),
       purpose,
       notes,
-      status: 'confirmed' // Auto-confirm when no conflicts
+      status: 'confirmed'
     });
 
-    await booking.save();
+    try {
+      await booking.save();
+    } catch (saveError: any) {
+      if (saveError.message !== BOOKING_CONFLICT_MESSAGE) {
+        throw saveError;
+      }
+
+      // Only the losing request pays for looking up what it collided with
+      const conflictingBooking = await checkBookingConflicts(
+        telescope,
+        start.toDate(),
+        end.toDate()
+      );
+
+      return res.status(400).json({
+        error: BOOKING_CONFLICT_MESSAGE,
+        ...(conflictingBooking && {
+          conflictingBooking: {
+            id: conflictingBooking._id,
+            startTime: conflictingBooking.startTime,
+            endTime: conflictingBooking.endTime,
+            status: conflictingBooking.status
+          }
+        })
+      });
+    }
     
+    availabilityService.bookingChanged(booking);
+
     // Populate telescope and user data for emails
     await booking.populate([
       { path: 'telescope', select: 'name location' },
       { path: 'user', select: 'name email' }
     ]);
 
-    // Send email notifications
+    // Queue email notifications; delivery happens off the request path
     try {
       await emailService.sendBookingConfirmation(booking);
       await emailService.sendAdminNotification(booking, 'created');
@@ -202,7 +282,7 @@ router.post('/', [
       booking
     });
   } catch (error: any) {
-    if (error.message === 'Time slot is already booked') {
+    if (error.message === BOOKING_CONFLICT_MESSAGE) {
       return res.status(400).json({ error: error.message });
     }
     res.status(500).json({ error: 'Server error' });
@@ -233,6 +313,8 @@ router.patch('/:id/status', async (req: any, res) => {
       return res.status(404).json({ error: 'Booking not found' });
     }
 
+    availabilityService.bookingChanged(booking);
+
     // Emit real-time update
     const io = req.app.get('io');
     io.to(`telescope-${booking.telescope._id}`).emit('booking-updated', booking);
@@ -241,7 +323,10 @@ router.patch('/:id/status', async (req: any, res) => {
       message: 'Booking status updated',
       booking
     });
-  } catch (error) {
+  } catch (error: any) {
+    if (error.message === BOOKING_CONFLICT_MESSAGE) {
+      return res.status(400).json({ error: error.message });
+    }
     res.status(500).json({ error: 'Server error' });
   }
 });
@@ -274,6 +359,7 @@ router.delete('/:id', async (req: any, res) => {
 
     booking.status = 'cancelled';
     await booking.save();
+    availabilityService.bookingChanged(booking);
 
     // Populate booking data for email
     await booking.populate([
@@ -281,7 +367,7 @@ router.delete('/:id', async (req: any, res) => {
       { path: 'user', select: 'name email' }
     ]);
 
-    // Send cancellation email
+    // Queue cancellation emails
     try {
       await emailService.sendBookingCancellation(booking);
       await emailService.sendAdminNotification(booking, 'cancelled');
@@ -2,13 +2,15 @@ import express from 'express';
 import { Telescope } from '../models/Telescope';
 import { Booking } from '../models/Booking';
 import { requireAdmin } from '../middleware/auth';
+import availabilityService from '../services/availabilityService';
+import catalogCache from '../services/catalogCache';
 
 const router = express.Router();
 
 // Get all telescopes
 router.get('/', async (req, res) => {
   try {
-    const telescopes = await Telescope.find({ isActive: true });
+    const telescopes = await catalogCache.getActiveTelescopes();
     res.json(telescopes);
   } catch (error) {
     res.status(500).json({ error: 'Server error' });
@@ -18,7 +20,7 @@ router.get('/', async (req, res) => {
 // Get telescope by ID with booking status
 router.get('/:id', async (req, res) => {
   try {
-    const telescope = await Telescope.findById(req.params.id);
+    const telescope = await catalogCache.getTelescope(req.params.id);
     
     if (!telescope) {
       return res.status(404).json({ error: 'Telescope not found' });
@@ -46,6 +48,7 @@ router.post('/', requireAdmin, async (req: any, res) => {
   try {
     const telescope = new Telescope(req.body);
     await telescope.save();
+    await catalogCache.invalidateTelescope();
     
     res.status(201).json({
       message: 'Telescope created successfully',
@@ -69,6 +72,9 @@ router.put('/:id', requireAdmin, async (req: any, res) => {
       return res.status(404).json({ error: 'Telescope not found' });
     }
 
+    availabilityService.invalidateTelescope(req.params.id);
+    await catalogCache.invalidateTelescope(req.params.id);
+
     res.json({
       message: 'Telescope updated successfully',
       telescope
@@ -91,6 +97,9 @@ router.delete('/:id', requireAdmin, async (req: any, res) => {
       return res.status(404).json({ error: 'Telescope not found' });
     }
 
+    availabilityService.invalidateTelescope(req.params.id);
+    await catalogCache.invalidateTelescope(req.params.id);
+
     res.json({
       message: 'Telescope deactivated successfully',
       telescope
@@ -1,5 +1,6 @@
 import express from 'express';
 import { User } from '../models/User';
+import catalogCache from '../services/catalogCache';
 
 const router = express.Router();
 
@@ -24,6 +25,8 @@ router.put('/profile', async (req: any, res) => {
       { new: true, runValidators: true }
     ).select('-password');
 
+    await catalogCache.invalidateUser(req.user._id);
+
     res.json({
       message: 'Profile updated successfully',
       user
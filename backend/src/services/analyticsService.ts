@@ -0,0 +1,159 @@
+import moment from 'moment';
+import { Booking } from '../models/Booking';
+import { Telescope } from '../models/Telescope';
+import {
+  AnalyticsRollup,
+  IAnalyticsRollup,
+  RollupDeltas,
+  RollupGranularity,
+  accumulateBooking,
+  bookingFacts,
+  writeRollupDeltas
+} from '../models/AnalyticsRollup';
+
+interface PeriodSpec {
+  amount: number;
+  unit: 'days' | 'months' | 'year';
+  trendUnit: 'day' | 'month';
+}
+
+const PERIODS: Record<string, PeriodSpec> = {
+  '7d': { amount: 7, unit: 'days', trendUnit: 'day' },
+  '30d': { amount: 30, unit: 'days', trendUnit: 'day' },
+  '3m': { amount: 3, unit: 'months', trendUnit: 'month' },
+  '1y': { amount: 1, unit: 'year', trendUnit: 'month' }
+};
+const DEFAULT_PERIOD = '30d';
+const TREND_FORMATS = { day: 'YYYY-MM-DD', month: 'YYYY-MM' };
+const REBUILD_FLUSH_SIZE = 5000;
+
+const round = (value: number, places = 2) => Math.round(value * 10 ** places) / 10 ** places;
+
+// Next boundary of unit at or after time, in UTC
+const ceilUtc = (time: moment.Moment, unit: 'day' | 'month') => {
+  const floor = time.clone().utc().startOf(unit);
+  return floor.isSame(time) ? floor : floor.add(1, unit);
+};
+
+class AnalyticsService {
+  // Cover [start, now) with the coarsest rollups that fit: hourly up to the
+  // first day boundary, daily up to the first month boundary (for monthly
+  // trends), then the trend granularity itself
+  private async loadRollups(start: moment.Moment, trendUnit: 'day' | 'month'): Promise<IAnalyticsRollup[]> {
+    const from = start.clone().utc().startOf('hour');
+    const dayBoundary = ceilUtc(from, 'day');
+    const segments: { granularity: RollupGranularity; from: moment.Moment; to?: moment.Moment }[] = [
+      { granularity: 'hour', from, to: dayBoundary }
+    ];
+    if (trendUnit === 'day') {
+      segments.push({ granularity: 'day', from: dayBoundary });
+    } else {
+      const monthBoundary = ceilUtc(dayBoundary, 'month');
+      segments.push({ granularity: 'day', from: dayBoundary, to: monthBoundary });
+      segments.push({ granularity: 'month', from: monthBoundary });
+    }
+
+    const results = await Promise.all(segments.map(({ granularity, from: segmentFrom, to }) =>
+      AnalyticsRollup.find({
+        granularity,
+        bucket: { $gte: segmentFrom.toDate(), ...(to && { $lt: to.toDate() }) }
+      }).lean<IAnalyticsRollup[]>()
+    ));
+    return results.flat();
+  }
+
+  async getAnalytics(period: string) {
+    const spec = PERIODS[period] || PERIODS[DEFAULT_PERIOD];
+    const start = moment().subtract(spec.amount, spec.unit);
+    const rollups = await this.loadRollups(start, spec.trendUnit);
+
+    const trends = new Map<string, { _id: string; count: number; confirmed: number; cancelled: number }>();
+    const statuses = new Map<string, number>();
+    const usage = new Map<string, { count: number; totalHours: number }>();
+    const hours = new Map<number, number>();
+
+    for (const rollup of rollups) {
+      const key = moment.utc(rollup.bucket).format(TREND_FORMATS[spec.trendUnit]);
+      const trend = trends.get(key) || { _id: key, count: 0, confirmed: 0, cancelled: 0 };
+      trend.count += rollup.total || 0;
+      trend.confirmed += rollup.statuses?.confirmed || 0;
+      trend.cancelled += rollup.statuses?.cancelled || 0;
+      trends.set(key, trend);
+
+      for (const [status, count] of Object.entries(rollup.statuses || {})) {
+        statuses.set(status, (statuses.get(status) || 0) + (count || 0));
+      }
+
+      if (rollup.usageCount) {
+        const telescope = String(rollup.telescope);
+        const entry = usage.get(telescope) || { count: 0, totalHours: 0 };
+        entry.count += rollup.usageCount;
+        entry.totalHours += rollup.bookedHours || 0;
+        usage.set(telescope, entry);
+      }
+
+      for (const [hour, count] of Object.entries(rollup.peakHours || {})) {
+        hours.set(Number(hour), (hours.get(Number(hour)) || 0) + count);
+      }
+    }
+
+    const telescopes = await Telescope.find({ _id: { $in: Array.from(usage.keys()) } }).select('name').lean();
+    const names = new Map(telescopes.map(t => [String(t._id), t.name]));
+
+    return {
+      bookingTrends: Array.from(trends.values())
+        .filter(trend => trend.count > 0)
+        .sort((a, b) => a._id.localeCompare(b._id)),
+      statusBreakdown: Array.from(statuses.entries())
+        .filter(([, count]) => count > 0)
+        .map(([status, count]) => ({ _id: status, count })),
+      // Like the old $lookup/$unwind, telescopes that no longer exist are left out
+      telescopeUsage: Array.from(usage.entries())
+        .filter(([id, entry]) => names.has(id) && entry.count > 0)
+        .map(([id, entry]) => ({ _id: id, name: names.get(id), count: entry.count, totalHours: round(entry.totalHours) }))
+        .sort((a, b) => b.count - a.count),
+      peakHours: Array.from(hours.entries())
+        .filter(([, count]) => count > 0)
+        .map(([hour, count]) => ({ _id: hour, count }))
+        .sort((a, b) => a._id - b._id)
+    };
+  }
+
+  // Recount every rollup from the bookings collection. Bookings written while
+  // this runs may be counted twice, so run it when traffic is quiet.
+  async rebuildRollups(): Promise<number> {
+    await AnalyticsRollup.deleteMany({});
+
+    let processed = 0;
+    let deltas: RollupDeltas = new Map();
+    const cursor = Booking.find()
+      .select('telescope status createdAt startTime endTime')
+      .lean()
+      .cursor();
+
+    for await (const booking of cursor) {
+      const facts = bookingFacts(booking);
+      if (!facts) continue;
+      accumulateBooking(deltas, facts, 1);
+      processed++;
+      if (deltas.size >= REBUILD_FLUSH_SIZE) {
+        await writeRollupDeltas(deltas);
+        deltas = new Map();
+      }
+    }
+    await writeRollupDeltas(deltas);
+    return processed;
+  }
+
+  // Build rollups on first start against an existing bookings collection
+  async ensureRollups(): Promise<number> {
+    const [rollups, bookings] = await Promise.all([
+      AnalyticsRollup.estimatedDocumentCount(),
+      Booking.estimatedDocumentCount()
+    ]);
+    if (rollups > 0 || bookings === 0) return 0;
+    return this.rebuildRollups();
+  }
+}
+
+export default new AnalyticsService();
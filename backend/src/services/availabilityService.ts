@@ -0,0 +1,266 @@
+import moment from 'moment';
+import { Booking, ACTIVE_BOOKING_STATUSES } from '../models/Booking';
+import { Telescope } from '../models/Telescope';
+
+export interface ObservingSchedule {
+  startHour: number;
+  slotMinutes: number;
+  slotCount: number;
+}
+
+export interface AvailableSlot {
+  startTime: string;
+  endTime: string;
+  display: string;
+}
+
+export interface AvailabilityEntry {
+  telescope: string;
+  night: string;
+  slots: AvailableSlot[];
+}
+
+interface NightOccupancy {
+  nightStart: number;
+  loadedAt: number;
+  bookings: Map<string, { start: number; end: number }>;
+  occupancy: Uint16Array;
+}
+
+interface TelescopeEntry {
+  schedule: ObservingSchedule;
+  loadedAt: number;
+  nights: Map<string, NightOccupancy>;
+}
+
+export const DEFAULT_SCHEDULE: ObservingSchedule = { startHour: 18, slotMinutes: 60, slotCount: 12 };
+
+// Other replicas may have written bookings, so cached nights are reloaded after this
+const NIGHT_TTL_MS = parseInt(process.env.AVAILABILITY_TTL_MS || '60000');
+const TELESCOPE_TTL_MS = 5 * 60 * 1000;
+const MAX_NIGHTS_PER_TELESCOPE = 400;
+const NIGHT_KEY_FORMAT = 'YYYY-MM-DD';
+
+const toId = (value: any): string => String(value && value._id ? value._id : value);
+
+class AvailabilityService {
+  private telescopes = new Map<string, TelescopeEntry>();
+
+  private nightStart(night: string, schedule: ObservingSchedule): number {
+    return moment(night, NIGHT_KEY_FORMAT).hour(schedule.startHour).valueOf();
+  }
+
+  private nightLength(schedule: ObservingSchedule): number {
+    return schedule.slotCount * schedule.slotMinutes * 60 * 1000;
+  }
+
+  private recompute(night: NightOccupancy, schedule: ObservingSchedule): void {
+    const slotMs = schedule.slotMinutes * 60 * 1000;
+    night.occupancy.fill(0);
+    for (const { start, end } of night.bookings.values()) {
+      const first = Math.max(0, Math.floor((start - night.nightStart) / slotMs));
+      const last = Math.min(schedule.slotCount, Math.ceil((end - night.nightStart) / slotMs));
+      for (let slot = first; slot < last; slot++) {
+        night.occupancy[slot]++;
+      }
+    }
+  }
+
+  private async loadSchedules(telescopeIds: string[]): Promise<void> {
+    const now = Date.now();
+    const stale = telescopeIds.filter(id => {
+      const entry = this.telescopes.get(id);
+      return !entry || now - entry.loadedAt > TELESCOPE_TTL_MS;
+    });
+    if (stale.length === 0) return;
+
+    const docs = await Telescope.find({ _id: { $in: stale } }).select('observingSchedule').lean();
+    for (const doc of docs) {
+      const id = toId(doc);
+      const schedule = { ...DEFAULT_SCHEDULE, ...(doc.observingSchedule || {}) };
+      const existing = this.telescopes.get(id);
+      const sameSchedule = existing && JSON.stringify(existing.schedule) === JSON.stringify(schedule);
+      this.telescopes.set(id, {
+        schedule,
+        loadedAt: now,
+        nights: sameSchedule ? existing!.nights : new Map()
+      });
+    }
+  }
+
+  // Load any missing or expired nights for these telescopes with a single range query
+  private async ensureNights(telescopeIds: string[], nights: string[]): Promise<void> {
+    await this.loadSchedules(telescopeIds);
+
+    const now = Date.now();
+    const missing: { id: string; night: string; start: number; end: number }[] = [];
+    for (const id of telescopeIds) {
+      const entry = this.telescopes.get(id);
+      if (!entry) continue;
+      for (const night of nights) {
+        const start = this.nightStart(night, entry.schedule);
+        const end = start + this.nightLength(entry.schedule);
+        // A night that is over has no free slots, so there is nothing to load
+        if (end < now) continue;
+        const cached = entry.nights.get(night);
+        if (!cached || now - cached.loadedAt > NIGHT_TTL_MS) {
+          missing.push({ id, night, start, end });
+        }
+      }
+    }
+    if (missing.length === 0) return;
+
+    const rangeStart = Math.min(...missing.map(m => m.start));
+    const rangeEnd = Math.max(...missing.map(m => m.end));
+    const bookings = await Booking.find({
+      telescope: { $in: Array.from(new Set(missing.map(m => m.id))) },
+      status: { $in: ACTIVE_BOOKING_STATUSES },
+      startTime: { $lt: new Date(rangeEnd) },
+      endTime: { $gt: new Date(rangeStart) }
+    }).select('telescope startTime endTime').lean();
+
+    for (const m of missing) {
+      const entry = this.telescopes.get(m.id)!;
+      const night: NightOccupancy = {
+        nightStart: m.start,
+        loadedAt: now,
+        bookings: new Map(),
+        occupancy: new Uint16Array(entry.schedule.slotCount)
+      };
+      for (const booking of bookings) {
+        const start = booking.startTime.getTime();
+        const end = booking.endTime.getTime();
+        if (toId(booking.telescope) === m.id && start < m.end && end > m.start) {
+          night.bookings.set(toId(booking), { start, end });
+        }
+      }
+      this.recompute(night, entry.schedule);
+      entry.nights.set(m.night, night);
+    }
+
+    const requested = new Set(nights);
+    for (const id of telescopeIds) {
+      this.evict(this.telescopes.get(id), requested);
+    }
+  }
+
+  // Drops past nights, then the oldest loads past the cap; nights in `keep` are
+  // about to be read and stay
+  private evict(entry: TelescopeEntry | undefined, keep: Set<string>): void {
+    if (!entry) return;
+    const now = Date.now();
+    for (const [key, night] of entry.nights) {
+      if (!keep.has(key) && night.nightStart + this.nightLength(entry.schedule) < now) {
+        entry.nights.delete(key);
+      }
+    }
+    // Map iteration order is insertion order, so the oldest loads go first
+    for (const key of Array.from(entry.nights.keys())) {
+      if (entry.nights.size <= MAX_NIGHTS_PER_TELESCOPE) break;
+      if (!keep.has(key)) entry.nights.delete(key);
+    }
+  }
+
+  private slotsFor(night: NightOccupancy, schedule: ObservingSchedule): AvailableSlot[] {
+    const slotMs = schedule.slotMinutes * 60 * 1000;
+    const now = Date.now();
+    const slots: AvailableSlot[] = [];
+    for (let slot = 0; slot < schedule.slotCount; slot++) {
+      const start = night.nightStart + slot * slotMs;
+      if (night.occupancy[slot] === 0 && start > now) {
+        const startTime = moment(start);
+        const endTime = moment(start + slotMs);
+        slots.push({
+          startTime: startTime.toISOString(),
+          endTime: endTime.toISOString(),
+          display: startTime.format('HH:mm') + ' - ' + endTime.format('HH:mm')
+        });
+      }
+    }
+    return slots;
+  }
+
+  nightKeys(from: string, days: number = 1): string[] {
+    const start = moment(from).startOf('day');
+    return Array.from({ length: Math.max(1, days) }, (_, i) => start.clone().add(i, 'days').format(NIGHT_KEY_FORMAT));
+  }
+
+  // Free slots for several telescopes over several nights: { telescopeId: { night: slots } }
+  async getAvailability(telescopeIds: string[], nights: string[]): Promise<Record<string, Record<string, AvailableSlot[]>>> {
+    const ids = telescopeIds.map(toId);
+    await this.ensureNights(ids, nights);
+
+    const result: Record<string, Record<string, AvailableSlot[]>> = {};
+    for (const id of ids) {
+      const entry = this.telescopes.get(id);
+      if (!entry) continue;
+      result[id] = {};
+      for (const night of nights) {
+        // Nights that are already over are never loaded
+        const occupancy = entry.nights.get(night);
+        result[id][night] = occupancy ? this.slotsFor(occupancy, entry.schedule) : [];
+      }
+    }
+    return result;
+  }
+
+  // Same data as getAvailability, yielded one telescope-night at a time, grouped by telescope
+  async *streamAvailability(telescopeIds: string[], nights: string[]): AsyncGenerator<AvailabilityEntry> {
+    const ids = Array.from(new Set(telescopeIds.map(toId)));
+    await this.ensureNights(ids, nights);
+
+    for (const id of ids) {
+      const entry = this.telescopes.get(id);
+      if (!entry) continue;
+      for (const night of nights) {
+        const occupancy = entry.nights.get(night);
+        yield { telescope: id, night, slots: occupancy ? this.slotsFor(occupancy, entry.schedule) : [] };
+      }
+    }
+  }
+
+  async getAvailabilityForTelescope(telescopeId: string, night: string): Promise<AvailableSlot[] | null> {
+    const availability = await this.getAvailability([telescopeId], [night]);
+    const telescope = availability[toId(telescopeId)];
+    return telescope ? telescope[night] : null;
+  }
+
+  async activeTelescopeIds(): Promise<string[]> {
+    const telescopes = await Telescope.find({ isActive: true }).select('_id').lean();
+    return telescopes.map(t => toId(t));
+  }
+
+  async getAvailabilityForAll(nights: string[]): Promise<Record<string, Record<string, AvailableSlot[]>>> {
+    return this.getAvailability(await this.activeTelescopeIds(), nights);
+  }
+
+  // Apply a created, updated or cancelled booking to any nights already in memory
+  bookingChanged(booking: any): void {
+    const entry = this.telescopes.get(toId(booking.telescope));
+    if (!entry) return;
+
+    const id = toId(booking);
+    const start = new Date(booking.startTime).getTime();
+    const end = new Date(booking.endTime).getTime();
+    const active = ACTIVE_BOOKING_STATUSES.includes(booking.status);
+
+    for (const [, night] of entry.nights) {
+      const intersects = start < night.nightStart + this.nightLength(entry.schedule) && end > night.nightStart;
+      const known = night.bookings.has(id);
+      if (active && intersects) {
+        night.bookings.set(id, { start, end });
+      } else if (known) {
+        night.bookings.delete(id);
+      } else {
+        continue;
+      }
+      this.recompute(night, entry.schedule);
+    }
+  }
+
+  invalidateTelescope(telescopeId: string): void {
+    this.telescopes.delete(toId(telescopeId));
+  }
+}
+
+export default new AvailabilityService();
@@ -0,0 +1,58 @@
+import { Telescope, ITelescope } from '../models/Telescope';
+import { User, IUser } from '../models/User';
+import { ReadThroughCache } from '../utils/cache';
+
+const TELESCOPE_TTL_MS = parseInt(process.env.TELESCOPE_CACHE_TTL_MS || '300000');
+const USER_TTL_MS = parseInt(process.env.USER_CACHE_TTL_MS || '60000');
+const ACTIVE_LIST_KEY = 'active';
+
+// Cached reads for documents that are read on nearly every request but rarely
+// written. Plain objects are cached; callers get a fresh hydrated document each
+// time, so one request can never mutate another's copy.
+class CatalogCache {
+  private telescopes = new ReadThroughCache<Record<string, any>>('telescopes', {
+    maxEntries: 500,
+    ttlMs: TELESCOPE_TTL_MS,
+    loader: async (id) => Telescope.findById(id).lean()
+  });
+
+  private activeTelescopes = new ReadThroughCache<Record<string, any>[]>('telescopeList', {
+    maxEntries: 1,
+    ttlMs: TELESCOPE_TTL_MS,
+    loader: async () => Telescope.find({ isActive: true }).lean()
+  });
+
+  private users = new ReadThroughCache<Record<string, any>>('users', {
+    maxEntries: 10000,
+    ttlMs: USER_TTL_MS,
+    loader: async (id) => User.findById(id).select('-password').lean()
+  });
+
+  async getTelescope(id: string): Promise<ITelescope | null> {
+    const telescope = await this.telescopes.get(String(id));
+    return telescope ? Telescope.hydrate(telescope) : null;
+  }
+
+  // Already JSON-shaped, so routes can send it as is
+  async getActiveTelescopes(): Promise<Record<string, any>[]> {
+    return (await this.activeTelescopes.get(ACTIVE_LIST_KEY)) || [];
+  }
+
+  async getUser(id: string): Promise<IUser | null> {
+    const user = await this.users.get(String(id));
+    return user ? User.hydrate(user) : null;
+  }
+
+  async invalidateTelescope(id?: string): Promise<void> {
+    await Promise.all([
+      id ? this.telescopes.invalidate(String(id)) : Promise.resolve(),
+      this.activeTelescopes.invalidate(ACTIVE_LIST_KEY)
+    ]);
+  }
+
+  async invalidateUser(id: string): Promise<void> {
+    await this.users.invalidate(String(id));
+  }
+}
+
+export default new CatalogCache();
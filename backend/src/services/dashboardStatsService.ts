@@ -0,0 +1,169 @@
+import { Model } from 'mongoose';
+import moment from 'moment';
+import { Booking } from '../models/Booking';
+import { Telescope } from '../models/Telescope';
+import { User } from '../models/User';
+import logger from '../utils/logger';
+import { registerMetricsSource } from '../utils/metrics';
+
+// A snapshot younger than this is served as is
+const SNAPSHOT_TTL_MS = parseInt(process.env.ADMIN_STATS_TTL_MS || '5000');
+// Up to this age a stale snapshot is still served while one refresh runs behind it
+const SNAPSHOT_MAX_STALE_MS = parseInt(process.env.ADMIN_STATS_MAX_STALE_MS || '60000');
+const RECENT_BOOKINGS = 10;
+
+export interface DashboardStatistics {
+  bookings: {
+    total: number;
+    today: number;
+    thisWeek: number;
+    thisMonth: number;
+    pending: number;
+    confirmed: number;
+  };
+  users: {
+    total: number;
+    active: number;
+  };
+  telescopes: {
+    total: number;
+    active: number;
+  };
+}
+
+export interface DashboardSnapshot {
+  statistics: DashboardStatistics;
+  recentBookings: Record<string, any>[];
+  generatedAt: Date;
+  computeMs: number;
+}
+
+// Sums 1 for each document matching `condition`
+const countIf = (condition: Record<string, any>) => ({ $sum: { $cond: [condition, 1, 0] } });
+
+// Counts for one collection in a single pass; an empty collection yields no group
+const singlePass = async (model: Model<any>, counters: Record<string, any>): Promise<Record<string, number>> => {
+  const [row] = await model.aggregate([{ $group: { _id: null, total: { $sum: 1 }, ...counters } }]);
+  const counts: Record<string, number> = { total: row?.total || 0 };
+  for (const name of Object.keys(counters)) {
+    counts[name] = row?.[name] || 0;
+  }
+  return counts;
+};
+
+// Admin dashboard figures. Each collection is scanned once per refresh, and
+// every request within the TTL shares the same snapshot; concurrent requests
+// for a stale snapshot wait on one in-flight computation.
+class DashboardStatsService {
+  private snapshot: DashboardSnapshot | null = null;
+  private refreshing: Promise<DashboardSnapshot> | null = null;
+  private computations = 0;
+  private coalesced = 0;
+  private failures = 0;
+
+  constructor() {
+    registerMetricsSource('dashboardStats', () => ({
+      snapshotAgeMs: this.snapshot ? this.ageMs(this.snapshot) : null,
+      lastComputeMs: this.snapshot?.computeMs ?? null,
+      computations: this.computations,
+      coalescedRequests: this.coalesced,
+      failures: this.failures
+    }));
+  }
+
+  ageMs(snapshot: DashboardSnapshot): number {
+    return Date.now() - snapshot.generatedAt.getTime();
+  }
+
+  async getSnapshot(): Promise<DashboardSnapshot> {
+    const current = this.snapshot;
+    if (current && this.ageMs(current) < SNAPSHOT_TTL_MS) {
+      return current;
+    }
+    if (current && this.ageMs(current) < SNAPSHOT_MAX_STALE_MS) {
+      this.refresh().catch(error => logger.error('Dashboard stats refresh failed', { error: error.message }));
+      return current;
+    }
+    return this.refresh();
+  }
+
+  refresh(): Promise<DashboardSnapshot> {
+    if (this.refreshing) {
+      this.coalesced++;
+      return this.refreshing;
+    }
+    this.refreshing = this.compute()
+      .then(snapshot => {
+        this.snapshot = snapshot;
+        return snapshot;
+      })
+      .catch(error => {
+        this.failures++;
+        throw error;
+      })
+      .finally(() => {
+        this.refreshing = null;
+      });
+    return this.refreshing;
+  }
+
+  private async compute(): Promise<DashboardSnapshot> {
+    const started = Date.now();
+    this.computations++;
+
+    const today = moment().startOf('day').toDate();
+    const thisWeek = moment().startOf('week').toDate();
+    const thisMonth = moment().startOf('month').toDate();
+    const activeSince = moment().subtract(30, 'days').toDate();
+
+    const [bookings, users, telescopes, recentBookings] = await Promise.all([
+      singlePass(Booking, {
+        today: countIf({ $gte: ['$createdAt', today] }),
+        thisWeek: countIf({ $gte: ['$createdAt', thisWeek] }),
+        thisMonth: countIf({ $gte: ['$createdAt', thisMonth] }),
+        pending: countIf({ $eq: ['$status', 'pending'] }),
+        confirmed: countIf({ $eq: ['$status', 'confirmed'] })
+      }),
+      singlePass(User, {
+        active: countIf({ $gte: ['$lastLoginAt', activeSince] })
+      }),
+      singlePass(Telescope, {
+        active: countIf({ $eq: ['$isActive', true] })
+      }),
+      // Newest first straight off the { createdAt, _id } index
+      Booking.find()
+        .populate('user', 'name email')
+        .populate('telescope', 'name location')
+        .sort({ createdAt: -1, _id: -1 })
+        .limit(RECENT_BOOKINGS)
+        .lean()
+    ]);
+
+    return {
+      statistics: {
+        bookings: {
+          total: bookings.total,
+          today: bookings.today,
+          thisWeek: bookings.thisWeek,
+          thisMonth: bookings.thisMonth,
+          pending: bookings.pending,
+          confirmed: bookings.confirmed
+        },
+        users: {
+          total: users.total,
+          active: users.active
+        },
+        telescopes: {
+          total: telescopes.total,
+          active: telescopes.active
+        }
+      },
+      recentBookings,
+      // Stamped when the reads began, so the age never understates staleness
+      generatedAt: new Date(started),
+      computeMs: Date.now() - started
+    };
+  }
+}
+
+export default new DashboardStatsService();
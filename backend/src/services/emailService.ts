@@ -1,31 +1,64 @@
 import nodemailer from 'nodemailer';
+import moment from 'moment';
 import { IBooking } from '../models/Booking';
 import { ITelescope } from '../models/Telescope';
 import { IUser } from '../models/User';
+import { registerMetricsSource } from '../utils/metrics';
+import { MailMessage, MailQueue } from './mailQueue';
 
-interface EmailOptions {
-  to: string;
-  subject: string;
-  html: string;
-  text?: string;
+type EmailOptions = MailMessage;
+
+interface AdminEvent {
+  action: 'created' | 'cancelled';
+  bookingId: string;
+  userName: string;
+  userEmail: string;
+  telescopeName: string;
+  startTime: Date;
+  purpose: string;
+  notes?: string;
 }
 
+const MAIL_POOL_SIZE = parseInt(process.env.MAIL_POOL_SIZE || '3');
+const MAIL_MAX_ATTEMPTS = parseInt(process.env.MAIL_MAX_ATTEMPTS || '5');
+const MAIL_RETRY_BASE_MS = parseInt(process.env.MAIL_RETRY_BASE_MS || '2000');
+const ADMIN_DIGEST_INTERVAL_MS = parseInt(process.env.ADMIN_DIGEST_INTERVAL_MS || '60000');
+const ADMIN_DIGEST_MAX_EVENTS = 50;
+
 class EmailService {
   private transporter: nodemailer.Transporter;
+  private queue: MailQueue;
+  private adminEvents: AdminEvent[] = [];
+  private digestTimer: NodeJS.Timeout | null = null;
 
   constructor() {
     this.transporter = nodemailer.createTransport({
       host: process.env.SMTP_HOST || 'localhost',
       port: parseInt(process.env.SMTP_PORT || '587'),
       secure: process.env.SMTP_SECURE === 'true',
-      auth: {
+      // Reuse SMTP connections instead of a handshake per message
+      pool: true,
+      maxConnections: MAIL_POOL_SIZE,
+      maxMessages: 100,
+      auth: process.env.SMTP_USER ? {
         user: process.env.SMTP_USER,
         pass: process.env.SMTP_PASS,
-      },
+      } : undefined,
     });
+
+    this.queue = new MailQueue(options => this.deliver(options), {
+      concurrency: MAIL_POOL_SIZE,
+      maxAttempts: MAIL_MAX_ATTEMPTS,
+      retryBaseMs: MAIL_RETRY_BASE_MS
+    });
+
+    registerMetricsSource('email', () => ({
+      ...this.queue.getMetrics(),
+      adminDigestPending: this.adminEvents.length
+    }));
   }
 
-  private async sendEmail(options: EmailOptions): Promise<void> {
+  private async deliver(options: EmailOptions): Promise<void> {
     try {
       await this.transporter.sendMail({
         from: process.env.FROM_EMAIL || 'noreply@observatory.com',
@@ -41,6 +74,12 @@ class EmailService {
     }
   }
 
+  // Send one message now (through the pool's concurrency limit) and surface
+  // failures to the caller, for senders that track retries themselves
+  private async sendEmail(options: EmailOptions): Promise<void> {
+    await this.queue.sendNow(options);
+  }
+
   async sendBookingConfirmation(booking: any): Promise<void> {
     const user = booking.user as IUser;
     const telescope = booking.telescope as ITelescope;
@@ -135,7 +174,7 @@ class EmailService {
       Thank you for choosing our Observatory!
     `;
 
-    await this.sendEmail({
+    this.queue.enqueue({
       to: user.email,
       subject,
       html,
@@ -198,7 +237,7 @@ class EmailService {
       </html>
     `;
 
-    await this.sendEmail({
+    this.queue.enqueue({
       to: user.email,
       subject,
       html,
@@ -284,38 +323,141 @@ class EmailService {
     });
   }
 
+  async sendImmediateReminder(booking: any): Promise<void> {
+    const user = booking.user as IUser;
+    const telescope = booking.telescope as ITelescope;
+    const startTime = moment(booking.startTime);
+    const timeUntilStart = startTime.diff(moment(), 'minutes');
+
+    const subject = `Observatory Session Starting Soon - ${telescope.name}`;
+    const html = `
+      <html>
+        <head>
+          <style>
+            body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
+            .container { max-width: 600px; margin: 0 auto; padding: 20px; }
+            .header { background: #1976d2; color: white; padding: 20px; border-radius: 8px 8px 0 0; }
+            .content { background: #f9f9f9; padding: 20px; border-radius: 0 0 8px 8px; }
+            .urgent { background: #fff3e0; padding: 15px; border-radius: 6px; margin: 15px 0; border-left: 4px solid #ff9800; }
+            .footer { text-align: center; margin-top: 20px; font-size: 12px; color: #666; }
+          </style>
+        </head>
+        <body>
+          <div class="container">
+            <div class="header">
+              <h1>🔭 Observatory Session Starting Soon!</h1>
+            </div>
+            <div class="content">
+              <p>Hello ${user.name},</p>
+              
+              <div class="urgent">
+                <h3>⏰ Your session starts in ${Math.round(timeUntilStart)} minutes!</h3>
+                <p><strong>Telescope:</strong> ${telescope.name}</p>
+                <p><strong>Location:</strong> ${telescope.location}</p>
+                <p><strong>Time:</strong> ${startTime.format('HH:mm')}</p>
+              </div>
+
+              <p>Final reminders:</p>
+              <ul>
+                <li>🚗 Leave now if you haven't already</li>
+                <li>🧥 Bring warm clothing</li>
+                <li>🔦 Red flashlight for night vision</li>
+                <li>📝 Notebook for observations</li>
+              </ul>
+
+              <p>We can't wait to help you explore the universe!</p>
+              
+              <div class="footer">
+                <p>Safe travels and clear skies!</p>
+              </div>
+            </div>
+          </div>
+        </body>
+      </html>
+    `;
+
+    await this.sendEmail({
+      to: user.email,
+      subject,
+      html,
+    });
+  }
+
+  // Admin notifications are collected and sent as one digest per interval
   async sendAdminNotification(booking: any, action: 'created' | 'cancelled'): Promise<void> {
-    const adminEmail = process.env.ADMIN_EMAIL;
-    if (!adminEmail) return;
+    if (!process.env.ADMIN_EMAIL) return;
 
     const user = booking.user as IUser;
     const telescope = booking.telescope as ITelescope;
-    const startTime = new Date(booking.startTime);
+    this.adminEvents.push({
+      action,
+      bookingId: String(booking._id),
+      userName: user.name,
+      userEmail: user.email,
+      telescopeName: telescope.name,
+      startTime: new Date(booking.startTime),
+      purpose: booking.purpose,
+      notes: booking.notes
+    });
 
-    const actionText = action === 'created' ? 'New Booking Created' : 'Booking Cancelled';
-    const subject = `${actionText} - ${telescope.name}`;
+    if (this.adminEvents.length >= ADMIN_DIGEST_MAX_EVENTS) {
+      this.flushAdminDigest();
+    } else if (!this.digestTimer) {
+      this.digestTimer = setTimeout(() => this.flushAdminDigest(), ADMIN_DIGEST_INTERVAL_MS);
+      this.digestTimer.unref();
+    }
+  }
+
+  flushAdminDigest(): void {
+    if (this.digestTimer) {
+      clearTimeout(this.digestTimer);
+      this.digestTimer = null;
+    }
+    const adminEmail = process.env.ADMIN_EMAIL;
+    const events = this.adminEvents.splice(0);
+    if (!adminEmail || events.length === 0) return;
+
+    const actionText = (event: AdminEvent) => event.action === 'created' ? 'New Booking Created' : 'Booking Cancelled';
+    const eventHtml = (event: AdminEvent) => `
+          <h2>${actionText(event)}</h2>
+          <p><strong>User:</strong> ${event.userName} (${event.userEmail})</p>
+          <p><strong>Telescope:</strong> ${event.telescopeName}</p>
+          <p><strong>Date:</strong> ${event.startTime.toLocaleDateString()}</p>
+          <p><strong>Time:</strong> ${event.startTime.toLocaleTimeString()}</p>
+          <p><strong>Purpose:</strong> ${event.purpose}</p>
+          <p><strong>Booking ID:</strong> ${event.bookingId}</p>
+          ${event.notes ? `<p><strong>Notes:</strong> ${event.notes}</p>` : ''}`;
+
+    let subject: string;
+    if (events.length === 1) {
+      subject = `${actionText(events[0])} - ${events[0].telescopeName}`;
+    } else {
+      const created = events.filter(e => e.action === 'created').length;
+      subject = `Booking activity digest - ${created} created, ${events.length - created} cancelled`;
+    }
 
     const html = `
       <html>
         <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-          <h2>${actionText}</h2>
-          <p><strong>User:</strong> ${user.name} (${user.email})</p>
-          <p><strong>Telescope:</strong> ${telescope.name}</p>
-          <p><strong>Date:</strong> ${startTime.toLocaleDateString()}</p>
-          <p><strong>Time:</strong> ${startTime.toLocaleTimeString()}</p>
-          <p><strong>Purpose:</strong> ${booking.purpose}</p>
-          <p><strong>Booking ID:</strong> ${booking._id}</p>
-          ${booking.notes ? `<p><strong>Notes:</strong> ${booking.notes}</p>` : ''}
+          ${events.map(eventHtml).join('\n          <hr>')}
         </body>
       </html>
     `;
 
-    await this.sendEmail({
+    this.queue.enqueue({
       to: adminEmail,
       subject,
       html,
     });
   }
+
+  // Send any pending digest and wait for queued mail, for graceful shutdown
+  async shutdown(timeoutMs: number): Promise<boolean> {
+    this.flushAdminDigest();
+    const drained = await this.queue.drain(timeoutMs);
+    this.transporter.close();
+    return drained;
+  }
 }
 
 export default new EmailService();
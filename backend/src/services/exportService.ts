@@ -0,0 +1,140 @@
+import { Readable, Writable } from 'stream';
+import { pipeline } from 'stream/promises';
+import { createGzip } from 'zlib';
+import { Booking } from '../models/Booking';
+import { Telescope } from '../models/Telescope';
+import { User } from '../models/User';
+
+export type ExportFormat = 'json' | 'csv' | 'ndjson';
+
+export const EXPORT_FORMATS: ExportFormat[] = ['json', 'csv', 'ndjson'];
+
+const LOOKUP_BATCH_SIZE = 500;
+
+const CONTENT_TYPES: Record<ExportFormat, string> = {
+  json: 'application/json',
+  csv: 'text/csv; charset=utf-8',
+  ndjson: 'application/x-ndjson'
+};
+
+const CSV_HEADER = [
+  'ID', 'User Name', 'User Email', 'Telescope', 'Location',
+  'Start Time', 'End Time', 'Purpose', 'Status', 'Created At'
+];
+
+// RFC 4180: quote fields containing separators, quotes or line breaks, doubling inner quotes
+export const csvField = (value: unknown): string => {
+  if (value === null || value === undefined) return '';
+  const text = value instanceof Date ? value.toISOString() : String(value);
+  return /[",\r\n]/.test(text) || text !== text.trim() ? `"${text.replace(/"/g, '""')}"` : text;
+};
+
+export const csvRow = (fields: unknown[]): string => fields.map(csvField).join(',') + '\r\n';
+
+const toId = (value: any): string => String(value && value._id ? value._id : value);
+
+// Read bookings in cursor batches, resolving users and telescopes with one
+// $in query per batch instead of populating each document
+async function* exportedBookings(filter: Record<string, any>) {
+  const cursor = Booking.find(filter)
+    .sort({ createdAt: -1 })
+    .lean()
+    .cursor({ batchSize: LOOKUP_BATCH_SIZE });
+
+  // Telescopes are few and repeat constantly, so keep them for the whole export
+  const telescopes = new Map<string, any>();
+  let batch: any[] = [];
+
+  const resolve = async () => {
+    const userIds = Array.from(new Set(batch.map(b => toId(b.user))));
+    const missingTelescopes = Array.from(new Set(batch.map(b => toId(b.telescope)))).filter(id => !telescopes.has(id));
+
+    const [users, newTelescopes] = await Promise.all([
+      User.find({ _id: { $in: userIds } }).select('name email').lean(),
+      missingTelescopes.length > 0
+        ? Telescope.find({ _id: { $in: missingTelescopes } }).select('name location').lean()
+        : Promise.resolve([])
+    ]);
+    for (const telescope of newTelescopes) {
+      telescopes.set(toId(telescope), telescope);
+    }
+    const usersById = new Map(users.map(u => [toId(u), u]));
+
+    const resolved = batch.map(booking => ({
+      ...booking,
+      user: usersById.get(toId(booking.user)) || null,
+      telescope: telescopes.get(toId(booking.telescope)) || null
+    }));
+    batch = [];
+    return resolved;
+  };
+
+  for await (const booking of cursor) {
+    batch.push(booking);
+    if (batch.length >= LOOKUP_BATCH_SIZE) {
+      yield* await resolve();
+    }
+  }
+  if (batch.length > 0) {
+    yield* await resolve();
+  }
+}
+
+async function* formatBookings(filter: Record<string, any>, format: ExportFormat) {
+  if (format === 'csv') {
+    yield csvRow(CSV_HEADER);
+  } else if (format === 'json') {
+    yield '{"bookings":[';
+  }
+
+  let first = true;
+  for await (const booking of exportedBookings(filter)) {
+    if (format === 'csv') {
+      yield csvRow([
+        booking._id,
+        booking.user?.name,
+        booking.user?.email,
+        booking.telescope?.name,
+        booking.telescope?.location,
+        booking.startTime,
+        booking.endTime,
+        booking.purpose,
+        booking.status,
+        booking.createdAt
+      ]);
+    } else if (format === 'ndjson') {
+      yield JSON.stringify(booking) + '\n';
+    } else {
+      yield (first ? '' : ',') + JSON.stringify(booking);
+    }
+    first = false;
+  }
+
+  if (format === 'json') {
+    yield ']}';
+  }
+}
+
+export const exportHeaders = (format: ExportFormat, gzip: boolean): Record<string, string> => {
+  const extension = format === 'ndjson' ? 'ndjson' : format;
+  return {
+    'Content-Type': gzip ? 'application/gzip' : CONTENT_TYPES[format],
+    'Content-Disposition': `attachment; filename=bookings.${extension}${gzip ? '.gz' : ''}`
+  };
+};
+
+// Stream matching bookings into the destination. pipeline() only pulls the
+// next row when the destination has drained, so memory stays flat.
+export const streamBookingExport = async (
+  destination: Writable,
+  filter: Record<string, any>,
+  format: ExportFormat,
+  gzip = false
+): Promise<void> => {
+  const source = Readable.from(formatBookings(filter, format));
+  if (gzip) {
+    await pipeline(source, createGzip(), destination);
+  } else {
+    await pipeline(source, destination);
+  }
+};
@@ -0,0 +1,155 @@
+import logger from '../utils/logger';
+
+export interface MailMessage {
+  to: string;
+  subject: string;
+  html: string;
+  text?: string;
+}
+
+export interface MailQueueOptions {
+  concurrency: number;
+  maxAttempts: number;
+  retryBaseMs: number;
+}
+
+interface MailJob {
+  message: MailMessage;
+  attempts: number;
+  maxAttempts: number;
+  enqueuedAt: number;
+  resolve?: () => void;
+  reject?: (error: Error) => void;
+}
+
+const LATENCY_WINDOW = 500;
+
+const summarize = (values: number[]) => {
+  if (values.length === 0) return { avg: 0, p50: 0, p95: 0, max: 0 };
+  const sorted = [...values].sort((a, b) => a - b);
+  const at = (pct: number) => sorted[Math.min(sorted.length - 1, Math.ceil(pct * sorted.length) - 1)];
+  return {
+    avg: Math.round(sorted.reduce((sum, v) => sum + v, 0) / sorted.length),
+    p50: at(0.5),
+    p95: at(0.95),
+    max: sorted[sorted.length - 1]
+  };
+};
+
+// In-process outbound mail queue: FIFO, bounded concurrency, retries with
+// exponential backoff. Jobs live in memory, so a restart drops unsent mail.
+export class MailQueue {
+  private ready: MailJob[] = [];
+  private waitingRetry = 0;
+  private inFlight = 0;
+  private sendLatencies: number[] = [];
+  private queueLatencies: number[] = [];
+  private idleWaiters: (() => void)[] = [];
+  private counters = { enqueued: 0, sent: 0, failed: 0, retried: 0 };
+
+  constructor(
+    private readonly send: (message: MailMessage) => Promise<void>,
+    private readonly options: MailQueueOptions
+  ) {}
+
+  get depth(): number {
+    return this.ready.length + this.waitingRetry;
+  }
+
+  // Fire and forget: delivery, retries and failures are handled here
+  enqueue(message: MailMessage): void {
+    this.counters.enqueued++;
+    this.ready.push({ message, attempts: 0, maxAttempts: this.options.maxAttempts, enqueuedAt: Date.now() });
+    this.pump();
+  }
+
+  // Deliver once through the same concurrency limit and report the outcome,
+  // for callers that keep their own retry state
+  sendNow(message: MailMessage): Promise<void> {
+    return new Promise((resolve, reject) => {
+      this.counters.enqueued++;
+      this.ready.push({ message, attempts: 0, maxAttempts: 1, enqueuedAt: Date.now(), resolve, reject });
+      this.pump();
+    });
+  }
+
+  private pump(): void {
+    while (this.inFlight < this.options.concurrency && this.ready.length > 0) {
+      this.run(this.ready.shift()!);
+    }
+    if (this.depth === 0 && this.inFlight === 0) {
+      this.idleWaiters.splice(0).forEach(resolve => resolve());
+    }
+  }
+
+  private async run(job: MailJob): Promise<void> {
+    this.inFlight++;
+    const started = Date.now();
+    if (job.attempts === 0) {
+      this.record(this.queueLatencies, started - job.enqueuedAt);
+    }
+
+    try {
+      await this.send(job.message);
+      this.record(this.sendLatencies, Date.now() - started);
+      this.counters.sent++;
+      job.resolve?.();
+    } catch (error) {
+      job.attempts++;
+      if (job.attempts < job.maxAttempts) {
+        this.counters.retried++;
+        this.waitingRetry++;
+        const delay = this.options.retryBaseMs * 2 ** (job.attempts - 1);
+        setTimeout(() => {
+          this.waitingRetry--;
+          this.ready.push(job);
+          this.pump();
+        }, delay).unref();
+      } else {
+        this.counters.failed++;
+        if (job.reject) {
+          job.reject(error as Error);
+        } else {
+          logger.error('Email delivery failed permanently', {
+            to: job.message.to,
+            subject: job.message.subject,
+            attempts: job.attempts,
+            error: (error as Error).message
+          });
+        }
+      }
+    } finally {
+      this.inFlight--;
+      this.pump();
+    }
+  }
+
+  private record(window: number[], value: number): void {
+    window.push(value);
+    if (window.length > LATENCY_WINDOW) window.shift();
+  }
+
+  // Resolve once nothing is queued, retrying or in flight, or after timeoutMs
+  drain(timeoutMs: number): Promise<boolean> {
+    if (this.depth === 0 && this.inFlight === 0) return Promise.resolve(true);
+    return new Promise(resolve => {
+      const timer = setTimeout(() => resolve(false), timeoutMs);
+      this.idleWaiters.push(() => {
+        clearTimeout(timer);
+        resolve(true);
+      });
+    });
+  }
+
+  getMetrics() {
+    const oldest = this.ready[0];
+    return {
+      queueDepth: this.depth,
+      inFlight: this.inFlight,
+      oldestQueuedMs: oldest ? Date.now() - oldest.enqueuedAt : 0,
+      ...this.counters,
+      sendLatencyMs: summarize(this.sendLatencies),
+      queueWaitMs: summarize(this.queueLatencies)
+    };
+  }
+}
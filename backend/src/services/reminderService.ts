@@ -1,154 +1,259 @@
 import cron from 'node-cron';
-import moment from 'moment';
-import { Booking } from '../models/Booking';
+import * as os from 'os';
+import * as crypto from 'crypto';
+import { Booking, ACTIVE_BOOKING_STATUSES } from '../models/Booking';
+import { Reminder, IReminder, ReminderKind, scheduleReminders } from '../models/Reminder';
+import { registerMetricsSource } from '../utils/metrics';
+import logger from '../utils/logger';
 import emailService from './emailService';
 
+const CLAIM_BATCH_SIZE = parseInt(process.env.REMINDER_BATCH_SIZE || '200');
+const SEND_CONCURRENCY = parseInt(process.env.REMINDER_CONCURRENCY || '5');
+const MAX_BATCHES_PER_RUN = 20;
+const MAX_ATTEMPTS = 3;
+const RETRY_DELAY_MS = 5 * 60 * 1000;
+// A claim older than this belongs to a replica that died mid-run
+const CLAIM_TIMEOUT_MS = 10 * 60 * 1000;
+const BACKFILL_BATCH_SIZE = 500;
+
+const SENT_FLAGS: Record<ReminderKind, string> = {
+  daily: 'reminderSent',
+  immediate: 'immediateReminderSent'
+};
+
+export interface ReminderRunMetrics {
+  startedAt: string;
+  durationMs: number;
+  claimed: number;
+  sent: number;
+  failed: number;
+  skipped: number;
+  expired: number;
+  perSecond: number;
+}
+
+// Run fn over items with at most `limit` calls in flight
+const mapWithConcurrency = async <T, R>(items: T[], limit: number, fn: (item: T) => Promise<R>): Promise<R[]> => {
+  const results: R[] = new Array(items.length);
+  let next = 0;
+  const workers = Array.from({ length: Math.min(limit, items.length) }, async () => {
+    while (next < items.length) {
+      const index = next++;
+      results[index] = await fn(items[index]);
+    }
+  });
+  await Promise.all(workers);
+  return results;
+};
+
 class ReminderService {
-  
+  private running = false;
+  private lastRun: ReminderRunMetrics | null = null;
+  private totals = { runs: 0, claimed: 0, sent: 0, failed: 0, skipped: 0, expired: 0 };
+
+  constructor() {
+    registerMetricsSource('reminders', () => this.getMetrics());
+  }
+
   public startReminderScheduler(): void {
-    // Send reminders daily at 10 AM for bookings happening the next day
-    cron.schedule('0 10 * * *', async () => {
-      await this.sendDailyReminders();
+    // Reminders carry their own due times, so a frequent indexed poll replaces
+    // the fixed 10 AM and half-hourly scans
+    cron.schedule('* * * * *', async () => {
+      await this.processDueReminders();
     });
+  }
 
-    // Send reminders 2 hours before booking start time
-    cron.schedule('*/30 * * * *', async () => {
-      await this.sendImmediateReminders();
-    });
+  // Queue reminders for active future bookings that predate the reminder queue
+  public async backfillReminders(): Promise<number> {
+    let queued = 0;
+    let batch: any[] = [];
+    const flush = async () => {
+      const known = new Set((await Reminder.distinct('booking', { booking: { $in: batch.map(b => b._id) } })).map(String));
+      for (const booking of batch.filter(b => !known.has(String(b._id)))) {
+        await scheduleReminders({
+          _id: booking._id,
+          startTime: booking.startTime,
+          active: true,
+          sent: { daily: !!booking.reminderSent, immediate: !!booking.immediateReminderSent }
+        });
+        queued++;
+      }
+      batch = [];
+    };
+
+    const cursor = Booking.find({
+      status: { $in: ACTIVE_BOOKING_STATUSES },
+      startTime: { $gt: new Date() }
+    }).select('startTime reminderSent immediateReminderSent').lean().cursor();
+
+    for await (const booking of cursor) {
+      batch.push(booking);
+      if (batch.length >= BACKFILL_BATCH_SIZE) await flush();
+    }
+    if (batch.length > 0) await flush();
+    return queued;
   }
 
-  private async sendDailyReminders(): Promise<void> {
+  // Claim due reminders in batches and send them; safe to run on every replica
+  public async processDueReminders(): Promise<ReminderRunMetrics | null> {
+    if (this.running) return null;
+    this.running = true;
+
+    const started = Date.now();
+    const run: ReminderRunMetrics = {
+      startedAt: new Date(started).toISOString(),
+      durationMs: 0,
+      claimed: 0,
+      sent: 0,
+      failed: 0,
+      skipped: 0,
+      expired: 0,
+      perSecond: 0
+    };
+
     try {
-      const tomorrow = moment().add(1, 'day').startOf('day');
-      const endOfTomorrow = moment().add(1, 'day').endOf('day');
-
-      const bookings = await Booking.find({
-        startTime: {
-          $gte: tomorrow.toDate(),
-          $lte: endOfTomorrow.toDate()
-        },
-        status: { $in: ['pending', 'confirmed'] },
-        reminderSent: { $ne: true }
-      }).populate([
-        { path: 'telescope', select: 'name location' },
-        { path: 'user', select: 'name email' }
-      ]);
-
-      for (const booking of bookings) {
-        try {
-          await emailService.sendBookingReminder(booking);
-          booking.reminderSent = true;
-          await booking.save();
-        } catch (error) {
-          console.error(`Failed to send reminder for booking ${booking._id}:`, error);
-        }
-      }
+      const expired = await Reminder.updateMany(
+        { state: { $in: ['pending', 'claimed'] }, expiresAt: { $lte: new Date() } },
+        { $set: { state: 'expired' }, $unset: { claimToken: 1 } }
+      );
+      run.expired = expired.modifiedCount;
 
-      if (bookings.length > 0) {
-        console.log(`Sent ${bookings.length} booking reminders for tomorrow`);
+      for (let batch = 0; batch < MAX_BATCHES_PER_RUN; batch++) {
+        const reminders = await this.claimBatch();
+        if (reminders.length === 0) break;
+        run.claimed += reminders.length;
+        await this.sendBatch(reminders, run);
+        if (reminders.length < CLAIM_BATCH_SIZE) break;
       }
     } catch (error) {
-      console.error('Error in daily reminder service:', error);
+      logger.error('Reminder run failed', { error: (error as Error).message });
+    } finally {
+      this.running = false;
     }
+
+    run.durationMs = Date.now() - started;
+    run.perSecond = run.durationMs > 0 ? Math.round((run.sent / run.durationMs) * 1000 * 100) / 100 : 0;
+    this.lastRun = run;
+    this.totals.runs++;
+    this.totals.claimed += run.claimed;
+    this.totals.sent += run.sent;
+    this.totals.failed += run.failed;
+    this.totals.skipped += run.skipped;
+    this.totals.expired += run.expired;
+
+    if (run.claimed > 0 || run.expired > 0) {
+      logger.info('Reminder run complete', run);
+    }
+    return run;
   }
 
-  private async sendImmediateReminders(): Promise<void> {
-    try {
-      const now = moment();
-      const twoHoursFromNow = moment().add(2, 'hours');
-
-      const bookings = await Booking.find({
-        startTime: {
-          $gte: now.toDate(),
-          $lte: twoHoursFromNow.toDate()
-        },
-        status: { $in: ['pending', 'confirmed'] },
-        immediateReminderSent: { $ne: true }
-      }).populate([
-        { path: 'telescope', select: 'name location' },
-        { path: 'user', select: 'name email' }
-      ]);
-
-      for (const booking of bookings) {
-        const startTime = moment(booking.startTime);
-        const timeUntilStart = startTime.diff(now, 'minutes');
-
-        // Send reminder if booking is between 90-120 minutes away
-        if (timeUntilStart >= 90 && timeUntilStart <= 120) {
-          try {
-            await this.sendImmediateBookingReminder(booking);
-            booking.immediateReminderSent = true;
-            await booking.save();
-          } catch (error) {
-            console.error(`Failed to send immediate reminder for booking ${booking._id}:`, error);
-          }
+  // Pick candidate ids, then claim them with one updateMany that re-checks the
+  // filter; replicas racing for the same ids each win a disjoint subset
+  private async claimBatch(): Promise<IReminder[]> {
+    const now = new Date();
+    const claimable = {
+      dueAt: { $lte: now },
+      expiresAt: { $gt: now },
+      $or: [
+        { state: 'pending' },
+        { state: 'claimed', claimedAt: { $lt: new Date(now.getTime() - CLAIM_TIMEOUT_MS) } }
+      ]
+    };
+
+    const candidates = await Reminder.find(claimable)
+      .sort({ dueAt: 1 })
+      .limit(CLAIM_BATCH_SIZE)
+      .select('_id')
+      .lean();
+    if (candidates.length === 0) return [];
+
+    const token = `${os.hostname()}:${process.pid}:${crypto.randomBytes(6).toString('hex')}`;
+    await Reminder.updateMany(
+      { ...claimable, _id: { $in: candidates.map(c => c._id) } },
+      { $set: { state: 'claimed', claimToken: token, claimedAt: now }, $inc: { attempts: 1 } }
+    );
+    return Reminder.find({ claimToken: token }).lean<IReminder[]>();
+  }
+
+  private async sendBatch(reminders: IReminder[], run: ReminderRunMetrics): Promise<void> {
+    const bookings = await Booking.find({
+      _id: { $in: reminders.map(r => r.booking) },
+      status: { $in: ACTIVE_BOOKING_STATUSES }
+    }).populate([
+      { path: 'telescope', select: 'name location' },
+      { path: 'user', select: 'name email' }
+    ]);
+    const bookingsById = new Map(bookings.map(b => [String(b._id), b]));
+
+    const outcomes = await mapWithConcurrency(reminders, SEND_CONCURRENCY, async reminder => {
+      const booking = bookingsById.get(String(reminder.booking));
+      if (!booking || !booking.user || !booking.telescope) {
+        return { reminder, state: 'cancelled' as const };
+      }
+      try {
+        if (reminder.kind === 'immediate') {
+          await emailService.sendImmediateReminder(booking);
+        } else {
+          await emailService.sendBookingReminder(booking);
         }
+        return { reminder, state: 'sent' as const };
+      } catch (error) {
+        return { reminder, state: 'failed' as const, error: (error as Error).message };
+      }
+    });
+
+    const now = new Date();
+    const reminderUpdates: any[] = [];
+    const sentFlags: Record<ReminderKind, any[]> = { daily: [], immediate: [] };
+    for (const outcome of outcomes) {
+      const filter = { _id: outcome.reminder._id, claimToken: outcome.reminder.claimToken };
+      if (outcome.state === 'sent') {
+        run.sent++;
+        sentFlags[outcome.reminder.kind].push(outcome.reminder.booking);
+        reminderUpdates.push({ updateOne: { filter, update: { $set: { state: 'sent', sentAt: now }, $unset: { claimToken: 1 } } } });
+      } else if (outcome.state === 'cancelled') {
+        run.skipped++;
+        reminderUpdates.push({ updateOne: { filter, update: { $set: { state: 'cancelled' }, $unset: { claimToken: 1 } } } });
+      } else {
+        run.failed++;
+        const retry = outcome.reminder.attempts < MAX_ATTEMPTS;
+        reminderUpdates.push({
+          updateOne: {
+            filter,
+            update: {
+              $set: {
+                state: retry ? 'pending' : 'failed',
+                lastError: outcome.error,
+                ...(retry && { dueAt: new Date(now.getTime() + RETRY_DELAY_MS * outcome.reminder.attempts) })
+              },
+              $unset: { claimToken: 1 }
+            }
+          }
+        });
+        logger.warn('Reminder send failed', { booking: String(outcome.reminder.booking), kind: outcome.reminder.kind, error: outcome.error });
       }
-    } catch (error) {
-      console.error('Error in immediate reminder service:', error);
     }
+
+    await Promise.all([
+      reminderUpdates.length > 0 ? Reminder.bulkWrite(reminderUpdates, { ordered: false }) : null,
+      // updateMany skips document middleware, so these flags do not reschedule reminders
+      ...(Object.keys(sentFlags) as ReminderKind[])
+        .filter(kind => sentFlags[kind].length > 0)
+        .map(kind => Booking.updateMany({ _id: { $in: sentFlags[kind] } }, { $set: { [SENT_FLAGS[kind]]: true } }))
+    ]);
   }
 
-  private async sendImmediateBookingReminder(booking: any): Promise<void> {
-    const user = booking.user;
-    const telescope = booking.telescope;
-    const startTime = moment(booking.startTime);
-    const timeUntilStart = startTime.diff(moment(), 'minutes');
-
-    const subject = `Observatory Session Starting Soon - ${telescope.name}`;
-    const html = `
-      <html>
-        <head>
-          <style>
-            body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
-            .container { max-width: 600px; margin: 0 auto; padding: 20px; }
-            .header { background: #1976d2; color: white; padding: 20px; border-radius: 8px 8px 0 0; }
-            .content { background: #f9f9f9; padding: 20px; border-radius: 0 0 8px 8px; }
-            .urgent { background: #fff3e0; padding: 15px; border-radius: 6px; margin: 15px 0; border-left: 4px solid #ff9800; }
-            .footer { text-align: center; margin-top: 20px; font-size: 12px; color: #666; }
-          </style>
-        </head>
-        <body>
-          <div class="container">
-            <div class="header">
-              <h1>🔭 Observatory Session Starting Soon!</h1>
-            </div>
-            <div class="content">
-              <p>Hello ${user.name},</p>
-              
-              <div class="urgent">
-                <h3>⏰ Your session starts in ${Math.round(timeUntilStart)} minutes!</h3>
-                <p><strong>Telescope:</strong> ${telescope.name}</p>
-                <p><strong>Location:</strong> ${telescope.location}</p>
-                <p><strong>Time:</strong> ${startTime.format('HH:mm')}</p>
-              </div>
-
-              <p>Final reminders:</p>
-              <ul>
-                <li>🚗 Leave now if you haven't already</li>
-                <li>🧥 Bring warm clothing</li>
-                <li>🔦 Red flashlight for night vision</li>
-                <li>📝 Notebook for observations</li>
-              </ul>
-
-              <p>We can't wait to help you explore the universe!</p>
-              
-              <div class="footer">
-                <p>Safe travels and clear skies!</p>
-              </div>
-            </div>
-          </div>
-        </body>
-      </html>
-    `;
-
-    await emailService.sendBookingReminder(booking);
+  public getMetrics() {
+    return {
+      running: this.running,
+      lastRun: this.lastRun,
+      totals: { ...this.totals }
+    };
   }
 
   // Method to manually trigger reminders (for testing)
   public async sendTestReminders(): Promise<void> {
-    await this.sendDailyReminders();
-    await this.sendImmediateReminders();
+    await this.processDueReminders();
   }
 }
 
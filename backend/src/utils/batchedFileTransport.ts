@@ -0,0 +1,119 @@
+import * as fs from 'fs';
+import TransportStream from 'winston-transport';
+
+const MESSAGE = Symbol.for('message');
+
+export interface BatchedFileTransportOptions extends TransportStream.TransportStreamOptions {
+  filename: string;
+  // A batch is written when it is this old or this large, whichever comes first
+  flushIntervalMs?: number;
+  maxBatchBytes?: number;
+  // While the disk falls behind, lines beyond this are dropped (and counted)
+  maxPendingBytes?: number;
+}
+
+// Appends already-formatted lines in batches on a single non-blocking stream,
+// so a log call costs a string push instead of a write syscall. Reopens the
+// file on SIGUSR1, which logrotate.conf sends after rotating.
+export class BatchedFileTransport extends TransportStream {
+  private readonly filename: string;
+  private readonly flushIntervalMs: number;
+  private readonly maxBatchBytes: number;
+  private readonly maxPendingBytes: number;
+  private stream: fs.WriteStream;
+  private batch: string[] = [];
+  private batchBytes = 0;
+  private timer: NodeJS.Timeout | null = null;
+  private waitingForDrain = false;
+  private dropped = 0;
+
+  constructor(options: BatchedFileTransportOptions) {
+    super(options);
+    this.filename = options.filename;
+    this.flushIntervalMs = options.flushIntervalMs ?? 250;
+    this.maxBatchBytes = options.maxBatchBytes ?? 64 * 1024;
+    this.maxPendingBytes = options.maxPendingBytes ?? 8 * 1024 * 1024;
+    this.stream = this.open();
+
+    process.on('SIGUSR1', () => this.reopen());
+    // Last resort for lines still batched when the process exits
+    process.on('exit', () => this.flushSync());
+  }
+
+  private open(): fs.WriteStream {
+    const stream = fs.createWriteStream(this.filename, { flags: 'a' });
+    stream.on('drain', () => {
+      this.waitingForDrain = false;
+      this.flush();
+    });
+    stream.on('error', (error) => this.emit('warn', error));
+    return stream;
+  }
+
+  log(info: any, callback: () => void): void {
+    const line = `${info[MESSAGE]}\n`;
+    if (this.batchBytes + line.length > this.maxPendingBytes) {
+      this.dropped++;
+    } else {
+      this.batch.push(line);
+      this.batchBytes += line.length;
+    }
+
+    if (this.batchBytes >= this.maxBatchBytes) {
+      this.flush();
+    } else if (!this.timer) {
+      this.timer = setTimeout(() => this.flush(), this.flushIntervalMs);
+      this.timer.unref();
+    }
+    callback();
+  }
+
+  private takeBatch(): string {
+    if (this.dropped > 0) {
+      this.batch.push(`${JSON.stringify({
+        level: 'warn',
+        message: 'Log lines dropped while the disk was behind',
+        dropped: this.dropped,
+        timestamp: new Date().toISOString()
+      })}\n`);
+      this.dropped = 0;
+    }
+    const chunk = this.batch.join('');
+    this.batch = [];
+    this.batchBytes = 0;
+    return chunk;
+  }
+
+  flush(): void {
+    if (this.timer) {
+      clearTimeout(this.timer);
+      this.timer = null;
+    }
+    if (this.waitingForDrain || (this.batch.length === 0 && this.dropped === 0)) return;
+    if (!this.stream.write(this.takeBatch())) {
+      this.waitingForDrain = true;
+    }
+  }
+
+  private flushSync(): void {
+    if (this.batch.length === 0 && this.dropped === 0) return;
+    try {
+      fs.appendFileSync(this.filename, this.takeBatch());
+    } catch {
+      // Nowhere left to report it
+    }
+  }
+
+  reopen(): void {
+    this.flush();
+    const previous = this.stream;
+    this.waitingForDrain = false;
+    this.stream = this.open();
+    previous.end();
+  }
+
+  close(): void {
+    this.flush();
+    this.stream.end(() => this.emit('closed'));
+  }
+}
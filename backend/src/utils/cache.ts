@@ -0,0 +1,200 @@
+import * as crypto from 'crypto';
+import logger from './logger';
+import { registerMetricsSource } from './metrics';
+import { createRedisSubscriber, getRedis } from './redis';
+
+const KEY_PREFIX = 'observatory:cache:';
+const INVALIDATION_CHANNEL = 'observatory:cache-invalidate';
+// Identifies this process so it ignores its own invalidation broadcasts
+const INSTANCE_ID = crypto.randomBytes(8).toString('hex');
+
+export interface ReadThroughCacheOptions<V> {
+  maxEntries: number;
+  ttlMs: number;
+  // Entries in the shared tier may live longer than in process memory
+  sharedTtlMs?: number;
+  loader: (key: string) => Promise<V | null>;
+}
+
+interface Entry<V> {
+  value: V;
+  expiresAt: number;
+}
+
+// Map-backed LRU: a Map iterates in insertion order, so re-inserting on read
+// keeps the least recently used entry first
+export class LruTtlCache<V> {
+  private entries = new Map<string, Entry<V>>();
+  evictions = 0;
+
+  constructor(private readonly maxEntries: number, private readonly ttlMs: number) {}
+
+  get size(): number {
+    return this.entries.size;
+  }
+
+  get(key: string): V | undefined {
+    const entry = this.entries.get(key);
+    if (!entry) return undefined;
+    this.entries.delete(key);
+    if (entry.expiresAt <= Date.now()) return undefined;
+    this.entries.set(key, entry);
+    return entry.value;
+  }
+
+  set(key: string, value: V): void {
+    this.entries.delete(key);
+    this.entries.set(key, { value, expiresAt: Date.now() + this.ttlMs });
+    while (this.entries.size > this.maxEntries) {
+      this.entries.delete(this.entries.keys().next().value as string);
+      this.evictions++;
+    }
+  }
+
+  delete(key: string): void {
+    this.entries.delete(key);
+  }
+
+  clear(): void {
+    this.entries.clear();
+  }
+}
+
+const caches = new Map<string, ReadThroughCache<any>>();
+let invalidationSubscribed = false;
+
+const subscribeToInvalidations = () => {
+  if (invalidationSubscribed) return;
+  invalidationSubscribed = true;
+
+  const subscriber = createRedisSubscriber();
+  if (!subscriber) return;
+  subscriber.subscribe(INVALIDATION_CHANNEL).catch((error) => {
+    logger.warn('Cache invalidation subscribe failed', { error: error.message });
+  });
+  subscriber.on('message', (_channel: string, payload: string) => {
+    try {
+      const { origin, cache, key } = JSON.parse(payload);
+      if (origin !== INSTANCE_ID) {
+        caches.get(cache)?.invalidateLocal(key);
+      }
+    } catch {
+      // Not one of ours
+    }
+  });
+};
+
+// Process-local LRU in front of an optional Redis-compatible shared tier in
+// front of a loader. Values must survive JSON round trips to use the shared tier.
+export class ReadThroughCache<V> {
+  private local: LruTtlCache<V>;
+  private inflight = new Map<string, Promise<V | null>>();
+  // Bumped by every invalidation; a load that started before one must not store its result
+  private epoch = 0;
+  private stats = { localHits: 0, sharedHits: 0, misses: 0, loadErrors: 0, sharedErrors: 0, invalidations: 0 };
+
+  constructor(readonly name: string, private readonly options: ReadThroughCacheOptions<V>) {
+    this.local = new LruTtlCache<V>(options.maxEntries, options.ttlMs);
+    caches.set(name, this);
+  }
+
+  private sharedKey(key: string): string {
+    return `${KEY_PREFIX}${this.name}:${key}`;
+  }
+
+  async get(key: string): Promise<V | null> {
+    const cached = this.local.get(key);
+    if (cached !== undefined) {
+      this.stats.localHits++;
+      return cached;
+    }
+
+    // Concurrent misses for the same key share one load
+    let pending = this.inflight.get(key);
+    if (!pending) {
+      const load: Promise<V | null> = this.load(key).finally(() => {
+        if (this.inflight.get(key) === load) this.inflight.delete(key);
+      });
+      this.inflight.set(key, load);
+      pending = load;
+    }
+    return pending;
+  }
+
+  private async load(key: string): Promise<V | null> {
+    const epoch = this.epoch;
+    const redis = getRedis();
+    if (redis) {
+      // Connect lazily, after the environment has been loaded
+      subscribeToInvalidations();
+      try {
+        const shared = await redis.get(this.sharedKey(key));
+        if (shared !== null) {
+          const value = JSON.parse(shared) as V;
+          this.stats.sharedHits++;
+          if (epoch === this.epoch) this.local.set(key, value);
+          return value;
+        }
+      } catch {
+        this.stats.sharedErrors++;
+      }
+    }
+
+    this.stats.misses++;
+    let value: V | null;
+    try {
+      value = await this.options.loader(key);
+    } catch (error) {
+      this.stats.loadErrors++;
+      throw error;
+    }
+    // Misses are not cached, so a newly created document is visible at once
+    if (value === null || value === undefined) return null;
+    if (epoch !== this.epoch) return value;
+
+    this.local.set(key, value);
+    if (redis) {
+      redis.set(this.sharedKey(key), JSON.stringify(value), 'PX', this.options.sharedTtlMs ?? this.options.ttlMs)
+        .catch(() => { this.stats.sharedErrors++; });
+    }
+    return value;
+  }
+
+  invalidateLocal(key: string): void {
+    this.epoch++;
+    this.inflight.delete(key);
+    this.local.delete(key);
+    this.stats.invalidations++;
+  }
+
+  // Drop the key everywhere: this process, the shared tier and other replicas
+  async invalidate(key: string): Promise<void> {
+    this.invalidateLocal(key);
+    const redis = getRedis();
+    if (!redis) return;
+    try {
+      await redis.del(this.sharedKey(key));
+      await redis.publish(INVALIDATION_CHANNEL, JSON.stringify({ origin: INSTANCE_ID, cache: this.name, key }));
+    } catch {
+      this.stats.sharedErrors++;
+    }
+  }
+
+  getStats() {
+    const lookups = this.stats.localHits + this.stats.sharedHits + this.stats.misses;
+    return {
+      ...this.stats,
+      evictions: this.local.evictions,
+      size: this.local.size,
+      hitRate: lookups > 0 ? Math.round(((this.stats.localHits + this.stats.sharedHits) / lookups) * 1000) / 1000 : 0
+    };
+  }
+}
+
+registerMetricsSource('cache', () => {
+  const stats: Record<string, any> = { sharedTier: getRedis() ? getRedis()!.status : 'disabled' };
+  for (const [name, cache] of caches) {
+    stats[name] = cache.getStats();
+  }
+  return stats;
+});
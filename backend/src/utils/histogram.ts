@@ -0,0 +1,58 @@
+// Upper bounds in milliseconds; observations above the last bound land in +Inf
+export const LATENCY_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000];
+
+export interface LatencySummary {
+  count: number;
+  avg: number;
+  p50: number;
+  p95: number;
+  p99: number;
+  max: number;
+}
+
+const round = (value: number) => Math.round(value * 10) / 10;
+
+// Fixed-bucket histogram: constant memory however many requests it sees.
+// Quantiles are estimated by interpolating inside the bucket they fall in.
+export class LatencyHistogram {
+  readonly counts: number[] = new Array(LATENCY_BUCKETS_MS.length + 1).fill(0);
+  count = 0;
+  sum = 0;
+  max = 0;
+
+  observe(ms: number): void {
+    let bucket = 0;
+    while (bucket < LATENCY_BUCKETS_MS.length && ms > LATENCY_BUCKETS_MS[bucket]) bucket++;
+    this.counts[bucket]++;
+    this.count++;
+    this.sum += ms;
+    if (ms > this.max) this.max = ms;
+  }
+
+  quantile(q: number): number {
+    if (this.count === 0) return 0;
+    const rank = q * this.count;
+    let seen = 0;
+    for (let bucket = 0; bucket < this.counts.length; bucket++) {
+      if (this.counts[bucket] === 0 || seen + this.counts[bucket] < rank) {
+        seen += this.counts[bucket];
+        continue;
+      }
+      const lower = bucket === 0 ? 0 : LATENCY_BUCKETS_MS[bucket - 1];
+      const upper = bucket < LATENCY_BUCKETS_MS.length ? Math.min(LATENCY_BUCKETS_MS[bucket], this.max) : this.max;
+      return lower + (upper - lower) * ((rank - seen) / this.counts[bucket]);
+    }
+    return this.max;
+  }
+
+  summary(): LatencySummary {
+    return {
+      count: this.count,
+      avg: this.count > 0 ? round(this.sum / this.count) : 0,
+      p50: round(this.quantile(0.5)),
+      p95: round(this.quantile(0.95)),
+      p99: round(this.quantile(0.99)),
+      max: round(this.max)
+    };
+  }
+}
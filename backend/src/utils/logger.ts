@@ -1,64 +1,104 @@
 import winston from 'winston';
 import path from 'path';
 import * as fs from 'fs';
+import { Request, Response, NextFunction } from 'express';
+import { BatchedFileTransport } from './batchedFileTransport';
 
-// Create logs directory if it doesn't exist
-const logDir = process.env.LOG_DIR || (process.env.NODE_ENV === 'production' ? '/var/log/observatory-booking' : './logs');
+export type LogFormat = 'pretty' | 'compact';
 
-// Ensure log directory exists
-if (!fs.existsSync(logDir)) {
-  fs.mkdirSync(logDir, { recursive: true });
+export interface LoggerOptions {
+  format: LogFormat;
+  logDir: string;
+  level?: string;
+  console?: boolean;
 }
 
-// Custom log format
-const logFormat = winston.format.combine(
-  winston.format.timestamp({
-    format: 'YYYY-MM-DD HH:mm:ss'
-  }),
-  winston.format.errors({ stack: true }),
-  winston.format.json(),
-  winston.format.prettyPrint()
-);
-
-// Create logger instance
-const logger = winston.createLogger({
-  level: process.env.LOG_LEVEL || 'info',
-  format: logFormat,
-  defaultMeta: {
-    service: 'observatory-booking',
-    environment: process.env.NODE_ENV || 'development'
-  },
-  transports: [
+// Log directory, created by buildLogger if it doesn't exist
+const logDir = process.env.LOG_DIR || (process.env.NODE_ENV === 'production' ? '/var/log/observatory-booking' : './logs');
+
+// compact: one JSON line per record, batched into app.log (default in production)
+// pretty: indented JSON fanned out to error/combined/security logs
+const requestedFormat = process.env.LOG_FORMAT;
+export const logFormat: LogFormat = requestedFormat === 'compact' || requestedFormat === 'pretty'
+  ? requestedFormat
+  : process.env.NODE_ENV === 'production' ? 'compact' : 'pretty';
+
+// Fraction of successful requests written to the access log in compact mode;
+// client and server errors and slow requests are always written
+export const ACCESS_LOG_SAMPLE_RATE = Math.min(1, Math.max(0, parseFloat(process.env.ACCESS_LOG_SAMPLE_RATE || '0.1')));
+const SLOW_REQUEST_MS = 1000;
+
+const createTransports = (options: LoggerOptions): winston.transport[] => {
+  if (options.format === 'compact') {
+    return [new BatchedFileTransport({ filename: path.join(options.logDir, 'app.log') })];
+  }
+
+  return [
     // Write all logs to files
     new winston.transports.File({
-      filename: path.join(logDir, 'error.log'),
+      filename: path.join(options.logDir, 'error.log'),
       level: 'error',
       maxsize: 50 * 1024 * 1024, // 50MB
       maxFiles: 5
     }),
     new winston.transports.File({
-      filename: path.join(logDir, 'combined.log'),
+      filename: path.join(options.logDir, 'combined.log'),
       maxsize: 50 * 1024 * 1024, // 50MB
       maxFiles: 5
     }),
     new winston.transports.File({
-      filename: path.join(logDir, 'security.log'),
+      filename: path.join(options.logDir, 'security.log'),
       level: 'warn',
       maxsize: 50 * 1024 * 1024, // 50MB
       maxFiles: 10
     })
-  ]
-});
+  ];
+};
 
-// Add console transport in development
-if (process.env.NODE_ENV !== 'production') {
-  logger.add(new winston.transports.Console({
+export const buildLogger = (options: LoggerOptions): winston.Logger => {
+  // Ensure log directory exists
+  if (!fs.existsSync(options.logDir)) {
+    fs.mkdirSync(options.logDir, { recursive: true });
+  }
+
+  const compact = options.format === 'compact';
+  const instance = winston.createLogger({
+    level: options.level || 'info',
     format: winston.format.combine(
-      winston.format.colorize(),
-      winston.format.simple()
-    )
-  }));
-}
+      compact
+        ? winston.format.timestamp()
+        : winston.format.timestamp({ format: 'YYYY-MM-DD HH:mm:ss' }),
+      winston.format.errors({ stack: true }),
+      winston.format.json(),
+      ...(compact ? [] : [winston.format.prettyPrint()])
+    ),
+    defaultMeta: {
+      service: 'observatory-booking',
+      environment: process.env.NODE_ENV || 'development',
+      // Tells cluster workers apart in the shared file
+      ...(compact ? { pid: process.pid } : {})
+    },
+    transports: createTransports(options)
+  });
+
+  if (options.console) {
+    instance.add(new winston.transports.Console({
+      format: winston.format.combine(
+        winston.format.colorize(),
+        winston.format.simple()
+      )
+    }));
+  }
+  return instance;
+};
+
+// Create logger instance, with console output in development
+const logger = buildLogger({
+  format: logFormat,
+  logDir,
+  level: process.env.LOG_LEVEL || 'info',
+  console: process.env.NODE_ENV !== 'production'
+});
 
 // Stream interface for Morgan
 export const logStream = {
@@ -67,6 +107,36 @@ export const logStream = {
   }
 };
 
+// Structured, sampled access log used instead of Morgan in compact mode.
+// sampleRate is recorded so log analysis can scale sampled counts back up.
+export const createAccessLog = (target: winston.Logger, sampleRate: number) => {
+  return (req: Request, res: Response, next: NextFunction) => {
+    const startTime = Date.now();
+
+    res.on('finish', () => {
+      const duration = Date.now() - startTime;
+      const level = res.statusCode >= 500 ? 'error' : res.statusCode >= 400 ? 'warn' : 'info';
+      const sampled = level !== 'info' || duration >= SLOW_REQUEST_MS;
+      if (!sampled && Math.random() >= sampleRate) return;
+
+      target.log(level, 'Request', {
+        method: req.method,
+        url: req.originalUrl,
+        status: res.statusCode,
+        duration,
+        bytes: Number(res.getHeader('content-length')) || undefined,
+        ip: req.ip,
+        userAgent: req.get('User-Agent'),
+        sampleRate: sampled ? 1 : sampleRate
+      });
+    });
+
+    next();
+  };
+};
+
+export const accessLog = createAccessLog(logger, ACCESS_LOG_SAMPLE_RATE);
+
 // Performance logging utility
 export const logPerformance = (operation: string, startTime: number, metadata?: any) => {
   const duration = Date.now() - startTime;
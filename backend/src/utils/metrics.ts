@@ -1,22 +1,42 @@
 import { Request, Response, NextFunction } from 'express';
 import * as os from 'os';
+import { performance } from 'perf_hooks';
 import logger from './logger';
+import { LATENCY_BUCKETS_MS, LatencyHistogram } from './histogram';
+import { RequestTiming, createRequestTiming, dbTimeMs, runWithTiming } from './requestContext';
 
 export interface PerformanceMetrics {
   requestCount: number;
   averageResponseTime: number;
+  p95ResponseTime: number;
+  p99ResponseTime: number;
   errorRate: number;
   activeConnections: number;
   memoryUsage: NodeJS.MemoryUsage;
   uptime: number;
 }
 
+// Routes beyond this many method/route pairs share one series, bounding memory
+const MAX_ROUTE_SERIES = 200;
+const OVERFLOW_ROUTE = 'other';
+
+interface RouteStats {
+  method: string;
+  route: string;
+  total: LatencyHistogram;
+  db: LatencyHistogram;
+  handler: LatencyHistogram;
+  statusClasses: Record<string, number>;
+}
+
 class MetricsCollector {
   private requestCount = 0;
   private totalResponseTime = 0;
   private errorCount = 0;
   private activeConnections = 0;
   private startTime = Date.now();
+  private latency = new LatencyHistogram();
+  private routes = new Map<string, RouteStats>();
 
   incrementRequest() {
     this.requestCount++;
@@ -24,6 +44,52 @@ class MetricsCollector {
 
   addResponseTime(time: number) {
     this.totalResponseTime += time;
+    this.latency.observe(time);
+  }
+
+  recordRoute(method: string, route: string, statusCode: number, totalMs: number, dbMs: number) {
+    let key = `${method} ${route}`;
+    if (!this.routes.has(key) && this.routes.size >= MAX_ROUTE_SERIES) {
+      method = 'ANY';
+      route = OVERFLOW_ROUTE;
+      key = `${method} ${route}`;
+    }
+
+    let stats = this.routes.get(key);
+    if (!stats) {
+      stats = {
+        method,
+        route,
+        total: new LatencyHistogram(),
+        db: new LatencyHistogram(),
+        handler: new LatencyHistogram(),
+        statusClasses: {}
+      };
+      this.routes.set(key, stats);
+    }
+
+    stats.total.observe(totalMs);
+    stats.db.observe(dbMs);
+    stats.handler.observe(Math.max(0, totalMs - dbMs));
+    const statusClass = `${Math.floor(statusCode / 100)}xx`;
+    stats.statusClasses[statusClass] = (stats.statusClasses[statusClass] || 0) + 1;
+  }
+
+  getRouteStats(): RouteStats[] {
+    return [...this.routes.values()];
+  }
+
+  getRouteSummaries() {
+    return this.getRouteStats()
+      .sort((a, b) => b.total.count - a.total.count)
+      .map(stats => ({
+        method: stats.method,
+        route: stats.route,
+        statusClasses: stats.statusClasses,
+        latencyMs: stats.total.summary(),
+        dbMs: stats.db.summary(),
+        handlerMs: stats.handler.summary()
+      }));
   }
 
   incrementError() {
@@ -42,6 +108,8 @@ class MetricsCollector {
     return {
       requestCount: this.requestCount,
       averageResponseTime: this.requestCount > 0 ? this.totalResponseTime / this.requestCount : 0,
+      p95ResponseTime: Math.round(this.latency.quantile(0.95)),
+      p99ResponseTime: Math.round(this.latency.quantile(0.99)),
       errorRate: this.requestCount > 0 ? (this.errorCount / this.requestCount) * 100 : 0,
       activeConnections: this.activeConnections,
       memoryUsage: process.memoryUsage(),
@@ -54,22 +122,53 @@ class MetricsCollector {
     this.totalResponseTime = 0;
     this.errorCount = 0;
     this.startTime = Date.now();
+    this.latency = new LatencyHistogram();
+    this.routes.clear();
   }
 }
 
 const metricsCollector = new MetricsCollector();
 
+// Subsystems (reminders, email, caches...) publish their own counters here
+const metricsSources = new Map<string, () => Record<string, any>>();
+
+export const registerMetricsSource = (name: string, source: () => Record<string, any>) => {
+  metricsSources.set(name, source);
+};
+
+export const collectSourceMetrics = (): Record<string, any> => {
+  const collected: Record<string, any> = {};
+  for (const [name, source] of metricsSources) {
+    collected[name] = source();
+  }
+  return collected;
+};
+
+const requestTimings = new WeakMap<Response, RequestTiming>();
+
+// Route template rather than the URL, so ids don't create a series each
+const routeLabel = (req: Request): string => {
+  if (req.route?.path) return `${req.baseUrl}${req.route.path}`;
+  // Answered by router-level middleware (auth, rate limits) before any route matched
+  return req.baseUrl ? `${req.baseUrl}/*` : 'unmatched';
+};
+
 // Middleware to collect metrics
 export const collectMetrics = (req: Request, res: Response, next: NextFunction) => {
-  const startTime = Date.now();
+  const startTime = performance.now();
+  const timing = createRequestTiming();
+  requestTimings.set(res, timing);
   
   metricsCollector.incrementRequest();
   metricsCollector.incrementConnection();
 
   // Cleanup on response finish
   res.on('finish', () => {
-    const responseTime = Date.now() - startTime;
+    const responseTime = performance.now() - startTime;
+    const dbTime = dbTimeMs(timing);
+    const route = routeLabel(req);
     metricsCollector.addResponseTime(responseTime);
+    metricsCollector.recordRoute(req.method, route, res.statusCode, responseTime, dbTime);
     metricsCollector.decrementConnection();
 
     // Log slow requests
@@ -77,7 +176,9 @@ export const collectMetrics = (req: Request, res: Response, next: NextFunction)
       logger.warn('Slow request detected', {
         url: req.url,
         method: req.method,
-        responseTime,
+        route,
+        responseTime: Math.round(responseTime),
+        dbTime: Math.round(dbTime),
         userAgent: req.get('User-Agent'),
         ip: req.ip
       });
@@ -92,8 +193,94 @@ export const collectMetrics = (req: Request, res: Response, next: NextFunction)
   next();
 };
 
-// Get metrics endpoint handler
+// Attributes MongoDB time to the current request. Mounted after the body
+// parsers, whose stream callbacks would otherwise lose the async context.
+export const trackRequestContext = (req: Request, res: Response, next: NextFunction) => {
+  const timing = requestTimings.get(res);
+  if (!timing) return next();
+  runWithTiming(timing, next);
+};
+
+const escapeLabel = (value: string) => value.replace(/\\/g, '\\\\').replace(/"/g, '\\"').replace(/\n/g, '\\n');
+
+const formatLabels = (labels: Record<string, string>) =>
+  `{${Object.entries(labels).map(([name, value]) => `${name}="${escapeLabel(value)}"`).join(',')}}`;
+
+const metricName = (value: string) => value.replace(/[^a-zA-Z0-9_]/g, '_');
+
+const renderHistogram = (
+  lines: string[],
+  name: string,
+  help: string,
+  series: { labels: Record<string, string>; histogram: LatencyHistogram }[]
+) => {
+  lines.push(`# HELP ${name} ${help}`, `# TYPE ${name} histogram`);
+  for (const { labels, histogram } of series) {
+    let cumulative = 0;
+    LATENCY_BUCKETS_MS.forEach((bound, bucket) => {
+      cumulative += histogram.counts[bucket];
+      lines.push(`${name}_bucket${formatLabels({ ...labels, le: String(bound / 1000) })} ${cumulative}`);
+    });
+    lines.push(`${name}_bucket${formatLabels({ ...labels, le: '+Inf' })} ${histogram.count}`);
+    lines.push(`${name}_sum${formatLabels(labels)} ${histogram.sum / 1000}`);
+    lines.push(`${name}_count${formatLabels(labels)} ${histogram.count}`);
+  }
+};
+
+// Numeric leaves of the registered sources become gauges, e.g. observatory_email_queueDepth
+const flattenGauges = (prefix: string, value: any, gauges: [string, number][]) => {
+  if (typeof value === 'number' && Number.isFinite(value)) {
+    gauges.push([prefix, value]);
+  } else if (value && typeof value === 'object' && !Array.isArray(value)) {
+    for (const [key, child] of Object.entries(value)) {
+      flattenGauges(`${prefix}_${metricName(key)}`, child, gauges);
+    }
+  }
+};
+
+// Prometheus text exposition format (version 0.0.4)
+export const renderPrometheusMetrics = (): string => {
+  const lines: string[] = [];
+  const routes = metricsCollector.getRouteStats();
+  const series = (pick: (stats: RouteStats) => LatencyHistogram) =>
+    routes.map(stats => ({ labels: { method: stats.method, route: stats.route }, histogram: pick(stats) }));
+
+  renderHistogram(lines, 'http_request_duration_seconds', 'Time to finish the response, by route', series(s => s.total));
+  renderHistogram(lines, 'http_request_db_duration_seconds', 'Time with a MongoDB operation in flight, by route', series(s => s.db));
+  renderHistogram(lines, 'http_request_handler_duration_seconds', 'Response time not spent waiting on MongoDB, by route', series(s => s.handler));
+
+  lines.push('# HELP http_requests_total Finished requests by route and status class', '# TYPE http_requests_total counter');
+  for (const stats of routes) {
+    for (const [statusClass, count] of Object.entries(stats.statusClasses)) {
+      lines.push(`http_requests_total${formatLabels({ method: stats.method, route: stats.route, status: statusClass })} ${count}`);
+    }
+  }
+
+  const metrics = metricsCollector.getMetrics();
+  const gauges: [string, number][] = [
+    ['http_active_requests', metrics.activeConnections],
+    ['process_uptime_seconds', process.uptime()],
+    ['process_resident_memory_bytes', metrics.memoryUsage.rss],
+    ['nodejs_heap_used_bytes', metrics.memoryUsage.heapUsed]
+  ];
+  for (const [name, source] of Object.entries(collectSourceMetrics())) {
+    flattenGauges(`observatory_${metricName(name)}`, source, gauges);
+  }
+  for (const [name, value] of gauges) {
+    lines.push(`# TYPE ${name} gauge`, `${name} ${value}`);
+  }
+
+  return `${lines.join('\n')}\n`;
+};
+
+// Get metrics endpoint handler: JSON by default, Prometheus text for scrapers
+// (their Accept header prefers text/plain) or with ?format=prometheus
 export const getMetricsHandler = (req: Request, res: Response) => {
+  if (req.query.format === 'prometheus' || req.accepts(['application/json', 'text/plain']) === 'text/plain') {
+    res.type('text/plain; version=0.0.4; charset=utf-8').send(renderPrometheusMetrics());
+    return;
+  }
+
   const metrics = metricsCollector.getMetrics();
   
   // Add additional system metrics
@@ -104,7 +291,9 @@ export const getMetricsHandler = (req: Request, res: Response) => {
     platform: process.platform,
     loadAverage: os.loadavg(),
     freeMemory: os.freemem(),
-    totalMemory: process.memoryUsage().heapTotal
+    totalMemory: process.memoryUsage().heapTotal,
+    routes: metricsCollector.getRouteSummaries(),
+    ...collectSourceMetrics()
   };
 
   res.json(systemMetrics);
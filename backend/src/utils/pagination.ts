@@ -0,0 +1,46 @@
+import mongoose from 'mongoose';
+
+export const DEFAULT_PAGE_SIZE = 20;
+export const MAX_PAGE_SIZE = 100;
+
+export interface PageCursor {
+  createdAt: Date;
+  id: mongoose.Types.ObjectId;
+}
+
+// Opaque to clients: base64url of "<createdAt ms>.<_id>"
+export const encodeCursor = (doc: { createdAt: Date; _id: any }): string =>
+  Buffer.from(`${new Date(doc.createdAt).getTime()}.${doc._id}`).toString('base64url');
+
+export const decodeCursor = (cursor: string): PageCursor | null => {
+  const [ms, id] = Buffer.from(cursor, 'base64url').toString().split('.');
+  const createdAt = new Date(Number(ms));
+  if (!ms || isNaN(createdAt.getTime()) || !mongoose.isValidObjectId(id)) return null;
+  return { createdAt, id: new mongoose.Types.ObjectId(id) };
+};
+
+export const pageSize = (limit: unknown): number =>
+  Math.min(Math.max(parseInt(String(limit)) || DEFAULT_PAGE_SIZE, 1), MAX_PAGE_SIZE);
+
+// Keyset condition for documents after the cursor in (createdAt, _id) order,
+// so each page is an index range scan instead of a skip over earlier pages
+export const afterCursor = (cursor: PageCursor, direction: 1 | -1 = -1) => {
+  const op = direction === -1 ? '$lt' : '$gt';
+  return {
+    $or: [
+      { createdAt: { [op]: cursor.createdAt } },
+      { createdAt: cursor.createdAt, _id: { [op]: cursor.id } }
+    ]
+  };
+};
+
+export const cursorSort = (direction: 1 | -1 = -1): Record<string, 1 | -1> => ({ createdAt: direction, _id: direction });
+
+// Callers fetch one extra row to learn whether another page exists
+export const toPage = <T extends { createdAt: Date; _id: any }>(rows: T[], limit: number) => {
+  const items = rows.slice(0, limit);
+  return {
+    items,
+    nextCursor: rows.length > limit ? encodeCursor(items[items.length - 1]) : null
+  };
+};
@@ -0,0 +1,219 @@
+import cluster from 'cluster';
+import Redis from 'ioredis';
+import logger from './logger';
+import { getRedis } from './redis';
+
+export interface RateLimitRule {
+  windowMs: number;
+  max: number;
+}
+
+export interface RateLimitDecision {
+  allowed: boolean;
+  remaining: number;
+  // Until the bucket is full again
+  resetMs: number;
+  // Until the next request would be allowed; 0 when allowed
+  retryAfterMs: number;
+}
+
+export interface RateLimitStore {
+  readonly name: string;
+  consume(key: string, rule: RateLimitRule): Promise<RateLimitDecision>;
+  stats(): Record<string, any>;
+}
+
+// Token bucket in GCRA form: each key holds a single number, its theoretical
+// arrival time (TAT). Every request moves the TAT one emission interval
+// (windowMs / max) later; a request is refused when that would put the TAT
+// more than a window ahead of now. This allows bursts of up to `max` and then
+// a steady max-per-window, with no per-request history to store.
+export const emissionIntervalMs = (rule: RateLimitRule): number => rule.windowMs / rule.max;
+
+// `offsetMs` is how far the key's TAT is ahead of now after the request
+export const decide = (rule: RateLimitRule, allowed: boolean, offsetMs: number): RateLimitDecision => {
+  const interval = emissionIntervalMs(rule);
+  return {
+    allowed,
+    remaining: Math.max(0, Math.floor((rule.windowMs - offsetMs) / interval)),
+    resetMs: Math.max(0, Math.ceil(offsetMs)),
+    retryAfterMs: allowed ? 0 : Math.max(0, Math.ceil(offsetMs + interval - rule.windowMs))
+  };
+};
+
+// In-process store for single-node runs, and the stand-in for the shared
+// store in development and benchmarks: same arithmetic, no network hop.
+// Keys are kept in a Map in least recently used order and the oldest are
+// evicted past `maxKeys`, so memory stays bounded however many clients appear.
+export class MemoryRateLimitStore implements RateLimitStore {
+  readonly name = 'memory';
+  private tats = new Map<string, number>();
+  private evictions = 0;
+
+  constructor(private readonly maxKeys: number) {}
+
+  async consume(key: string, rule: RateLimitRule): Promise<RateLimitDecision> {
+    return this.consumeSync(key, rule, Date.now());
+  }
+
+  consumeSync(key: string, rule: RateLimitRule, now: number): RateLimitDecision {
+    const tat = Math.max(this.tats.get(key) ?? now, now);
+    const next = tat + emissionIntervalMs(rule);
+    const allowed = next - now <= rule.windowMs;
+
+    this.tats.delete(key);
+    // A TAT in the past is the same as a full bucket, so there is nothing to keep
+    if (allowed || tat > now) {
+      this.tats.set(key, allowed ? next : tat);
+    }
+    while (this.tats.size > this.maxKeys) {
+      this.tats.delete(this.tats.keys().next().value as string);
+      this.evictions++;
+    }
+    return decide(rule, allowed, (allowed ? next : tat) - now);
+  }
+
+  stats(): Record<string, any> {
+    return { trackedKeys: this.tats.size, maxKeys: this.maxKeys, evictions: this.evictions };
+  }
+}
+
+const RATE_LIMIT_REQUEST = 'observatory:rate-limit';
+const RATE_LIMIT_REPLY = 'observatory:rate-limit-reply';
+const IPC_TIMEOUT_MS = 1000;
+
+const maxKeys = (): number => parseInt(process.env.RATE_LIMIT_MAX_KEYS || '100000');
+
+// Cluster workers without Redis: the primary keeps the one MemoryRateLimitStore
+// and answers each check over IPC, so limits hold across workers instead of
+// multiplying by the worker count. Checks the primary doesn't answer in time
+// are limited by the worker's own store.
+export class ClusterRateLimitStore implements RateLimitStore {
+  readonly name = 'cluster';
+  private nextId = 0;
+  private pending = new Map<number, { resolve: (decision: RateLimitDecision) => void; timer: NodeJS.Timeout }>();
+  private fallbacks = 0;
+
+  constructor(private readonly fallback: MemoryRateLimitStore) {
+    process.on('message', (message: any) => {
+      if (!message || message.type !== RATE_LIMIT_REPLY) return;
+      const request = this.pending.get(message.id);
+      if (!request) return;
+      this.pending.delete(message.id);
+      clearTimeout(request.timer);
+      request.resolve(message.decision);
+    });
+  }
+
+  consume(key: string, rule: RateLimitRule): Promise<RateLimitDecision> {
+    return new Promise(resolve => {
+      const id = ++this.nextId;
+      const local = () => {
+        const request = this.pending.get(id);
+        if (!request) return;
+        this.pending.delete(id);
+        clearTimeout(request.timer);
+        this.fallbacks++;
+        resolve(this.fallback.consumeSync(key, rule, Date.now()));
+      };
+      this.pending.set(id, { resolve, timer: setTimeout(local, IPC_TIMEOUT_MS) });
+      const request = { type: RATE_LIMIT_REQUEST, id, key, rule: { windowMs: rule.windowMs, max: rule.max } };
+      process.send!(request, undefined, undefined, (error: Error | null) => {
+        if (error) local();
+      });
+    });
+  }
+
+  stats(): Record<string, any> {
+    return { pending: this.pending.size, fallbacks: this.fallbacks, local: this.fallback.stats() };
+  }
+}
+
+// Run in the cluster primary: answers ClusterRateLimitStore checks from every worker
+export const serveClusterRateLimits = (): void => {
+  const shared = new MemoryRateLimitStore(maxKeys());
+  cluster.on('message', (worker, message: any) => {
+    if (!message || message.type !== RATE_LIMIT_REQUEST) return;
+    const reply = {
+      type: RATE_LIMIT_REPLY,
+      id: message.id,
+      decision: shared.consumeSync(message.key, message.rule, Date.now())
+    };
+    // A worker that has just exited has no one waiting for the reply
+    worker.send(reply, () => undefined);
+  });
+};
+
+const KEY_PREFIX = 'observatory:ratelimit:';
+
+// Same algorithm, atomically on the Redis server and against its clock, so
+// replicas with drifting clocks still agree. Keys expire once their bucket has
+// refilled, so Redis only holds clients seen within the last window.
+const GCRA_SCRIPT = `
+local interval = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + tonumber(time[2]) / 1000
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then tat = now end
+local nextTat = tat + interval
+if nextTat - now > window then
+  return {0, string.format('%.3f', tat - now)}
+end
+redis.call('SET', KEYS[1], string.format('%.3f', nextTat), 'PX', math.ceil(nextTat - now))
+return {1, string.format('%.3f', nextTat - now)}
+`;
+
+type GcraRedis = Redis & {
+  rateLimitGcra(key: string, intervalMs: string, windowMs: string): Promise<[number, string]>;
+};
+
+// Shared store for multi-replica runs. While Redis is unreachable requests are
+// limited by the fallback store instead, per replica, rather than failing.
+export class RedisRateLimitStore implements RateLimitStore {
+  readonly name = 'redis';
+  private readonly redis: GcraRedis;
+  private fallbacks = 0;
+  private lastWarning = 0;
+
+  constructor(redis: Redis, private readonly fallback: RateLimitStore) {
+    redis.defineCommand('rateLimitGcra', { numberOfKeys: 1, lua: GCRA_SCRIPT });
+    this.redis = redis as GcraRedis;
+  }
+
+  async consume(key: string, rule: RateLimitRule): Promise<RateLimitDecision> {
+    try {
+      const [allowed, offset] = await this.redis.rateLimitGcra(
+        KEY_PREFIX + key,
+        String(emissionIntervalMs(rule)),
+        String(rule.windowMs)
+      );
+      return decide(rule, allowed === 1, parseFloat(offset));
+    } catch (error: any) {
+      this.fallbacks++;
+      if (Date.now() - this.lastWarning > 60000) {
+        this.lastWarning = Date.now();
+        logger.warn('Rate limit store unavailable, limiting per replica', { error: error.message });
+      }
+      return this.fallback.consume(key, rule);
+    }
+  }
+
+  stats(): Record<string, any> {
+    return { fallbacks: this.fallbacks, local: this.fallback.stats() };
+  }
+}
+
+let store: RateLimitStore | null = null;
+
+// Redis when REDIS_URL is set (RATE_LIMIT_STORE=memory opts out), else the
+// cluster primary for cluster workers, else in-process
+export const getRateLimitStore = (): RateLimitStore => {
+  if (store) return store;
+
+  const memory = new MemoryRateLimitStore(maxKeys());
+  const local = cluster.isWorker ? new ClusterRateLimitStore(memory) : memory;
+  const redis = process.env.RATE_LIMIT_STORE === 'memory' ? null : getRedis();
+  store = redis ? new RedisRateLimitStore(redis, local) : local;
+  return store;
+};
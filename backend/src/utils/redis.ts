@@ -0,0 +1,43 @@
+import Redis from 'ioredis';
+import logger from './logger';
+
+let client: Redis | null | undefined;
+const subscribers: Redis[] = [];
+
+const connect = (url: string, role: string, options: Record<string, any>): Redis => {
+  const connection = new Redis(url, options);
+  connection.on('error', (error) => {
+    logger.warn('Redis connection error', { role, error: error.message });
+  });
+  return connection;
+};
+
+// Shared Redis-compatible connection, or null when REDIS_URL is not set.
+// Commands fail fast while disconnected so callers can fall back to MongoDB.
+export const getRedis = (): Redis | null => {
+  if (client !== undefined) return client;
+
+  const url = process.env.REDIS_URL;
+  client = url
+    ? connect(url, 'client', { maxRetriesPerRequest: 1, enableOfflineQueue: false })
+    : null;
+  return client;
+};
+
+// Dedicated connection that queues commands while reconnecting. Subscriptions
+// block a connection, so each subscriber needs its own.
+export const createRedisConnection = (role: string): Redis | null => {
+  const url = process.env.REDIS_URL;
+  if (!url) return null;
+  const connection = connect(url, role, { maxRetriesPerRequest: null });
+  subscribers.push(connection);
+  return connection;
+};
+
+export const createRedisSubscriber = (): Redis | null => createRedisConnection('subscriber');
+
+export const closeRedis = async (): Promise<void> => {
+  const connections = [...subscribers.splice(0), ...(client ? [client] : [])];
+  client = undefined;
+  await Promise.all(connections.map(connection => connection.quit().catch(() => connection.disconnect())));
+};
@@ -0,0 +1,66 @@
+import { AsyncLocalStorage } from 'async_hooks';
+import { performance } from 'perf_hooks';
+import mongoose, { Schema } from 'mongoose';
+
+export interface RequestTiming {
+  // Wall time with at least one query in flight, so parallel queries count once
+  dbMs: number;
+  dbActive: number;
+  dbSince: number;
+}
+
+const requestContext = new AsyncLocalStorage<RequestTiming>();
+const TIMING = Symbol('requestTiming');
+
+// find*, countDocuments, estimatedDocumentCount, distinct, update*, delete*, replaceOne
+const QUERY_HOOKS = /^(find|countDocuments|estimatedDocumentCount|distinct|update|delete|replace)/;
+
+export const createRequestTiming = (): RequestTiming => ({ dbMs: 0, dbActive: 0, dbSince: 0 });
+
+export const runWithTiming = <T>(timing: RequestTiming, fn: () => T): T => requestContext.run(timing, fn);
+
+// DB time so far; a query still running (e.g. a streaming cursor) counts up to now
+export const dbTimeMs = (timing: RequestTiming): number =>
+  timing.dbMs + (timing.dbActive > 0 ? performance.now() - timing.dbSince : 0);
+
+// The timing is captured when the operation starts, so the post hook does not
+// depend on the driver preserving the async context
+const startDbTimer = (target: any) => {
+  const timing = requestContext.getStore();
+  if (!timing || target[TIMING]) return;
+  target[TIMING] = timing;
+  if (timing.dbActive++ === 0) timing.dbSince = performance.now();
+};
+
+const stopDbTimer = (target: any) => {
+  const timing: RequestTiming | undefined = target[TIMING];
+  if (!timing) return;
+  target[TIMING] = undefined;
+  if (--timing.dbActive === 0) timing.dbMs += performance.now() - timing.dbSince;
+};
+
+const dbTimingPlugin = (schema: Schema) => {
+  schema.pre(QUERY_HOOKS, function(this: any) { startDbTimer(this); });
+  schema.post(QUERY_HOOKS, function(this: any) { stopDbTimer(this); });
+  schema.post(QUERY_HOOKS, function(this: any, error: any, _res: any, next: (err?: any) => void) {
+    stopDbTimer(this);
+    next(error);
+  });
+
+  schema.pre('aggregate', function(this: any) { startDbTimer(this); });
+  schema.post('aggregate', function(this: any) { stopDbTimer(this); });
+  schema.post('aggregate', function(this: any, error: any, _res: any, next: (err?: any) => void) {
+    stopDbTimer(this);
+    next(error);
+  });
+
+  schema.pre('save', function(this: any) { startDbTimer(this.$locals); });
+  schema.post('save', function(this: any) { stopDbTimer(this.$locals); });
+  schema.post('save', function(this: any, error: any, _doc: any, next: (err?: any) => void) {
+    stopDbTimer(this.$locals);
+    next(error);
+  });
+};
+
+// Applies to every model compiled after this module is loaded
+mongoose.plugin(dbTimingPlugin);
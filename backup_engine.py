@@ -0,0 +1,638 @@
+#!/usr/bin/env python3
+"""
+Observatory Booking App - Incremental Backup Engine
+Content-addressed, deduplicated backups of MongoDB and application files, with checksum-verified restores
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+import logging
+
+from build_cache import format_bytes
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKUP_DIR = os.environ.get("BACKUP_DIR", "/var/backups/observatory")
+DEFAULT_MONGO_URI = "mongodb://localhost:27017/observatory-booking"
+STREAM_CHUNK_SIZE = 4 * 1024 * 1024
+FILE_CHUNK_SIZE = 1024 * 1024
+COMPRESSION_LEVEL = 6
+# A new full backup after this many incrementals keeps restore chains short
+FULL_EVERY = 7
+# Deltas start this long before the previous backup began, so writes in
+# flight while it ran are picked up again (upserts are idempotent)
+DELTA_OVERLAP = timedelta(minutes=5)
+# Collections whose documents carry a Mongoose updatedAt timestamp; the rest
+# (derived analytics rollups, anything unknown) are exported whole each time
+DELTA_COLLECTIONS = {"bookings", "users", "telescopes", "reminders"}
+IGNORED_DIRS = {"node_modules", ".git", "__pycache__", "dist", "build", ".build-cache", ".analytics-cache"}
+IGNORED_SUFFIXES = (".log",)
+DELETE_BATCH = 1000
+
+
+class ChunkStore:
+    """Content-addressed store: zlib-compressed chunks named by the SHA-256 of their contents.
+
+    zlib releases the GIL, so compression and decompression run in parallel
+    across cores on the thread pool.
+    """
+
+    def __init__(self, root: Path, workers: int = None, level: int = COMPRESSION_LEVEL):
+        self.dir = Path(root) / "chunks"
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.level = level
+        self.pool = ThreadPoolExecutor(max_workers=self.workers)
+        self._lock = threading.Lock()
+        self.bytes_read = 0
+        self.bytes_new = 0
+        self.bytes_stored = 0
+
+    def path(self, digest: str) -> Path:
+        return self.dir / digest[:2] / digest
+
+    def has(self, digest: str) -> bool:
+        return self.path(digest).exists()
+
+    def store(self, digest: str, data: bytes) -> None:
+        """Write one chunk unless an identical one is already stored"""
+        path = self.path(digest)
+        if path.exists():
+            return
+        compressed = zlib.compress(data, self.level)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{digest}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(compressed)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self.bytes_new += len(data)
+            self.bytes_stored += len(compressed)
+
+    def put_stream(self, stream: BinaryIO, chunk_size: int = STREAM_CHUNK_SIZE) -> Dict:
+        """Store a stream as it is read; compression of earlier chunks overlaps the reading"""
+        digests = []
+        whole = hashlib.sha256()
+        size = 0
+        pending = deque()
+        while True:
+            data = stream.read(chunk_size)
+            if not data:
+                break
+            whole.update(data)
+            size += len(data)
+            digest = hashlib.sha256(data).hexdigest()
+            digests.append(digest)
+            pending.append(self.pool.submit(self.store, digest, data))
+            # Bound memory to a few chunks per core
+            while len(pending) > self.workers * 2:
+                pending.popleft().result()
+        for future in pending:
+            future.result()
+        with self._lock:
+            self.bytes_read += size
+        return {"chunks": digests, "size": size, "sha256": whole.hexdigest()}
+
+    def put_bytes(self, data: bytes) -> Dict:
+        digest = hashlib.sha256(data).hexdigest()
+        self.store(digest, data)
+        with self._lock:
+            self.bytes_read += len(data)
+        return {"chunks": [digest] if data else [], "size": len(data), "sha256": digest}
+
+    def get(self, digest: str) -> bytes:
+        """A chunk's contents, checked against its name"""
+        with open(self.path(digest), "rb") as f:
+            data = zlib.decompress(f.read())
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError(f"Chunk {digest[:12]} is corrupt")
+        return data
+
+    def iter_blob(self, blob: Dict) -> Iterator[bytes]:
+        """A stored stream's contents in order, decompressed ahead in parallel and verified"""
+        whole = hashlib.sha256()
+        pending = deque()
+        digests = iter(blob["chunks"])
+        for digest in digests:
+            pending.append(self.pool.submit(self.get, digest))
+            if len(pending) >= self.workers * 2:
+                break
+        while pending:
+            data = pending.popleft().result()
+            whole.update(data)
+            yield data
+            digest = next(digests, None)
+            if digest:
+                pending.append(self.pool.submit(self.get, digest))
+        if blob["size"] and whole.hexdigest() != blob["sha256"]:
+            raise ValueError("Restored stream does not match its checksum")
+
+    def iter_lines(self, blob: Dict) -> Iterator[bytes]:
+        rest = b""
+        for data in self.iter_blob(blob):
+            lines = (rest + data).split(b"\n")
+            rest = lines.pop()
+            yield from (line for line in lines if line)
+        if rest:
+            yield rest
+
+    def all_digests(self) -> Iterator[str]:
+        if self.dir.exists():
+            for path in self.dir.glob("*/*"):
+                if not path.name.endswith(".tmp"):
+                    yield path.name
+
+    def close(self) -> None:
+        self.pool.shutdown()
+
+
+class MongoTools:
+    """MongoDB command line tools, run locally or inside the database container"""
+
+    def __init__(self, uri: str, container: str = None):
+        self.uri = uri
+        parts = urlsplit(uri)
+        self.database = parts.path.lstrip("/") or "test"
+        # mongorestore selects the database with --nsInclude rather than the URI
+        self.server_uri = urlunsplit((parts.scheme, parts.netloc, "/", parts.query, ""))
+        self.prefix = ["docker", "exec", "-i", container] if container else []
+
+    def popen(self, args: List[str], stdin=None, stdout=None) -> subprocess.Popen:
+        return subprocess.Popen(self.prefix + args, stdin=stdin, stdout=stdout)
+
+    @staticmethod
+    def wait(process: subprocess.Popen, what: str) -> None:
+        if process.wait() != 0:
+            raise RuntimeError(f"{what} exited with code {process.returncode}")
+
+    def collections(self) -> List[str]:
+        output = subprocess.run(self.prefix + ["mongosh", self.uri, "--quiet", "--eval",
+                                               "JSON.stringify(db.getCollectionNames())"],
+                                capture_output=True, text=True, check=True).stdout
+        return sorted(json.loads(output.strip().splitlines()[-1]))
+
+    def dump(self) -> subprocess.Popen:
+        return self.popen(["mongodump", "--uri", self.uri, "--archive", "--quiet"], stdout=subprocess.PIPE)
+
+    def export(self, collection: str, query: Dict = None, fields: str = None) -> subprocess.Popen:
+        args = ["mongoexport", "--uri", self.uri, "--collection", collection,
+                "--jsonFormat", "canonical", "--quiet"]
+        if query:
+            args += ["--query", json.dumps(query)]
+        if fields:
+            args += ["--fields", fields]
+        return self.popen(args, stdout=subprocess.PIPE)
+
+    def restore(self) -> subprocess.Popen:
+        return self.popen(["mongorestore", "--uri", self.server_uri, "--archive", "--drop",
+                           "--nsInclude", f"{self.database}.*", "--quiet"], stdin=subprocess.PIPE)
+
+    def import_(self, collection: str, mode: str) -> subprocess.Popen:
+        args = ["mongoimport", "--uri", self.uri, "--collection", collection, "--quiet"]
+        args += ["--drop"] if mode == "replace" else ["--mode", "upsert"]
+        return self.popen(args, stdin=subprocess.PIPE)
+
+    def script(self) -> subprocess.Popen:
+        return self.popen(["mongosh", self.uri, "--quiet"], stdin=subprocess.PIPE, stdout=subprocess.DEVNULL)
+
+
+def sorted_ids(process: subprocess.Popen) -> subprocess.Popen:
+    """Pipe an _id export through sort(1), which spills to disk for large collections"""
+    sorter = subprocess.Popen(["sort", "-u", "-S", "25%"], stdin=process.stdout, stdout=subprocess.PIPE,
+                              env={**os.environ, "LC_ALL": "C"})
+    process.stdout.close()
+    return sorter
+
+
+def removed_lines(previous: Iterator[bytes], current: Iterator[bytes]) -> Iterator[bytes]:
+    """Lines of the sorted `previous` stream missing from the sorted `current` one"""
+    current_line = next(current, None)
+    for line in previous:
+        while current_line is not None and current_line < line:
+            current_line = next(current, None)
+        if current_line != line:
+            yield line
+
+
+class BackupEngine:
+    """Snapshots of the database and file trees into a chunk store.
+
+    Every snapshot lists all files, reusing the chunks of files whose size and
+    mtime are unchanged, so restoring files needs one manifest. The database
+    is a full mongodump archive every FULL_EVERY snapshots and updatedAt
+    deltas in between; restoring it replays the chain from the last full dump.
+    """
+
+    def __init__(self, backup_dir: str = DEFAULT_BACKUP_DIR, mongo: MongoTools = None, workers: int = None):
+        self.backup_dir = Path(backup_dir)
+        self.snapshots_dir = self.backup_dir / "snapshots"
+        self.store = ChunkStore(self.backup_dir, workers)
+        self.mongo = mongo
+
+    # Snapshot manifests
+
+    def snapshot_ids(self) -> List[str]:
+        if not self.snapshots_dir.exists():
+            return []
+        return sorted(path.stem for path in self.snapshots_dir.glob("*.json"))
+
+    def load(self, snapshot_id: str) -> Dict:
+        with open(self.snapshots_dir / f"{snapshot_id}.json") as f:
+            return json.load(f)
+
+    def resolve(self, snapshot_id: str = None) -> Dict:
+        ids = self.snapshot_ids()
+        if not ids:
+            raise RuntimeError(f"No snapshots in {self.backup_dir}")
+        if not snapshot_id:
+            matches = ids[-1:]
+        elif snapshot_id in ids:
+            matches = [snapshot_id]
+        else:
+            matches = [i for i in ids if i.startswith(snapshot_id)]
+        if len(matches) != 1:
+            raise RuntimeError(f"Snapshot {snapshot_id!r} matches {len(matches)} snapshots")
+        return self.load(matches[-1])
+
+    def chain(self, manifest: Dict) -> List[Dict]:
+        """The full snapshot a manifest's database builds on, then each incremental up to it"""
+        chain = [manifest]
+        while chain[0].get("database") and chain[0]["database"]["kind"] != "full":
+            chain.insert(0, self.load(chain[0]["parent"]))
+        return chain
+
+    def _save(self, manifest: Dict) -> None:
+        self.snapshots_dir.mkdir(parents=True, exist_ok=True)
+        path = self.snapshots_dir / f"{manifest['id']}.json"
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(tmp_path, path)
+
+    # Backup
+
+    def _backup_file(self, path: Path, previous: Optional[Dict]) -> Dict:
+        stat = path.stat()
+        if previous and previous["size"] == stat.st_size and previous["mtime_ns"] == stat.st_mtime_ns:
+            return previous
+
+        digests = []
+        whole = hashlib.sha256()
+        with open(path, "rb") as f:
+            while True:
+                data = f.read(FILE_CHUNK_SIZE)
+                if not data:
+                    break
+                whole.update(data)
+                digest = hashlib.sha256(data).hexdigest()
+                self.store.store(digest, data)
+                digests.append(digest)
+        with self.store._lock:
+            self.store.bytes_read += stat.st_size
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "mode": stat.st_mode & 0o7777,
+                "sha256": whole.hexdigest(), "chunks": digests}
+
+    def _walk(self, root: Path, filtered: bool) -> Iterator[Path]:
+        """Files under root; the project tree (`filtered`) skips dependencies, build output and logs"""
+        backup_dir = self.backup_dir.resolve()
+        for directory, dirs, files in os.walk(root):
+            dirs[:] = [d for d in dirs if not (filtered and d in IGNORED_DIRS)
+                       and (Path(directory) / d).resolve() != backup_dir]
+            for name in files:
+                path = Path(directory) / name
+                if filtered and name.endswith(IGNORED_SUFFIXES):
+                    continue
+                if path.is_file() and not path.is_symlink():
+                    yield path
+
+    def backup_files(self, roots: Dict[str, Path], previous: Dict) -> Dict:
+        """Every file under the roots; files are read in parallel, one per worker"""
+        jobs = []
+        for label, root in roots.items():
+            for path in self._walk(root, filtered=label == "app"):
+                key = f"{label}/{path.relative_to(root).as_posix()}"
+                jobs.append((key, path, previous.get(key)))
+
+        entries = {}
+        with ThreadPoolExecutor(max_workers=self.store.workers) as pool:
+            futures = {key: pool.submit(self._backup_file, path, prev) for key, path, prev in jobs}
+            for key, future in futures.items():
+                try:
+                    entries[key] = future.result()
+                except OSError as e:
+                    logger.warning(f"⚠️  Skipped {key}: {e}")
+        return entries
+
+    def _id_listing(self, collection: str) -> Dict:
+        sorter = sorted_ids(self.mongo.export(collection, fields="_id"))
+        blob = self.store.put_stream(sorter.stdout)
+        MongoTools.wait(sorter, f"sorting {collection} ids")
+        return blob
+
+    def _export(self, collection: str, query: Dict = None) -> Dict:
+        process = self.mongo.export(collection, query)
+        blob = self.store.put_stream(process.stdout)
+        MongoTools.wait(process, f"mongoexport {collection}")
+        return blob
+
+    def backup_database(self, started: datetime, parent: Optional[Dict], full: bool) -> Dict:
+        collections = self.mongo.collections()
+        if full:
+            logger.info("📊 Streaming full mongodump archive into the chunk store...")
+            process = self.mongo.dump()
+            archive = self.store.put_stream(process.stdout)
+            MongoTools.wait(process, "mongodump")
+            # Listings let the next incremental see which documents were deleted
+            return {
+                "kind": "full",
+                "archive": archive,
+                "ids": {name: self._id_listing(name) for name in collections if name in DELTA_COLLECTIONS},
+            }
+
+        since = datetime.fromisoformat(parent["started"]) - DELTA_OVERLAP
+        logger.info(f"📊 Exporting changes since {since:%Y-%m-%d %H:%M:%S}Z...")
+        previous_ids = parent["database"]["ids"]
+        changes = {}
+        for name in collections:
+            if name not in DELTA_COLLECTIONS or name not in previous_ids:
+                changes[name] = {"mode": "replace", "documents": self._export(name)}
+                continue
+            # Ids first: anything written after the listing is still exported below
+            ids = self._id_listing(name)
+            upserts = self._export(name, {"updatedAt": {"$gte": {"$date": since.isoformat().replace("+00:00", "Z")}}})
+            deleted = b"".join(line + b"\n" for line in removed_lines(
+                self.store.iter_lines(previous_ids[name]), self.store.iter_lines(ids)))
+            changes[name] = {"mode": "upsert", "documents": upserts, "deleted": self.store.put_bytes(deleted),
+                             "ids": ids}
+        return {
+            "kind": "incremental",
+            "since": since.isoformat(),
+            "collections": changes,
+            "ids": {name: change.get("ids") or previous_ids[name]
+                    for name, change in changes.items() if change["mode"] == "upsert"},
+        }
+
+    def backup(self, roots: Dict[str, Path], full: bool = False, include_db: bool = True) -> Dict:
+        started = datetime.now(timezone.utc)
+        ids = self.snapshot_ids()
+        parent = self.load(ids[-1]) if ids else None
+        snapshot_id = started.strftime("%Y%m%dT%H%M%SZ")
+        if snapshot_id in ids:
+            snapshot_id += f"-{sum(i.startswith(snapshot_id) for i in ids)}"
+        manifest = {
+            "id": snapshot_id,
+            "parent": parent["id"] if parent else None,
+            "started": started.isoformat(),
+            "roots": {label: str(path) for label, path in roots.items()},
+        }
+
+        if include_db:
+            db_parent = parent if parent and parent.get("database") else None
+            chain_length = len(self.chain(db_parent)) if db_parent else 0
+            full = full or not db_parent or chain_length > FULL_EVERY
+            manifest["database"] = self.backup_database(started, db_parent, full)
+
+        logger.info(f"📁 Backing up files from {', '.join(str(path) for path in roots.values())}...")
+        manifest["files"] = self.backup_files(roots, parent.get("files", {}) if parent else {})
+
+        manifest["finished"] = datetime.now(timezone.utc).isoformat()
+        manifest["stats"] = {
+            "read": self.store.bytes_read,
+            "new": self.store.bytes_new,
+            "stored": self.store.bytes_stored,
+            "seconds": round((datetime.now(timezone.utc) - started).total_seconds(), 1),
+        }
+        self._save(manifest)
+        return manifest
+
+    # Restore and verification
+
+    def restore_database(self, manifest: Dict) -> None:
+        for step in self.chain(manifest):
+            database = step["database"]
+            if database["kind"] == "full":
+                logger.info(f"📊 Restoring full dump from {step['id']}...")
+                process = self.mongo.restore()
+                self._feed(process, self.store.iter_blob(database["archive"]), "mongorestore")
+                continue
+
+            logger.info(f"📊 Applying changes from {step['id']}...")
+            for name, change in database["collections"].items():
+                process = self.mongo.import_(name, change["mode"])
+                self._feed(process, self.store.iter_blob(change["documents"]), f"mongoimport {name}")
+                if change.get("deleted", {}).get("size"):
+                    self._delete(name, self.store.iter_lines(change["deleted"]))
+
+    def _delete(self, collection: str, id_lines: Iterator[bytes]) -> None:
+        def statements() -> Iterator[bytes]:
+            batch = []
+            for line in itertools.chain(id_lines, [None]):
+                if line is not None:
+                    batch.append(json.loads(line)["_id"])
+                if batch and (line is None or len(batch) >= DELETE_BATCH):
+                    yield (f"db.getCollection({json.dumps(collection)}).deleteMany("
+                           f"{{_id: {{$in: EJSON.deserialize({json.dumps(batch)})}}}});\n").encode()
+                    batch = []
+
+        self._feed(self.mongo.script(), statements(), f"deleting from {collection}")
+
+    @staticmethod
+    def _feed(process: subprocess.Popen, data: Iterable[bytes], what: str) -> None:
+        try:
+            for piece in data:
+                process.stdin.write(piece)
+        finally:
+            try:
+                process.stdin.close()
+            except BrokenPipeError:
+                pass
+        MongoTools.wait(process, what)
+
+    def restore_files(self, manifest: Dict, target: Path) -> int:
+        """Write every file under target/<root label>/, checking each against its checksum"""
+        def restore(key: str, entry: Dict) -> None:
+            path = target / key
+            path.parent.mkdir(parents=True, exist_ok=True)
+            whole = hashlib.sha256()
+            with open(path, "wb") as f:
+                for digest in entry["chunks"]:
+                    data = self.store.get(digest)
+                    whole.update(data)
+                    f.write(data)
+            if whole.hexdigest() != entry["sha256"]:
+                raise ValueError(f"{key} does not match its checksum")
+            os.chmod(path, entry["mode"])
+            os.utime(path, ns=(entry["mtime_ns"], entry["mtime_ns"]))
+
+        files = manifest.get("files", {})
+        with ThreadPoolExecutor(max_workers=self.store.workers) as pool:
+            for future in [pool.submit(restore, key, entry) for key, entry in files.items()]:
+                future.result()
+        return len(files)
+
+    def referenced(self, manifests: Iterable[Dict]) -> Dict[str, None]:
+        """Chunks the manifests need, in first-use order"""
+        chunks: Dict[str, None] = {}
+
+        def add(blob: Optional[Dict]) -> None:
+            for digest in (blob or {}).get("chunks", []):
+                chunks[digest] = None
+
+        for manifest in manifests:
+            database = manifest.get("database") or {}
+            add(database.get("archive"))
+            for blob in database.get("ids", {}).values():
+                add(blob)
+            for change in database.get("collections", {}).values():
+                add(change.get("documents"))
+                add(change.get("deleted"))
+                add(change.get("ids"))
+            for entry in manifest.get("files", {}).values():
+                add(entry)
+        return chunks
+
+    def verify(self, manifest: Dict, deep: bool = True) -> List[str]:
+        """Problems with the chunks a restore of this snapshot reads; empty when it is restorable"""
+        def check(digest: str) -> Optional[str]:
+            if not self.store.has(digest):
+                return f"missing chunk {digest[:12]}"
+            if deep:
+                try:
+                    self.store.get(digest)
+                except (ValueError, zlib.error) as e:
+                    return str(e)
+            return None
+
+        chunks = list(self.referenced(self.chain(manifest)))
+        return [problem for problem in self.store.pool.map(check, chunks) if problem]
+
+    def prune(self, keep_full: int) -> Tuple[int, int]:
+        """Keep the newest keep_full database chains (and every snapshot since), then drop unused chunks"""
+        manifests = [self.load(i) for i in self.snapshot_ids()]
+        fulls = [i for i, m in enumerate(manifests) if (m.get("database") or {}).get("kind") == "full"]
+        cutoff = fulls[-keep_full] if len(fulls) >= keep_full > 0 else 0
+        for manifest in manifests[:cutoff]:
+            (self.snapshots_dir / f"{manifest['id']}.json").unlink()
+
+        keep = self.referenced(manifests[cutoff:])
+        removed = 0
+        for digest in list(self.store.all_digests()):
+            if digest not in keep:
+                self.store.path(digest).unlink()
+                removed += 1
+        return cutoff, removed
+
+
+def default_roots(project_root: Path) -> Dict[str, Path]:
+    roots = {"app": Path(project_root)}
+    ssl_dir = Path("/etc/ssl/observatory")
+    if ssl_dir.is_dir():
+        roots["ssl"] = ssl_dir
+    return roots
+
+
+def describe(manifest: Dict) -> str:
+    database = manifest.get("database")
+    kind = database["kind"] if database else "files only"
+    stats = manifest.get("stats", {})
+    return (f"{manifest['id']}  {kind:<11}  {len(manifest.get('files', {})):>6} files  "
+            f"read {format_bytes(stats.get('read', 0)):>9}  new {format_bytes(stats.get('new', 0)):>9}  "
+            f"stored {format_bytes(stats.get('stored', 0)):>9}  {stats.get('seconds', 0)}s")
+
+
+def run_backup_command(command: str, project_root: Path, backup_dir: str = DEFAULT_BACKUP_DIR,
+                       mongo_uri: str = None, container: str = None, snapshot: str = None,
+                       full: bool = False, include_db: bool = True, restore_dir: str = None,
+                       keep_full: int = 4, workers: int = None, extra_paths: List[str] = ()) -> bool:
+    """backup | list | verify | prune | restore, as driven from deploy.py"""
+    mongo = MongoTools(mongo_uri or os.environ.get("MONGODB_URI", DEFAULT_MONGO_URI), container) if include_db else None
+    engine = BackupEngine(backup_dir, mongo, workers)
+    try:
+        if command == "backup":
+            roots = default_roots(project_root)
+            for extra in extra_paths:
+                label, _, path = extra.rpartition("=")
+                label = label or Path(path).name
+                if not label or label in roots:
+                    raise ValueError(f"--include {extra}: name it with LABEL=PATH, labels must be unique")
+                roots[label] = Path(path)
+            manifest = engine.backup(roots, full=full, include_db=include_db)
+            logger.info(f"✅ Snapshot {describe(manifest)}")
+            stats = manifest["stats"]
+            if stats["read"]:
+                logger.info(f"   Stored {stats['stored'] / stats['read'] * 100:.1f}% of the bytes read "
+                            f"(dedup and compression)")
+        elif command == "list":
+            for snapshot_id in engine.snapshot_ids():
+                logger.info(describe(engine.load(snapshot_id)))
+        elif command == "verify":
+            manifest = engine.resolve(snapshot)
+            started = time.time()
+            problems = engine.verify(manifest)
+            for problem in problems:
+                logger.error(f"❌ {problem}")
+            if problems:
+                return False
+            logger.info(f"✅ Snapshot {manifest['id']} verified in {time.time() - started:.1f}s")
+        elif command == "prune":
+            dropped, removed = engine.prune(keep_full)
+            logger.info(f"🧹 Dropped {dropped} snapshot(s) and {removed} unreferenced chunk(s)")
+        elif command == "restore":
+            manifest = engine.resolve(snapshot)
+            target = Path(restore_dir) if restore_dir else engine.backup_dir / "restore" / manifest["id"]
+            started = time.time()
+            if include_db and manifest.get("database"):
+                engine.restore_database(manifest)
+            restored = engine.restore_files(manifest, target)
+            logger.info(f"✅ Restored snapshot {manifest['id']} ({restored} files under {target}) "
+                        f"in {time.time() - started:.1f}s, every chunk checksum verified")
+        else:
+            logger.error(f"Unknown backup command: {command}")
+            return False
+        return True
+    except (RuntimeError, OSError, ValueError, subprocess.CalledProcessError) as e:
+        logger.error(f"❌ {command} failed: {e}")
+        return False
+    finally:
+        engine.store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental, deduplicated backups")
+    parser.add_argument("command", choices=["backup", "list", "verify", "prune", "restore"])
+    parser.add_argument("--backup-dir", default=DEFAULT_BACKUP_DIR)
+    parser.add_argument("--project-root", default=str(Path(__file__).parent))
+    parser.add_argument("--mongo-uri", help="Defaults to MONGODB_URI")
+    parser.add_argument("--mongo-container", help="Run the Mongo tools inside this container (e.g. observatory-db)")
+    parser.add_argument("--snapshot", help="Snapshot id or prefix (default: latest)")
+    parser.add_argument("--full", action="store_true", help="Take a full database dump even if a delta would do")
+    parser.add_argument("--files-only", action="store_true", help="Leave the database out")
+    parser.add_argument("--restore-dir", help="Where restored files go (default: <backup-dir>/restore/<id>)")
+    parser.add_argument("--keep-full", type=int, default=4, help="prune: full backup chains to keep")
+    parser.add_argument("--include", action="append", default=[],
+                        help="Extra directory to back up, as PATH or LABEL=PATH (restored under <restore-dir>/LABEL)")
+    parser.add_argument("--workers", type=int, help="Compression threads (default: one per CPU)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    ok = run_backup_command(args.command, Path(args.project_root), args.backup_dir, args.mongo_uri,
+                            args.mongo_container, args.snapshot, args.full, not args.files_only,
+                            args.restore_dir, args.keep_full, args.workers, args.include)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
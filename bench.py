@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+"""
+Observatory Booking App - API Benchmark Harness
+Drives concurrent load against the booking API hot paths and checks for regressions
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+import logging
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - reported when the benchmark is run
+    aiohttp = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "http://localhost:30001"
+DEFAULT_CONCURRENCY = 20
+DEFAULT_DURATION = 15.0
+DEFAULT_TOLERANCE = 0.15
+DEFAULT_BASELINE = "bench-baseline.json"
+BACKEND_START_TIMEOUT = 60.0
+SEED_USER = ("user@example.com", "user123")
+SEED_ADMIN = ("admin@observatory.com", "admin123")
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(pct / 100 * len(sorted_values))
+    return sorted_values[max(0, min(len(sorted_values), rank) - 1)]
+
+class EndpointStats:
+    """Latencies and outcomes recorded for one workload"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies: List[float] = []
+        self.statuses: Counter = Counter()
+        self.errors = 0
+        self.elapsed = 0.0
+
+    def record(self, latency_ms: float, status: Optional[int]) -> None:
+        self.latencies.append(latency_ms)
+        if status is None:
+            self.statuses["network-error"] += 1
+            self.errors += 1
+        else:
+            self.statuses[str(status)] += 1
+            if status >= 400:
+                self.errors += 1
+
+    def summary(self) -> Dict:
+        latencies = sorted(self.latencies)
+        total = len(latencies)
+        return {
+            "requests": total,
+            "rps": round(total / self.elapsed, 1) if self.elapsed else 0.0,
+            "error_rate": round(self.errors / total, 4) if total else 0.0,
+            "p50_ms": round(percentile(latencies, 50), 2),
+            "p95_ms": round(percentile(latencies, 95), 2),
+            "p99_ms": round(percentile(latencies, 99), 2),
+            "statuses": dict(self.statuses)
+        }
+
+class Workload:
+    """A request template; the callables receive the request sequence number"""
+
+    def __init__(self, name: str, method: str, path: Callable[[int], str],
+                 body: Callable[[int], Optional[Dict]] = None, token: str = None):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.body = body or (lambda i: None)
+        self.token = token
+
+class BenchmarkRunner:
+    """Runs each workload with a fixed number of concurrent workers over a pooled session"""
+
+    def __init__(self, base_url: str = DEFAULT_BASE_URL, concurrency: int = DEFAULT_CONCURRENCY,
+                 duration: float = DEFAULT_DURATION, endpoints: List[str] = None):
+        self.base_url = base_url.rstrip("/")
+        self.concurrency = concurrency
+        self.duration = duration
+        self.endpoints = endpoints
+
+    async def _login(self, session, credentials) -> str:
+        email, password = credentials
+        async with session.post(f"{self.base_url}/api/auth/login",
+                                json={"email": email, "password": password}) as response:
+            payload = await response.json()
+            if response.status != 200:
+                raise RuntimeError(f"Login as {email} failed ({response.status}): {payload}")
+            return payload["token"]
+
+    async def _workloads(self, session) -> List[Workload]:
+        user_token = await self._login(session, SEED_USER)
+        admin_token = await self._login(session, SEED_ADMIN)
+        async with session.get(f"{self.base_url}/api/telescopes") as response:
+            telescopes = [t["_id"] for t in await response.json()]
+        if not telescopes:
+            raise RuntimeError("No telescopes found - seed the database first")
+
+        tomorrow = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+        # Start far enough out, at a random hour, that repeated runs do not collide
+        slot_base = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        slot_base += timedelta(days=365, hours=random.randint(0, 24 * 365))
+
+        def booking_body(i: int) -> Dict:
+            start = slot_base + timedelta(hours=i // len(telescopes))
+            return {
+                "telescope": telescopes[i % len(telescopes)],
+                "startTime": start.isoformat(),
+                "endTime": (start + timedelta(hours=1)).isoformat(),
+                "purpose": f"Benchmark observation session #{i}"
+            }
+
+        workloads = [
+            Workload("available", "GET",
+                     lambda i: f"/api/bookings/available/{telescopes[i % len(telescopes)]}?date={tomorrow}",
+                     token=user_token),
+            Workload("create-booking", "POST", lambda i: "/api/bookings", booking_body, token=user_token),
+            Workload("analytics", "GET", lambda i: "/api/admin/analytics?period=30d", token=admin_token)
+        ]
+        if self.endpoints:
+            workloads = [w for w in workloads if w.name in self.endpoints]
+        return workloads
+
+    async def _drive(self, session, workload: Workload) -> EndpointStats:
+        stats = EndpointStats(workload.name)
+        counter = iter(range(sys.maxsize))
+        headers = {"Authorization": f"Bearer {workload.token}"} if workload.token else {}
+        deadline = time.perf_counter() + self.duration
+
+        async def worker():
+            while time.perf_counter() < deadline:
+                i = next(counter)
+                started = time.perf_counter()
+                status = None
+                try:
+                    async with session.request(workload.method, self.base_url + workload.path(i),
+                                               json=workload.body(i), headers=headers) as response:
+                        await response.read()
+                        status = response.status
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    pass
+                stats.record((time.perf_counter() - started) * 1000, status)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        stats.elapsed = time.perf_counter() - started
+        return stats
+
+    async def run(self) -> Dict[str, Dict]:
+        connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=30)
+        timeout = aiohttp.ClientTimeout(total=30)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            results = {}
+            for workload in await self._workloads(session):
+                logger.info(f"🏎️  [{workload.name}] {self.concurrency} workers for {self.duration:.0f}s...")
+                results[workload.name] = (await self._drive(session, workload)).summary()
+            return results
+
+    async def run_stress(self, slots_per_telescope: int = 4, attempts_per_slot: int = 25) -> Dict:
+        """Race many identical booking requests and verify no slot was double-booked"""
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=30)) as session:
+            token = await self._login(session, SEED_USER)
+            headers = {"Authorization": f"Bearer {token}"}
+            async with session.get(f"{self.base_url}/api/telescopes") as response:
+                telescopes = [t["_id"] for t in await response.json()]
+
+            slot_base = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+            slot_base += timedelta(days=365, hours=random.randint(0, 24 * 365))
+            # Overlapping, misaligned windows so conflicts are not only exact duplicates
+            slots = [
+                (telescope, slot_base + timedelta(minutes=30 * n))
+                for telescope in telescopes
+                for n in range(slots_per_telescope)
+            ]
+            requests = [slot for slot in slots for _ in range(attempts_per_slot)]
+            random.shuffle(requests)
+            created: Counter = Counter()
+            statuses: Counter = Counter()
+
+            async def attempt(telescope: str, start: datetime):
+                body = {
+                    "telescope": telescope,
+                    "startTime": start.isoformat(),
+                    "endTime": (start + timedelta(hours=1)).isoformat(),
+                    "purpose": "Reservation stress test session"
+                }
+                try:
+                    async with session.post(f"{self.base_url}/api/bookings", json=body, headers=headers) as response:
+                        await response.read()
+                        statuses[str(response.status)] += 1
+                        if response.status == 201:
+                            created[telescope] += 1
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    statuses["network-error"] += 1
+
+            started = time.perf_counter()
+            await asyncio.gather(*(attempt(*slot) for slot in requests))
+            elapsed = time.perf_counter() - started
+
+            # The list is paged; walk every page so no overlap can hide past the first
+            bookings = []
+            cursor = None
+            while True:
+                params = {"limit": "100", **({"cursor": cursor} if cursor else {})}
+                async with session.get(f"{self.base_url}/api/bookings", params=params, headers=headers) as response:
+                    page = await response.json()
+                    if response.status != 200:
+                        raise RuntimeError(f"Listing bookings failed ({response.status}): {page}")
+                bookings.extend(page["bookings"])
+                cursor = page["nextCursor"]
+                if not cursor:
+                    break
+
+        def parse(value: str) -> datetime:
+            return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+        window_end = slot_base + timedelta(minutes=30 * slots_per_telescope + 60)
+        overlaps = 0
+        for telescope in telescopes:
+            active = sorted(
+                (parse(b["startTime"]), parse(b["endTime"])) for b in bookings
+                if (b["telescope"]["_id"] if isinstance(b["telescope"], dict) else b["telescope"]) == telescope
+                and b["status"] in ("pending", "confirmed")
+                and slot_base <= parse(b["startTime"]) < window_end
+            )
+            overlaps += sum(1 for a, b in zip(active, active[1:]) if b[0] < a[1])
+
+        return {
+            "requests": len(requests),
+            "rps": round(len(requests) / elapsed, 1) if elapsed else 0.0,
+            "created": sum(created.values()),
+            "statuses": dict(statuses),
+            "overlaps": overlaps
+        }
+
+class LocalBackend:
+    """Seeds and starts backend/ on a local port until the with-block exits"""
+
+    def __init__(self, backend_dir: Path, port: int, seed: bool = True, entry: str = "index",
+                 env: Optional[Dict[str, str]] = None, quiet: bool = True):
+        self.backend_dir = backend_dir
+        self.port = port
+        self.seed = seed
+        self.entry = entry
+        self.env = {"DISABLE_RATE_LIMIT": "true"} if env is None else env
+        self.quiet = quiet
+        self.process: Optional[subprocess.Popen] = None
+
+    def __enter__(self) -> str:
+        env = {**os.environ, "PORT": str(self.port), **self.env}
+        if self.seed:
+            logger.info("🌱 Seeding database via src/seed.ts...")
+            subprocess.run(["npm", "run", "seed"], cwd=self.backend_dir, env=env, check=True,
+                           stdout=subprocess.DEVNULL)
+
+        command = ["node", f"dist/{self.entry}.js"] if (self.backend_dir / "dist" / f"{self.entry}.js").exists() \
+            else ["npx", "ts-node", f"src/{self.entry}.ts"]
+        logger.info(f"🚀 Starting backend: {' '.join(command)} (port {self.port})")
+        output = subprocess.DEVNULL if self.quiet else None
+        self.process = subprocess.Popen(command, cwd=self.backend_dir, env=env, start_new_session=True,
+                                        stdout=output, stderr=output)
+
+        url = f"http://localhost:{self.port}"
+        deadline = time.monotonic() + BACKEND_START_TIMEOUT
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"Backend exited with code {self.process.returncode}")
+            try:
+                with urllib.request.urlopen(f"{url}/api/health", timeout=1):
+                    return url
+            except OSError:
+                time.sleep(0.5)
+        self.__exit__(None, None, None)
+        raise RuntimeError("Backend did not become healthy in time")
+
+    def __exit__(self, *exc) -> None:
+        if self.process and self.process.poll() is None:
+            os.killpg(os.getpgid(self.process.pid), signal.SIGTERM)
+            try:
+                self.process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                os.killpg(os.getpgid(self.process.pid), signal.SIGKILL)
+
+def compare_to_baseline(results: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float) -> List[str]:
+    """Describe every metric that regressed past the tolerance"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        for metric in ("p50_ms", "p95_ms", "p99_ms"):
+            if previous[metric] and current[metric] > previous[metric] * (1 + tolerance):
+                regressions.append(f"{name}: {metric} {previous[metric]} → {current[metric]}")
+        if previous["rps"] and current["rps"] < previous["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: rps {previous['rps']} → {current['rps']}")
+        if current["error_rate"] > previous["error_rate"] + 0.01:
+            regressions.append(f"{name}: error_rate {previous['error_rate']} → {current['error_rate']}")
+    return regressions
+
+def run_stress_test(project_root: Path, base_url: str = None, concurrency: int = DEFAULT_CONCURRENCY,
+                    start_backend: bool = False, port: int = 30101) -> bool:
+    """Hammer booking creation for a few contended slots and fail on any overlap"""
+    if aiohttp is None:
+        logger.error("❌ aiohttp is required for benchmarks: pip install -r requirements.txt")
+        return False
+
+    def execute(url: str) -> Dict:
+        return asyncio.run(BenchmarkRunner(url, concurrency).run_stress())
+
+    try:
+        if start_backend:
+            with LocalBackend(Path(project_root) / "backend", port) as url:
+                result = execute(url)
+        else:
+            result = execute(base_url or DEFAULT_BASE_URL)
+    except (RuntimeError, OSError, subprocess.CalledProcessError, aiohttp.ClientError) as e:
+        logger.error(f"❌ Stress test could not run: {e}")
+        return False
+
+    logger.info(f"🔒 {result['requests']} contended booking requests at {result['rps']} req/s: "
+                f"{result['created']} created, statuses {result['statuses']}")
+    if result["overlaps"]:
+        logger.error(f"❌ {result['overlaps']} overlapping bookings were created")
+        return False
+    logger.info("✅ No overlapping bookings")
+    return True
+
+def print_results(results: Dict[str, Dict]) -> None:
+    logger.info(f"{'endpoint':<16} {'requests':>9} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'errors':>7}")
+    for name, r in results.items():
+        logger.info(f"{name:<16} {r['requests']:>9} {r['rps']:>8} {r['p50_ms']:>7}ms {r['p95_ms']:>7}ms "
+                    f"{r['p99_ms']:>7}ms {r['error_rate'] * 100:>6.1f}%")
+
+def run_benchmark(project_root: Path, base_url: str = None, concurrency: int = DEFAULT_CONCURRENCY,
+                  duration: float = DEFAULT_DURATION, baseline_path: Path = None, save_baseline: bool = False,
+                  tolerance: float = DEFAULT_TOLERANCE, start_backend: bool = False, port: int = 30101,
+                  endpoints: List[str] = None) -> bool:
+    """Run the benchmark suite and return False if it regressed past the saved baseline"""
+    if aiohttp is None:
+        logger.error("❌ aiohttp is required for benchmarks: pip install -r requirements.txt")
+        return False
+
+    baseline_path = Path(baseline_path or Path(project_root) / DEFAULT_BASELINE)
+
+    def execute(url: str) -> Dict[str, Dict]:
+        runner = BenchmarkRunner(url, concurrency, duration, endpoints)
+        return asyncio.run(runner.run())
+
+    try:
+        if start_backend:
+            with LocalBackend(Path(project_root) / "backend", port) as url:
+                results = execute(url)
+        else:
+            results = execute(base_url or DEFAULT_BASE_URL)
+    except (RuntimeError, OSError, subprocess.CalledProcessError, aiohttp.ClientError) as e:
+        logger.error(f"❌ Benchmark could not run: {e}")
+        return False
+
+    print_results(results)
+
+    if save_baseline:
+        with open(baseline_path, "w") as f:
+            json.dump(results, f, indent=2)
+        logger.info(f"💾 Baseline saved to {baseline_path}")
+        return True
+
+    if not baseline_path.exists():
+        logger.info("ℹ️  No baseline found; run with --save-baseline to record one")
+        return True
+
+    with open(baseline_path) as f:
+        regressions = compare_to_baseline(results, json.load(f), tolerance)
+    if regressions:
+        logger.error(f"❌ Performance regressed past {tolerance * 100:.0f}% tolerance:")
+        for regression in regressions:
+            logger.error(f"   {regression}")
+        return False
+
+    logger.info("✅ No regressions against baseline")
+    return True
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Observatory Booking API benchmark")
+    parser.add_argument("--url", help=f"Backend base URL (default {DEFAULT_BASE_URL})")
+    parser.add_argument("--concurrency", "-c", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--duration", "-d", type=float, default=DEFAULT_DURATION, help="Seconds per endpoint")
+    parser.add_argument("--endpoint", action="append", help="Only run this workload (repeatable)")
+    parser.add_argument("--baseline", help=f"Baseline file (default {DEFAULT_BASELINE})")
+    parser.add_argument("--save-baseline", action="store_true", help="Record results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--start-backend", action="store_true", help="Seed and start backend/ locally")
+    parser.add_argument("--port", type=int, default=30101, help="Port for --start-backend")
+    parser.add_argument("--stress", action="store_true", help="Run the booking double-booking stress test")
+    args = parser.parse_args()
+
+    if args.stress:
+        success = run_stress_test(Path(__file__).parent, args.url, args.concurrency, args.start_backend, args.port)
+        sys.exit(0 if success else 1)
+
+    success = run_benchmark(
+        Path(__file__).parent, args.url, args.concurrency, args.duration, args.baseline,
+        args.save_baseline, args.tolerance, args.start_backend, args.port, args.endpoint
+    )
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""
+Observatory Booking App - Offline Booking Analytics
+Computes /api/admin/analytics metrics from export dumps using a columnar, memory-mapped store
+"""
+
+import argparse
+import calendar
+import csv
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import logging
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - reported when the CLI is run
+    np = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = ".analytics-cache"
+DEFAULT_PERIOD = "30d"
+CHUNK_ROWS = 250_000
+STORE_VERSION = 1
+STATUSES = ["pending", "confirmed", "cancelled", "completed", "other"]
+USAGE_STATUSES = ("confirmed", "completed")
+# Same windows as GET /api/admin/analytics, plus "all"
+PERIODS = {
+    "7d": ("days", 7, "day"),
+    "30d": ("days", 30, "day"),
+    "3m": ("months", 3, "month"),
+    "1y": ("months", 12, "month"),
+    "all": (None, None, "month")
+}
+COLUMNS = {
+    "created": "int64",
+    "start": "int64",
+    "end": "int64",
+    "status": "uint8",
+    "telescope": "int32"
+}
+MS_PER_HOUR = 3_600_000
+MS_PER_DAY = 24 * MS_PER_HOUR
+
+# Raw rows as (created, start, end, status, telescope key, telescope label), dates still strings
+RawRow = Tuple[str, str, str, str, str, str]
+
+def _mongo_value(value):
+    """Unwrap mongoexport extended JSON ({"$oid": ...}, {"$date": ...})"""
+    if isinstance(value, dict):
+        if "$oid" in value:
+            return value["$oid"]
+        if "$date" in value:
+            date = value["$date"]
+            if isinstance(date, dict):
+                date = int(date.get("$numberLong", 0))
+            if isinstance(date, (int, float)):
+                return datetime.fromtimestamp(date / 1000, tz=timezone.utc).isoformat()
+            return date
+    return value
+
+def read_csv_rows(path: Path) -> Iterator[RawRow]:
+    """Rows of a /admin/export?format=csv file; telescopes are identified by name"""
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if not header:
+            return
+        index = {name: i for i, name in enumerate(header)}
+        required = ["Telescope", "Start Time", "End Time", "Status", "Created At"]
+        missing = [name for name in required if name not in index]
+        if missing:
+            raise ValueError(f"{path} is not a booking export, missing columns: {', '.join(missing)}")
+        telescope, start, end, status, created = (index[name] for name in required)
+        for row in reader:
+            if len(row) < len(header):
+                continue
+            yield row[created], row[start], row[end], row[status], row[telescope], row[telescope]
+
+def _json_row(doc) -> RawRow:
+    if not isinstance(doc, dict) or "startTime" not in doc:
+        raise ValueError("expected booking documents (NDJSON, a JSON array, or a {\"bookings\": [...]} export)")
+    telescope = doc.get("telescope")
+    if isinstance(telescope, dict) and "$oid" not in telescope:
+        key = str(_mongo_value(telescope.get("_id")) or telescope.get("name", ""))
+        label = telescope.get("name") or key
+    else:
+        key = label = str(_mongo_value(telescope) or "")
+    return (
+        _mongo_value(doc.get("createdAt")) or "",
+        _mongo_value(doc.get("startTime")) or "",
+        _mongo_value(doc.get("endTime")) or "",
+        doc.get("status") or "",
+        key,
+        label
+    )
+
+# /admin/export?format=json writes {"bookings":[...]} on a single line
+WRAPPED_EXPORT = re.compile(r'\s*\{\s*"bookings"\s*:\s*\[')
+JSON_READ_CHARS = 1 << 20
+
+def _iter_array(f, buffer: str) -> Iterator[dict]:
+    """Documents of a JSON array whose opening bracket has been consumed, decoded as the file streams in"""
+    decoder = json.JSONDecoder()
+    position = 0
+    eof = False
+    while True:
+        while position < len(buffer) and buffer[position] in " \t\r\n,":
+            position += 1
+        if position < len(buffer) and buffer[position] == "]":
+            return
+        try:
+            doc, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if eof:
+                raise ValueError("truncated or malformed JSON array")
+            more = f.read(JSON_READ_CHARS)
+            eof = not more
+            buffer = buffer[position:] + more
+            position = 0
+            continue
+        yield doc
+        position = end
+
+def read_json_rows(path: Path) -> Iterator[RawRow]:
+    """Rows of an ndjson export, a mongoexport dump, or a /admin/export?format=json document"""
+    with open(path, encoding="utf-8") as f:
+        head = f.read(JSON_READ_CHARS)
+        wrapped = WRAPPED_EXPORT.match(head)
+        if wrapped or head.lstrip().startswith("["):
+            opening = wrapped.end() if wrapped else head.index("[") + 1
+            for doc in _iter_array(f, head[opening:]):
+                yield _json_row(doc)
+            return
+
+        f.seek(0)
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line in ("[", "]"):
+                continue
+            try:
+                yield _json_row(json.loads(line.rstrip(",")))
+            except ValueError as e:
+                raise ValueError(f"{path} line {number}: {e}") from None
+
+def read_rows(path: Path) -> Iterator[RawRow]:
+    if path.suffix.lower() == ".csv":
+        return read_csv_rows(path)
+    return read_json_rows(path)
+
+def parse_timestamps(values: List[str]) -> "np.ndarray":
+    """ISO 8601 strings to UTC epoch milliseconds, vectorized where the format allows"""
+    cleaned = [value[:-1] if value.endswith("Z") else value for value in values]
+    try:
+        return np.array(cleaned, dtype="datetime64[ms]").astype(np.int64)
+    except ValueError:
+        # Explicit offsets (+02:00) are rare enough to take the slow path
+        parsed = []
+        for value in values:
+            moment = datetime.fromisoformat(value.replace("Z", "+00:00"))
+            if moment.tzinfo is None:
+                moment = moment.replace(tzinfo=timezone.utc)
+            parsed.append(int(moment.timestamp() * 1000))
+        return np.array(parsed, dtype=np.int64)
+
+def _chunks(rows: Iterable[RawRow], size: int) -> Iterator[List[RawRow]]:
+    chunk = []
+    for row in rows:
+        if row[0] and row[1] and row[2]:
+            chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+class BookingStore:
+    """Booking columns as flat binary files, memory-mapped on load"""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.meta: Dict = {}
+        self.columns: Dict[str, "np.ndarray"] = {}
+
+    @property
+    def rows(self) -> int:
+        return self.meta.get("rows", 0)
+
+    @property
+    def telescopes(self) -> List[Dict]:
+        return self.meta.get("telescopes", [])
+
+    def exists(self) -> bool:
+        meta_path = self.directory / "meta.json"
+        if not meta_path.exists():
+            return False
+        with open(meta_path) as f:
+            return json.load(f).get("version") == STORE_VERSION
+
+    def ingest(self, source: Path, chunk_rows: int = CHUNK_ROWS) -> None:
+        """Stream the source into column files, one chunk at a time"""
+        tmp_dir = self.directory.with_name(self.directory.name + ".tmp")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir(parents=True)
+
+        status_codes = {name: code for code, name in enumerate(STATUSES)}
+        telescope_codes: Dict[str, int] = {}
+        telescopes: List[Dict] = []
+        rows = 0
+        files = {name: open(tmp_dir / f"{name}.bin", "wb") for name in COLUMNS}
+        try:
+            for chunk in _chunks(read_rows(source), chunk_rows):
+                codes = []
+                for row in chunk:
+                    code = telescope_codes.get(row[4])
+                    if code is None:
+                        code = telescope_codes[row[4]] = len(telescopes)
+                        telescopes.append({"key": row[4], "name": row[5]})
+                    codes.append(code)
+
+                columns = {
+                    "created": parse_timestamps([row[0] for row in chunk]),
+                    "start": parse_timestamps([row[1] for row in chunk]),
+                    "end": parse_timestamps([row[2] for row in chunk]),
+                    "status": np.array([status_codes.get(row[3], len(STATUSES) - 1) for row in chunk],
+                                       dtype=COLUMNS["status"]),
+                    "telescope": np.array(codes, dtype=COLUMNS["telescope"])
+                }
+                for name, values in columns.items():
+                    files[name].write(values.astype(COLUMNS[name], copy=False).tobytes())
+                rows += len(chunk)
+                logger.debug(f"Ingested {rows} rows")
+        finally:
+            for f in files.values():
+                f.close()
+
+        self.meta = {"version": STORE_VERSION, "rows": rows, "telescopes": telescopes, "source": str(source)}
+        with open(tmp_dir / "meta.json", "w") as f:
+            json.dump(self.meta, f)
+        shutil.rmtree(self.directory, ignore_errors=True)
+        os.replace(tmp_dir, self.directory)
+
+    def load(self) -> "BookingStore":
+        """Map the column files read-only; nothing is parsed or copied"""
+        with open(self.directory / "meta.json") as f:
+            self.meta = json.load(f)
+        for name, dtype in COLUMNS.items():
+            if self.rows == 0:
+                self.columns[name] = np.empty(0, dtype=dtype)
+            else:
+                self.columns[name] = np.memmap(self.directory / f"{name}.bin", dtype=dtype, mode="r",
+                                               shape=(self.rows,))
+        return self
+
+def _subtract_months(moment: datetime, months: int) -> datetime:
+    month_index = moment.year * 12 + moment.month - 1 - months
+    year, month = divmod(month_index, 12)
+    day = min(moment.day, calendar.monthrange(year, month + 1)[1])
+    return moment.replace(year=year, month=month + 1, day=day)
+
+def period_start_ms(period: str, now: datetime) -> Optional[int]:
+    unit, amount, _ = PERIODS[period]
+    if unit is None:
+        return None
+    if unit == "days":
+        return int(now.timestamp() * 1000) - amount * MS_PER_DAY
+    return int(_subtract_months(now, amount).timestamp() * 1000)
+
+def compute_analytics(store: BookingStore, period: str = DEFAULT_PERIOD, now: datetime = None) -> Dict:
+    """The /api/admin/analytics payload, computed with whole-column operations"""
+    now = now or datetime.now(timezone.utc)
+    columns = store.columns
+    since = period_start_ms(period, now)
+    selected = columns["created"] >= since if since is not None else slice(None)
+
+    created = columns["created"][selected]
+    start = columns["start"][selected]
+    end = columns["end"][selected]
+    status = columns["status"][selected]
+    telescope = columns["telescope"][selected]
+
+    # Booking trends, bucketed by UTC day or month of creation
+    trend_unit = PERIODS[period][2]
+    buckets = created.astype("datetime64[ms]").astype("datetime64[D]" if trend_unit == "day" else "datetime64[M]")
+    bucket_ids = buckets.astype(np.int64)
+    trends = []
+    if len(bucket_ids):
+        offset = bucket_ids.min()
+        relative = bucket_ids - offset
+        counts = np.bincount(relative)
+        confirmed = np.bincount(relative, weights=status == STATUSES.index("confirmed"), minlength=len(counts))
+        cancelled = np.bincount(relative, weights=status == STATUSES.index("cancelled"), minlength=len(counts))
+        unit = "D" if trend_unit == "day" else "M"
+        for index in np.flatnonzero(counts):
+            trends.append({
+                "_id": str(np.datetime64(int(index + offset), unit)),
+                "count": int(counts[index]),
+                "confirmed": int(confirmed[index]),
+                "cancelled": int(cancelled[index])
+            })
+
+    status_counts = np.bincount(status, minlength=len(STATUSES))
+    breakdown = [{"_id": STATUSES[code], "count": int(count)}
+                 for code, count in enumerate(status_counts) if count]
+
+    usage = np.isin(status, [STATUSES.index(name) for name in USAGE_STATUSES])
+    usage_telescope = telescope[usage]
+    hours = (end[usage] - start[usage]) / MS_PER_HOUR
+    usage_counts = np.bincount(usage_telescope, minlength=len(store.telescopes))
+    usage_hours = np.bincount(usage_telescope, weights=hours, minlength=len(store.telescopes))
+    telescope_usage = sorted((
+        {
+            "_id": store.telescopes[code]["key"],
+            "name": store.telescopes[code]["name"],
+            "count": int(usage_counts[code]),
+            "totalHours": round(float(usage_hours[code]), 2)
+        }
+        for code in np.flatnonzero(usage_counts)
+    ), key=lambda entry: -entry["count"])
+
+    peak = np.bincount((start[usage] % MS_PER_DAY) // MS_PER_HOUR, minlength=24)
+    peak_hours = [{"_id": hour, "count": int(count)} for hour, count in enumerate(peak) if count]
+
+    return {
+        "period": period,
+        "bookings": int(len(created)),
+        "analytics": {
+            "bookingTrends": trends,
+            "statusBreakdown": breakdown,
+            "telescopeUsage": telescope_usage,
+            "peakHours": peak_hours
+        }
+    }
+
+def source_fingerprint(source: Path) -> str:
+    """Cache key from the source's identity, size and mtime, so edits invalidate it"""
+    stat = source.stat()
+    key = f"{source.resolve()}:{stat.st_size}:{stat.st_mtime_ns}:{STORE_VERSION}"
+    return hashlib.blake2b(key.encode(), digest_size=12).hexdigest()
+
+def open_store(source: Path, cache_dir: Path, rebuild: bool = False) -> Tuple[BookingStore, bool]:
+    """Load the cached store for a source, ingesting it first if needed"""
+    store = BookingStore(Path(cache_dir) / source_fingerprint(source))
+    cached = not rebuild and store.exists()
+    if not cached:
+        started = time.perf_counter()
+        logger.info(f"📥 Ingesting {source}...")
+        store.ingest(source)
+        logger.info(f"✅ Ingested {store.rows} bookings in {time.perf_counter() - started:.2f}s")
+    return store.load(), cached
+
+def print_report(result: Dict) -> None:
+    analytics = result["analytics"]
+    print(f"📊 BOOKING ANALYTICS ({result['period']}, {result['bookings']} bookings)")
+    print("-" * 50)
+
+    print("📈 Trends:")
+    for trend in analytics["bookingTrends"]:
+        print(f"  {trend['_id']:<10} {trend['count']:>8} total {trend['confirmed']:>8} confirmed "
+              f"{trend['cancelled']:>8} cancelled")
+    print()
+
+    print("📋 Status breakdown:")
+    for entry in analytics["statusBreakdown"]:
+        print(f"  {entry['_id']:<10} {entry['count']:>8}")
+    print()
+
+    print("🔭 Telescope usage:")
+    for entry in analytics["telescopeUsage"]:
+        print(f"  {entry['name']:<30} {entry['count']:>8} bookings {entry['totalHours']:>10.1f} h")
+    print()
+
+    print("🕐 Peak hours (UTC):")
+    busiest = max((entry["count"] for entry in analytics["peakHours"]), default=0)
+    for entry in analytics["peakHours"]:
+        bar = "█" * max(1, round(40 * entry["count"] / busiest))
+        print(f"  {entry['_id']:02d}:00 {entry['count']:>8} {bar}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Observatory booking analytics over export dumps")
+    parser.add_argument("source", help="Booking export (.csv, .ndjson or .json) or a mongoexport dump (.json)")
+    parser.add_argument("--period", choices=list(PERIODS), default=DEFAULT_PERIOD, help="Reporting window")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Directory for the columnar cache")
+    parser.add_argument("--rebuild", action="store_true", help="Re-ingest the source even if it is cached")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Verbose output")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        stream=sys.stderr
+    )
+
+    if np is None:
+        logger.error("❌ numpy is required for booking analytics: pip install -r requirements.txt")
+        sys.exit(1)
+
+    source = Path(args.source)
+    if not source.is_file():
+        logger.error(f"❌ Source not found: {source}")
+        sys.exit(1)
+
+    try:
+        store, cached = open_store(source, Path(args.cache_dir), rebuild=args.rebuild)
+    except (ValueError, OSError) as e:
+        logger.error(f"❌ Could not read {source}: {e}")
+        sys.exit(1)
+    if cached:
+        logger.info(f"⚡ Using cached store for {source} ({store.rows} bookings)")
+
+    started = time.perf_counter()
+    result = compute_analytics(store, args.period)
+    logger.info(f"⏱️  Computed in {(time.perf_counter() - started) * 1000:.1f}ms")
+
+    if args.json:
+        json.dump(result, sys.stdout, indent=2)
+        print()
+    else:
+        print_report(result)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Observatory Booking App - Incremental Build Cache
+Content-hash keyed cache used by deploy.py to skip unchanged build steps
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tarfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = ".build-cache"
+DEFAULT_MAX_CACHE_BYTES = 2 * 1024 ** 3  # 2GB
+IGNORED_DIRS = {"node_modules", ".git", "dist", "build", "__pycache__", ".build-cache"}
+HASH_CHUNK_SIZE = 1024 * 1024
+
+def format_bytes(size: float) -> str:
+    """Format a byte count for humans"""
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}TB"
+
+class BuildCache:
+    """Size-bounded, LRU-evicted store of build step outputs keyed by input hashes"""
+
+    def __init__(self, project_root: Path, cache_dir: Path = None, max_bytes: int = DEFAULT_MAX_CACHE_BYTES):
+        self.project_root = Path(project_root)
+        self.cache_dir = Path(cache_dir) if cache_dir else self.project_root / DEFAULT_CACHE_DIR
+        self.objects_dir = self.cache_dir / "objects"
+        self.index_path = self.cache_dir / "index.json"
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index = self._load_index()
+
+    def _load_index(self) -> Dict:
+        try:
+            with open(self.index_path) as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = {}
+        index.setdefault("entries", {})
+        index.setdefault("steps", {})
+        index.setdefault("hits", 0)
+        index.setdefault("misses", 0)
+        return index
+
+    def _save_index(self) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self._index, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.index_path)
+
+    def _iter_files(self, path: Path) -> Iterable[Path]:
+        if path.is_file():
+            yield path
+            return
+        for root, dirs, files in os.walk(path):
+            dirs[:] = sorted(d for d in dirs if d not in IGNORED_DIRS)
+            for name in sorted(files):
+                yield Path(root) / name
+
+    def compute_key(self, step: str, inputs: List[Path], command: List[str] = None) -> str:
+        """Hash a step's name, command and the contents of all its input files"""
+        digest = hashlib.sha256()
+        digest.update(step.encode())
+        digest.update(json.dumps(command or []).encode())
+
+        for input_path in sorted(Path(p) for p in inputs):
+            if not input_path.exists():
+                digest.update(f"missing:{input_path.name}".encode())
+                continue
+            for file_path in self._iter_files(input_path):
+                digest.update(str(file_path.relative_to(self.project_root)).encode())
+                digest.update(b"\0")
+                with open(file_path, "rb") as f:
+                    for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                        digest.update(chunk)
+
+        return digest.hexdigest()
+
+    def _object_path(self, key: str) -> Path:
+        return self.objects_dir / f"{key}.tar"
+
+    def restore(self, step: str, key: str, outputs: List[Path]) -> bool:
+        """Bring a step's outputs up to date from the cache, returning True on a hit"""
+        archive = None
+        with self._lock:
+            entry = self._index["entries"].get(key)
+            if not entry or not self._object_path(key).exists():
+                self._index["misses"] += 1
+                self._index["entries"].pop(key, None)
+                self._save_index()
+                return False
+
+            entry["last_used"] = time.time()
+            self._index["hits"] += 1
+            up_to_date = self._index["steps"].get(step) == key and all(Path(p).exists() for p in outputs)
+            if not up_to_date:
+                # Opened while the entry is known to exist; the open handle stays
+                # readable even if a concurrent store() evicts the object
+                archive = tarfile.open(self._object_path(key))
+            self._save_index()
+
+        # Extract outside the lock so parallel steps restore concurrently
+        if archive is not None:
+            with archive:
+                for output in outputs:
+                    if Path(output).is_dir():
+                        shutil.rmtree(output)
+                    elif Path(output).exists():
+                        Path(output).unlink()
+                if hasattr(tarfile, "data_filter"):
+                    archive.extractall(self.project_root, filter="data")
+                else:
+                    archive.extractall(self.project_root)
+            with self._lock:
+                self._index["steps"][step] = key
+                self._save_index()
+
+        logger.info(f"♻️  [{step}] inputs unchanged, "
+                    f"{'outputs already current' if up_to_date else 'restored outputs from cache'}")
+        return True
+
+    def store(self, step: str, key: str, outputs: List[Path]) -> None:
+        """Save a step's outputs under its input key and evict old entries"""
+        existing = [Path(p) for p in outputs if Path(p).exists()]
+        if len(existing) != len(outputs):
+            logger.warning(f"⚠️  [{step}] not cached: expected outputs are missing")
+            return
+
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        object_path = self._object_path(key)
+        tmp_path = object_path.with_suffix(f".tmp-{threading.get_ident()}")
+        with tarfile.open(tmp_path, "w") as archive:
+            for output in existing:
+                archive.add(output, arcname=str(output.relative_to(self.project_root)))
+        os.replace(tmp_path, object_path)
+
+        with self._lock:
+            now = time.time()
+            self._index["entries"][key] = {
+                "step": step,
+                "size": object_path.stat().st_size,
+                "created": now,
+                "last_used": now
+            }
+            self._index["steps"][step] = key
+            self._evict()
+            self._save_index()
+
+    def _evict(self) -> None:
+        entries = self._index["entries"]
+        total = sum(entry["size"] for entry in entries.values())
+        for key in sorted(entries, key=lambda k: entries[k]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            total -= entries[key]["size"]
+            self._object_path(key).unlink(missing_ok=True)
+            del entries[key]
+            for step, current in list(self._index["steps"].items()):
+                if current == key:
+                    del self._index["steps"][step]
+            logger.debug(f"Evicted cache entry {key[:12]}")
+
+    def stats(self) -> Dict:
+        """Summarize cache usage"""
+        with self._lock:
+            entries = self._index["entries"]
+            lookups = self._index["hits"] + self._index["misses"]
+            return {
+                "cache_dir": str(self.cache_dir),
+                "entries": len(entries),
+                "size_bytes": sum(entry["size"] for entry in entries.values()),
+                "max_bytes": self.max_bytes,
+                "hits": self._index["hits"],
+                "misses": self._index["misses"],
+                "hit_rate": self._index["hits"] / lookups if lookups else 0.0,
+                "steps": dict(self._index["steps"])
+            }
+
+    def clear(self) -> None:
+        """Remove every cached entry"""
+        with self._lock:
+            if self.cache_dir.exists():
+                shutil.rmtree(self.cache_dir)
+            self._index = self._load_index()
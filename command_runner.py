@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Observatory Booking App - Streaming Command Runner
+Runs build commands with live, line-by-line output and records a run report
+"""
+
+import asyncio
+import json
+import os
+import resource
+import signal
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TAIL_LINES = 200
+RSS_SAMPLE_INTERVAL = 0.25
+TERMINATE_GRACE_PERIOD = 5.0
+STREAM_LINE_LIMIT = 1024 * 1024
+
+class CommandResult:
+    """Outcome of a single command run"""
+
+    def __init__(self, command: List[str], cwd: Path, label: str, tail_lines: int = DEFAULT_TAIL_LINES):
+        self.command = command
+        self.cwd = cwd
+        self.label = label
+        self.exit_code: Optional[int] = None
+        self.duration = 0.0
+        self.peak_rss_bytes: Optional[int] = None
+        self.timed_out = False
+        self.cancelled = False
+        self.started_at = time.time()
+        self.tail: deque = deque(maxlen=tail_lines)
+
+    @property
+    def success(self) -> bool:
+        return self.exit_code == 0 and not self.timed_out and not self.cancelled
+
+    def to_dict(self) -> Dict:
+        return {
+            "label": self.label,
+            "command": self.command,
+            "cwd": str(self.cwd),
+            "exit_code": self.exit_code,
+            "success": self.success,
+            "duration_seconds": round(self.duration, 3),
+            "peak_rss_bytes": self.peak_rss_bytes,
+            "timed_out": self.timed_out,
+            "cancelled": self.cancelled,
+            "started_at": self.started_at
+        }
+
+def _process_tree_rss(pid: int) -> Optional[int]:
+    """Resident memory of a process and all its descendants, read from /proc"""
+    total = 0
+    pending = [pid]
+    seen = set()
+    while pending:
+        current = pending.pop()
+        if current in seen:
+            continue
+        seen.add(current)
+        try:
+            with open(f"/proc/{current}/statm") as f:
+                total += int(f.read().split()[1]) * resource.getpagesize()
+            for task in os.listdir(f"/proc/{current}/task"):
+                with open(f"/proc/{current}/task/{task}/children") as f:
+                    pending.extend(int(child) for child in f.read().split())
+        except (OSError, ValueError, IndexError):
+            if current == pid:
+                return None
+    return total
+
+class StreamingCommandRunner:
+    """Runs subprocesses through asyncio, streaming their output into the logger"""
+
+    def __init__(self, tail_lines: int = DEFAULT_TAIL_LINES):
+        self.tail_lines = tail_lines
+        self.results: List[CommandResult] = []
+        self._lock = threading.Lock()
+        self._running: Dict[int, asyncio.subprocess.Process] = {}
+        self._cancelled = threading.Event()
+        # Commands in flight and ever started, to tell whether a run had the
+        # process-wide child rusage to itself
+        self._active = 0
+        self._started = 0
+
+    def run(self, command: List[str], cwd: Path, label: str = None, timeout: float = None) -> CommandResult:
+        """Run a command to completion from synchronous code"""
+        label = label or f"{Path(cwd).name}:{command[0]}"
+        result = CommandResult(command, Path(cwd), label, self.tail_lines)
+        with self._lock:
+            self.results.append(result)
+
+        if self._cancelled.is_set():
+            result.cancelled = True
+            return result
+
+        try:
+            asyncio.run(self._run(result, timeout))
+        except KeyboardInterrupt:
+            result.cancelled = True
+            self.cancel()
+            raise
+        return result
+
+    async def _run(self, result: CommandResult, timeout: Optional[float]) -> None:
+        with self._lock:
+            self._active += 1
+            self._started += 1
+            started_count = self._started
+            alone = self._active == 1
+        rusage_before = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        try:
+            await self._execute(result, timeout)
+        finally:
+            with self._lock:
+                self._active -= 1
+                alone = alone and self._started == started_count
+
+        # RUSAGE_CHILDREN covers every child this process has waited for, so it
+        # only describes this command if no other one ran alongside it. ru_maxrss
+        # is in kilobytes on Linux and only grows, so it is an upper bound.
+        if result.peak_rss_bytes is None and alone:
+            rusage_after = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+            if rusage_after > rusage_before:
+                result.peak_rss_bytes = rusage_after * 1024
+
+    async def _execute(self, result: CommandResult, timeout: Optional[float]) -> None:
+        started = time.perf_counter()
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *result.command,
+                cwd=result.cwd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                limit=STREAM_LINE_LIMIT,
+                start_new_session=True
+            )
+        except OSError as e:
+            result.tail.append(str(e))
+            result.exit_code = 127
+            result.duration = time.perf_counter() - started
+            return
+
+        with self._lock:
+            self._running[process.pid] = process
+
+        sampler = asyncio.ensure_future(self._sample_rss(process.pid, result))
+
+        async def complete() -> int:
+            await asyncio.gather(
+                self._pump(process.stdout, result),
+                self._pump(process.stderr, result)
+            )
+            return await process.wait()
+
+        try:
+            result.exit_code = await asyncio.wait_for(complete(), timeout)
+        except asyncio.TimeoutError:
+            result.timed_out = True
+            logger.error(f"⏰ [{result.label}] timed out after {timeout}s")
+            result.exit_code = await self._terminate(process)
+        except asyncio.CancelledError:
+            result.cancelled = True
+            result.exit_code = await self._terminate(process)
+        finally:
+            sampler.cancel()
+            with self._lock:
+                self._running.pop(process.pid, None)
+
+        if self._cancelled.is_set() and result.exit_code != 0:
+            result.cancelled = True
+        result.duration = time.perf_counter() - started
+
+    async def _pump(self, stream: asyncio.StreamReader, result: CommandResult) -> None:
+        while True:
+            # readuntil leaves the buffer intact on an overlong line, unlike
+            # readline, which drops it and raises ValueError
+            try:
+                line = await stream.readuntil(b"\n")
+            except asyncio.IncompleteReadError as e:
+                line = e.partial
+            except asyncio.LimitOverrunError:
+                # No newline within STREAM_LINE_LIMIT (minified bundles and the
+                # like): pass it on in limit-sized pieces
+                line = await stream.read(STREAM_LINE_LIMIT)
+            if not line:
+                break
+            text = line.decode(errors="replace").rstrip()
+            if text:
+                result.tail.append(text)
+                logger.info(f"[{result.label}] {text}")
+
+    async def _sample_rss(self, pid: int, result: CommandResult) -> None:
+        while True:
+            rss = _process_tree_rss(pid)
+            if rss is not None:
+                result.peak_rss_bytes = max(result.peak_rss_bytes or 0, rss)
+            await asyncio.sleep(RSS_SAMPLE_INTERVAL)
+
+    async def _terminate(self, process: asyncio.subprocess.Process) -> int:
+        self._signal(process.pid, signal.SIGTERM)
+        try:
+            return await asyncio.wait_for(process.wait(), TERMINATE_GRACE_PERIOD)
+        except asyncio.TimeoutError:
+            self._signal(process.pid, signal.SIGKILL)
+            return await process.wait()
+
+    @staticmethod
+    def _signal(pid: int, sig: int) -> None:
+        try:
+            os.killpg(os.getpgid(pid), sig)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    def cancel(self) -> None:
+        """Stop all running commands and refuse to start new ones"""
+        self._cancelled.set()
+        with self._lock:
+            pids = list(self._running)
+        for pid in pids:
+            self._signal(pid, signal.SIGTERM)
+
+    def write_report(self, path: Path) -> None:
+        """Write a machine-readable report of every command run"""
+        with self._lock:
+            commands = [result.to_dict() for result in self.results]
+        report = {
+            "generated_at": time.time(),
+            "total_duration_seconds": round(sum(c["duration_seconds"] for c in commands), 3),
+            "failed": sum(1 for c in commands if not c["success"]),
+            "commands": commands
+        }
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"📝 Run report written to {path}")
@@ -0,0 +1,555 @@
+#!/usr/bin/env python3
+"""
+Observatory Booking App - Synthetic Data Generator
+Builds reproducible scale-test fixtures (users, telescopes, bookings) and bulk-loads them into MongoDB
+"""
+
+import argparse
+import bisect
+import hashlib
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import random
+import shutil
+import struct
+import subprocess
+import sys
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import logging
+
+try:
+    import pymongo
+    from bson import ObjectId
+except ImportError:  # pragma: no cover - mongoimport or --out is used instead
+    pymongo = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEED = 42
+DEFAULT_MONGO_URI = "mongodb://localhost:27017/observatory-booking"
+BATCH_SIZE = 10_000
+INSERT_WORKERS = 4
+# Bookings per generation block; blocks are seeded separately, so the output
+# does not depend on how many processes generate them
+BLOCK_BOOKINGS = 20_000
+
+HOUR_MS = 3_600_000
+DAY_MS = 24 * HOUR_MS
+
+# Same nightly schedule as the Telescope model default; times are generated in UTC
+NIGHT_START_HOUR = 18
+SLOT_MINUTES = 60
+SLOTS_PER_NIGHT = 12
+RESERVATION_SLOT_MINUTES = 15
+# Average bookings per telescope-night; busier cells spill into the next one
+MEAN_BOOKINGS_PER_NIGHT = 3.0
+MAX_BOOKINGS_PER_NIGHT = 10
+FUTURE_DAYS = 60
+MAX_LEAD_DAYS = 90
+
+# Fixture logins, hashed once (bcrypt, cost 12) so fixtures are byte-for-byte reproducible
+ADMIN_PASSWORD_HASH = "$2a$12$ghcGM404NkROat6Jj/yED.lBv8Eb59WApw7BmgqtaNu1oodXfszba"  # admin123
+USER_PASSWORD_HASH = "$2a$12$pz5nz6wh5QVIKW6A3uTni.md1llzNNOj2jr.5xLHNhp785wQjsmV."  # user123
+
+TELESCOPE_MODELS = [
+    ("Celestron Schmidt-Cassegrain", "14 inches (356mm)", "3910mm", "CGE Pro Computerized"),
+    ("Meade LX200 Refractor", "8 inches (203mm)", "2032mm", "LX200 Motorized Fork"),
+    ("Sky-Watcher Dobsonian", "12 inches (305mm)", "1500mm", "Dobsonian Base"),
+    ("Takahashi Apochromat", "5 inches (130mm)", "1000mm", "EM-200 Equatorial"),
+    ("PlaneWave CDK", "20 inches (508mm)", "3454mm", "L-600 Direct Drive"),
+]
+PURPOSES = [
+    "Deep sky astrophotography", "Planetary observation", "Lunar imaging", "Variable star photometry",
+    "Comet tracking", "Double star measurements", "Public outreach session", "Exoplanet transit timing",
+    "Galaxy survey", "Student lab assignment",
+]
+
+
+class Weighted:
+    """Repeated weighted draws from a fixed set of choices"""
+
+    def __init__(self, choices: List[Tuple[object, float]]):
+        self.values = [value for value, _ in choices]
+        self.cumulative = list(itertools.accumulate(weight for _, weight in choices))
+
+    def draw(self, rng: random.Random):
+        return rng.choices(self.values, cum_weights=self.cumulative)[0]
+
+
+# Slot start weights across the night (18:00..05:00): most demand around 21:00-01:00
+NIGHT_HOUR_WEIGHTS = [0.4, 0.7, 1.1, 1.6, 1.8, 1.7, 1.5, 1.1, 0.8, 0.5, 0.3, 0.2]
+DURATIONS = Weighted([(1, 0.70), (2, 0.22), (3, 0.08)])
+PAST_STATUSES = Weighted([("completed", 0.76), ("cancelled", 0.16), ("confirmed", 0.06), ("pending", 0.02)])
+FUTURE_STATUSES = Weighted([("confirmed", 0.62), ("pending", 0.31), ("cancelled", 0.07)])
+ACTIVE_STATUSES = ("pending", "confirmed")
+
+
+def utc(dt: datetime) -> datetime:
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt
+
+
+def epoch_ms(dt: datetime) -> int:
+    return int(utc(dt).timestamp() * 1000)
+
+
+# Codecs turn raw ids (12 bytes) and dates (epoch ms) into what a sink writes:
+# Extended JSON for mongoimport and files, BSON types for pymongo
+def extended_json_id(raw: bytes) -> Dict:
+    return {"$oid": raw.hex()}
+
+
+def extended_json_date(ms: int) -> Dict:
+    return {"$date": {"$numberLong": str(ms)}}
+
+
+def native_id(raw: bytes):
+    return ObjectId(raw)
+
+
+def native_date(ms: int) -> datetime:
+    return datetime.fromtimestamp(ms / 1000, timezone.utc)
+
+
+CODECS = {
+    "extended_json": (extended_json_id, extended_json_date),
+    "native": (native_id, native_date),
+}
+
+
+def encode_batch(codec: str, batch: List[Dict]):
+    """A sink's payload for one batch: JSON lines text, or the documents themselves"""
+    if codec == "extended_json":
+        return "".join(json.dumps(doc) + "\n" for doc in batch)
+    return batch
+
+
+def batched(docs: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    batch = []
+    for doc in docs:
+        batch.append(doc)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class ObjectIds:
+    """Deterministic ObjectIds: creation time, a seed-derived tag, then a counter"""
+
+    def __init__(self, seed: int, collection: str, start: int = 0):
+        self.tag = hashlib.sha1(f"{seed}:{collection}".encode()).digest()[:4]
+        self.counter = start
+
+    def next(self, created_ms: int) -> bytes:
+        self.counter += 1
+        return struct.pack(">I", created_ms // 1000) + self.tag + struct.pack(">I", self.counter)
+
+
+class FixturePlan:
+    """Sizes of a fixture with `scale` bookings"""
+
+    def __init__(self, scale: int, anchor: datetime):
+        self.scale = scale
+        self.telescopes = min(max(math.ceil(scale / 10_000), 4), 2_000)
+        self.users = min(max(scale // 25, 20), 500_000)
+        self.days = max(math.ceil(scale / (self.telescopes * MEAN_BOOKINGS_PER_NIGHT)), 30)
+        self.future_days = min(FUTURE_DAYS, self.days // 10)
+        self.anchor_ms = epoch_ms(anchor)
+        self.first_night_ms = self.anchor_ms - (self.days - self.future_days) * DAY_MS
+        # Earliest sign-up: no booking can be made before it
+        self.opened_ms = self.first_night_ms - (MAX_LEAD_DAYS + 30) * DAY_MS
+        self.block_nights = max(1, BLOCK_BOOKINGS // int(self.telescopes * MEAN_BOOKINGS_PER_NIGHT))
+
+    def describe(self) -> str:
+        first_night = datetime.fromtimestamp(self.first_night_ms / 1000, timezone.utc)
+        return (f"{self.scale:,} bookings across {self.telescopes:,} telescopes and {self.users:,} users, "
+                f"{self.days:,} nights from {first_night:%Y-%m-%d}")
+
+
+class FixtureGenerator:
+    """Fixture documents; the same seed, scale and anchor always give the same documents"""
+
+    def __init__(self, plan: FixturePlan, seed: int = DEFAULT_SEED, codec: str = "extended_json"):
+        self.plan = plan
+        self.seed = seed
+        self.codec = codec
+        # Bookable users in join order, with their join times for bisecting
+        self.user_ids: List[object] = []
+        self.user_joined: List[int] = []
+        self.telescope_ids: List[object] = []
+        # Bookings per (night, telescope) cell, night-major
+        self.cell_counts = array("B")
+
+    def users(self) -> Iterator[Dict]:
+        make_id, make_date = CODECS[self.codec]
+        rng = random.Random(f"{self.seed}:users")
+        ids = ObjectIds(self.seed, "users")
+        opened = self.plan.opened_ms
+        span = self.plan.anchor_ms - opened
+        # Sign-ups front-loaded towards the start of the history
+        joined = sorted(opened + int(span * rng.random() ** 3) for _ in range(self.plan.users - 1))
+
+        fixed = [
+            ("Observatory Admin", "admin@observatory.com", ADMIN_PASSWORD_HASH, "admin", "+1-555-0100", opened),
+            ("John Stargazer", "user@example.com", USER_PASSWORD_HASH, "user", "+1-555-0101", opened),
+        ]
+        synthetic = ((f"Observer {i + 1}", f"observer{i + 1}@scale.test", USER_PASSWORD_HASH, "user",
+                      f"+1-555-{rng.randrange(10_000):04d}", created) for i, created in enumerate(joined))
+        for name, email, password, role, phone, created in itertools.chain(fixed, synthetic):
+            raw = ids.next(created)
+            # The admin doesn't book; every other user does
+            if role == "user":
+                self.user_ids.append(raw)
+                self.user_joined.append(created)
+            yield {
+                "_id": make_id(raw), "name": name, "email": email, "password": password, "phone": phone,
+                "role": role, "isVerified": True, "createdAt": make_date(created), "updatedAt": make_date(created),
+            }
+
+    def telescopes(self) -> Iterator[Dict]:
+        make_id, make_date = CODECS[self.codec]
+        rng = random.Random(f"{self.seed}:telescopes")
+        ids = ObjectIds(self.seed, "telescopes")
+        created = self.plan.opened_ms
+        for i in range(self.plan.telescopes):
+            name, aperture, focal_length, mount = TELESCOPE_MODELS[i % len(TELESCOPE_MODELS)]
+            raw = ids.next(created)
+            self.telescope_ids.append(raw)
+            yield {
+                "_id": make_id(raw),
+                "name": f"{name} #{i + 1}",
+                "description": f"{name} with a {aperture} aperture, reserved for scale testing.",
+                "specifications": {"aperture": aperture, "focalLength": focal_length, "mountType": mount,
+                                   "accessories": ["Eyepiece set", "Finder scope"]},
+                "location": f"Observatory Dome #{i + 1}",
+                # A few retired instruments keep their history
+                "isActive": rng.random() >= 0.05,
+                "observingSchedule": {"startHour": NIGHT_START_HOUR, "slotMinutes": SLOT_MINUTES,
+                                      "slotCount": SLOTS_PER_NIGHT},
+                "createdAt": make_date(created),
+                "updatedAt": make_date(created),
+            }
+
+    def plan_bookings(self) -> int:
+        """Spread exactly `scale` bookings over the (night, telescope) cells by demand"""
+        rng = random.Random(f"{self.seed}:demand")
+        popularity = [0.6 + 0.8 * rng.random() for _ in range(self.plan.telescopes)]
+        first_night = datetime.fromtimestamp(self.plan.first_night_ms / 1000, timezone.utc)
+        past_days = self.plan.days - self.plan.future_days
+
+        weights = array("d")
+        for day in range(self.plan.days):
+            night = first_night + timedelta(days=day)
+            # Long, clear winter nights book up; summer nights are short
+            season = 1 + 0.35 * math.cos(2 * math.pi * (night.timetuple().tm_yday - 15) / 365.25)
+            weekend = 1.3 if night.weekday() in (4, 5) else 1.0
+            # Future nights are only partly booked so far
+            lead = 1 - 0.8 * (day - past_days) / FUTURE_DAYS if day >= past_days else 1.0
+            weights.extend(season * weekend * lead * p * (0.7 + 0.6 * rng.random()) for p in popularity)
+
+        # Running remainder keeps the total exact while each cell follows its weight
+        per_weight = self.plan.scale / sum(weights)
+        remaining = self.plan.scale
+        carry = 0.0
+        self.cell_counts = array("B", bytes(len(weights)))
+        for cell, weight in enumerate(weights):
+            carry += weight * per_weight
+            count = min(int(carry), MAX_BOOKINGS_PER_NIGHT, remaining)
+            if count > 0:
+                self.cell_counts[cell] = count
+                carry -= count
+                remaining -= count
+        # The rounding remainder, and anything that overflowed a full night, goes to the latest nights with room
+        for cell in range(len(weights) - 1, -1, -1):
+            if remaining == 0:
+                break
+            extra = min(MAX_BOOKINGS_PER_NIGHT - self.cell_counts[cell], remaining)
+            self.cell_counts[cell] += extra
+            remaining -= extra
+        if remaining:
+            logger.warning(f"⚠️  Nights were full: planned {self.plan.scale - remaining:,} of {self.plan.scale:,} bookings")
+        return self.plan.scale - remaining
+
+    def booking_blocks(self) -> List[Tuple[int, int, int, int]]:
+        """(block, first cell, end cell, bookings before it) for each run of nights"""
+        cells = self.plan.block_nights * self.plan.telescopes
+        blocks = []
+        before = 0
+        for block, first in enumerate(range(0, len(self.cell_counts), cells)):
+            end = min(first + cells, len(self.cell_counts))
+            blocks.append((block, first, end, before))
+            before += sum(self.cell_counts[first:end])
+        return blocks
+
+    @staticmethod
+    def _place(rng: random.Random, count: int) -> List[Tuple[int, int]]:
+        """Non-overlapping (first slot, slot count) pairs for one telescope-night"""
+        # Weighted sampling without replacement: the `count` largest u^(1/w) keys
+        keys = sorted(range(SLOTS_PER_NIGHT), key=lambda slot: -rng.random() ** (1 / NIGHT_HOUR_WEIGHTS[slot]))
+        starts = sorted(keys[:count])
+        ends = starts[1:] + [SLOTS_PER_NIGHT]
+        return [(start, min(DURATIONS.draw(rng), end - start)) for start, end in zip(starts, ends)]
+
+    def bookings_block(self, block: int, first_cell: int, end_cell: int, before: int) -> Tuple[List[Dict], Dict[str, int]]:
+        """One block's bookings, in night order, and their status counts"""
+        make_id, make_date = CODECS[self.codec]
+        rng = random.Random(f"{self.seed}:bookings:{block}")
+        ids = ObjectIds(self.seed, "bookings", start=before)
+        telescopes = self.plan.telescopes
+        anchor = self.plan.anchor_ms
+        slot_ms = SLOT_MINUTES * 60_000
+        reservation_ms = RESERVATION_SLOT_MINUTES * 60_000
+        max_lead_hours = MAX_LEAD_DAYS * 24
+        docs = []
+        statuses: Dict[str, int] = {}
+
+        for cell in range(first_cell, end_cell):
+            count = self.cell_counts[cell]
+            if count == 0:
+                continue
+            day, t = divmod(cell, telescopes)
+            telescope = make_id(self.telescope_ids[t])
+            night = self.plan.first_night_ms + day * DAY_MS + NIGHT_START_HOUR * HOUR_MS
+            for first_slot, length in self._place(rng, count):
+                start = night + first_slot * slot_ms
+                end = start + length * slot_ms
+                # Booked a few hours to a few weeks ahead, never after the anchor
+                lead_hours = min(2 + rng.expovariate(1 / 240), max_lead_hours)
+                created = min(start - int(lead_hours * HOUR_MS), anchor - rng.randrange(1_000, DAY_MS))
+                status = (FUTURE_STATUSES if start >= anchor else PAST_STATUSES).draw(rng)
+                past = end <= anchor
+                # Power-law activity among users who had joined by then: early members book most
+                joined = max(bisect.bisect_right(self.user_joined, created), 1)
+                doc = {
+                    "_id": make_id(ids.next(created)),
+                    "user": make_id(self.user_ids[int(joined * rng.random() ** 2)]),
+                    "telescope": telescope,
+                    "startTime": make_date(start),
+                    "endTime": make_date(end),
+                    "purpose": PURPOSES[int(rng.random() * len(PURPOSES))],
+                    "status": status,
+                    "reminderSent": past and status != "cancelled",
+                    "immediateReminderSent": past and status != "cancelled",
+                    "createdAt": make_date(created),
+                    "updatedAt": make_date(end if past and status == "completed" else created),
+                }
+                if rng.random() < 0.1:
+                    doc["notes"] = "Requesting assistance with camera setup."
+                # Active bookings hold their reservation slots, as Booking's save hook would set
+                if status in ACTIVE_STATUSES:
+                    doc["slots"] = [make_date(slot) for slot in range(start, end, reservation_ms)]
+                statuses[status] = statuses.get(status, 0) + 1
+                docs.append(doc)
+        return docs, statuses
+
+
+# Set in each generator process by the pool initializer
+_block_generator: Optional[FixtureGenerator] = None
+
+
+def _init_block_worker(generator: FixtureGenerator) -> None:
+    global _block_generator
+    _block_generator = generator
+
+
+def _encode_block(block: Tuple[int, int, int, int]) -> Tuple[object, int, Dict[str, int]]:
+    docs, statuses = _block_generator.bookings_block(*block)
+    return encode_batch(_block_generator.codec, docs), len(docs), statuses
+
+
+class Sink:
+    """Where generated collections go; load() takes (payload, documents) pairs and returns the count written"""
+
+    name = "sink"
+    codec = "extended_json"
+
+    def load(self, collection: str, payloads: Iterable[Tuple[object, int]]) -> int:
+        raise NotImplementedError
+
+    def drop(self, collection: str) -> None:
+        pass
+
+
+class FileSink(Sink):
+    """One Extended JSON lines file per collection, for mongoimport elsewhere"""
+
+    name = "files"
+
+    def __init__(self, out_dir: Path):
+        self.out_dir = Path(out_dir)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+
+    def load(self, collection: str, payloads: Iterable[Tuple[object, int]]) -> int:
+        written = 0
+        with open(self.out_dir / f"{collection}.jsonl", "w") as f:
+            for text, count in payloads:
+                f.write(text)
+                written += count
+        return written
+
+
+class MongoImportSink(Sink):
+    """Streams Extended JSON lines into mongoimport, which inserts with parallel workers"""
+
+    name = "mongoimport"
+
+    def __init__(self, uri: str, workers: int = INSERT_WORKERS):
+        self.uri = uri
+        self.workers = workers
+
+    def load(self, collection: str, payloads: Iterable[Tuple[object, int]]) -> int:
+        command = ["mongoimport", "--uri", self.uri, "--collection", collection, "--type", "json",
+                   "--mode", "insert", "--drop", "--numInsertionWorkers", str(self.workers), "--quiet"]
+        process = subprocess.Popen(command, stdin=subprocess.PIPE)
+        written = 0
+        try:
+            for text, count in payloads:
+                process.stdin.write(text.encode())
+                written += count
+        except BrokenPipeError:
+            pass
+        finally:
+            try:
+                process.stdin.close()
+            except BrokenPipeError:
+                pass
+        if process.wait() != 0:
+            raise RuntimeError(f"mongoimport exited with code {process.returncode} loading {collection}")
+        return written
+
+    def drop(self, collection: str) -> None:
+        # --drop with no input leaves the collection empty
+        self.load(collection, [])
+
+
+class PyMongoSink(Sink):
+    """Unordered insertMany batches, several in flight while the next ones are generated"""
+
+    name = "pymongo"
+    codec = "native"
+
+    def __init__(self, uri: str, workers: int = INSERT_WORKERS):
+        self.client = pymongo.MongoClient(uri)
+        self.db = self.client.get_default_database()
+        self.workers = workers
+
+    def load(self, collection: str, payloads: Iterable[Tuple[object, int]]) -> int:
+        target = self.db[collection]
+        target.drop()
+        written = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            pending = []
+            for docs, _ in payloads:
+                for batch in batched(docs, BATCH_SIZE):
+                    pending.append(pool.submit(target.insert_many, batch, ordered=False))
+                # Bound memory: wait for older batches before generating too far ahead
+                while len(pending) >= self.workers * 2:
+                    written += len(pending.pop(0).result().inserted_ids)
+            written += sum(len(future.result().inserted_ids) for future in pending)
+        return written
+
+    def drop(self, collection: str) -> None:
+        self.db[collection].drop()
+
+
+def choose_sink(uri: str, out_dir: Optional[Path] = None, workers: int = INSERT_WORKERS) -> Sink:
+    if out_dir:
+        return FileSink(out_dir)
+    if shutil.which("mongoimport"):
+        return MongoImportSink(uri, workers)
+    if pymongo is not None:
+        return PyMongoSink(uri, workers)
+    raise RuntimeError("Loading needs mongoimport on PATH or pymongo installed (pip install pymongo); "
+                       "use --out to write files instead")
+
+
+def generate_fixture(scale: int, sink: Sink, seed: int = DEFAULT_SEED, anchor: datetime = None,
+                     processes: int = None) -> Dict:
+    """Generate and load a fixture; returns a summary of what was written"""
+    anchor = utc(anchor or datetime.now(timezone.utc)).replace(hour=0, minute=0, second=0, microsecond=0)
+    plan = FixturePlan(scale, anchor)
+    generator = FixtureGenerator(plan, seed, sink.codec)
+    processes = max(1, processes or os.cpu_count() or 1)
+    logger.info(f"🌌 Generating {plan.describe()} (seed {seed}, anchor {anchor:%Y-%m-%d}) via {sink.name}")
+
+    def small(docs: Iterator[Dict]) -> Iterator[Tuple[object, int]]:
+        return ((encode_batch(sink.codec, batch), len(batch)) for batch in batched(docs, BATCH_SIZE))
+
+    started = time.time()
+    counts = {
+        "users": sink.load("users", small(generator.users())),
+        "telescopes": sink.load("telescopes", small(generator.telescopes())),
+    }
+    logger.info(f"   Loaded {counts['users']:,} users and {counts['telescopes']:,} telescopes")
+
+    booking_started = time.time()
+    generator.plan_bookings()
+    blocks = generator.booking_blocks()
+    statuses: Dict[str, int] = {}
+
+    def payloads(results: Iterable[Tuple[object, int, Dict[str, int]]]) -> Iterator[Tuple[object, int]]:
+        for payload, count, block_statuses in results:
+            for status, n in block_statuses.items():
+                statuses[status] = statuses.get(status, 0) + n
+            yield payload, count
+
+    if processes == 1:
+        _init_block_worker(generator)
+        counts["bookings"] = sink.load("bookings", payloads(map(_encode_block, blocks)))
+    else:
+        with multiprocessing.Pool(processes, initializer=_init_block_worker, initargs=(generator,)) as pool:
+            # imap keeps block order, so the output is the same for any process count
+            counts["bookings"] = sink.load("bookings", payloads(pool.imap(_encode_block, blocks)))
+    booking_seconds = time.time() - booking_started
+
+    # Derived from the old bookings; the backend rebuilds them from the new ones
+    for derived in ("reminders", "analyticsrollups"):
+        sink.drop(derived)
+
+    elapsed = time.time() - started
+    logger.info(f"✅ Loaded {counts['bookings']:,} bookings in {booking_seconds:.1f}s "
+                f"({counts['bookings'] / max(booking_seconds, 1e-9):,.0f} docs/s, {processes} generator process(es)), "
+                f"{elapsed:.1f}s total")
+    logger.info("   Status mix: " + ", ".join(f"{status} {n:,}" for status, n in sorted(statuses.items())))
+    return {
+        "scale": scale,
+        "seed": seed,
+        "anchor": anchor.strftime("%Y-%m-%d"),
+        "counts": counts,
+        "statuses": statuses,
+        "seconds": round(elapsed, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a reproducible scale-test fixture")
+    parser.add_argument("scale", type=int, help="Number of bookings (10^4 to 10^7)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Random seed")
+    parser.add_argument("--anchor", help="Date treated as today, YYYY-MM-DD (default: today, UTC)")
+    parser.add_argument("--mongo-uri", default=os.environ.get("MONGODB_URI", DEFAULT_MONGO_URI))
+    parser.add_argument("--processes", type=int, help="Generator processes (default: one per CPU)")
+    parser.add_argument("--workers", type=int, default=INSERT_WORKERS, help="Parallel insert workers")
+    parser.add_argument("--out", help="Write Extended JSON lines files here instead of loading")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    anchor = datetime.strptime(args.anchor, "%Y-%m-%d") if args.anchor else None
+    try:
+        sink = choose_sink(args.mongo_uri, Path(args.out) if args.out else None, args.workers)
+        generate_fixture(args.scale, sink, args.seed, anchor, args.processes)
+    except (RuntimeError, OSError) as e:
+        logger.error(f"❌ {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
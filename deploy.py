@@ -7,42 +7,84 @@ A Python script to help with deployment tasks across different platforms
 import os
 import sys
 import json
-import subprocess
+import socket
 import argparse
+import threading
+import time
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
 import logging
 
+from backup_engine import DEFAULT_BACKUP_DIR, run_backup_command
+from bench import DEFAULT_CONCURRENCY, DEFAULT_DURATION, LocalBackend, run_benchmark, run_stress_test
+from build_cache import BuildCache, DEFAULT_MAX_CACHE_BYTES, format_bytes
+from command_runner import StreamingCommandRunner
+from datagen import DEFAULT_MONGO_URI, DEFAULT_SEED, choose_sink, generate_fixture
+from tree_sync import sync_tree
+from wp_packager import WordPressPackager
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+DEFAULT_BUILD_JOBS = 4
+DEFAULT_CLUSTER_PORT = 30001
+# The redis service in docker-compose.yml, as seen from the host
+DEFAULT_REDIS_URL = "redis://localhost:6379"
+REDIS_START_TIMEOUT = 30.0
+CAP_SYNC_STAMP = ".cap-synced"
+
+class BuildStep:
+    """A single node of the build graph"""
+
+    def __init__(self, name: str, func: Callable[[], bool], deps: Iterable[str] = ()):
+        self.name = name
+        self.func = func
+        self.deps = list(deps)
+        self.duration = 0.0
+        self.success: Optional[bool] = None
+
 class ObservatoryDeployer:
     """Main deployment class for Observatory Booking App"""
     
-    def __init__(self, project_root: str = None):
+    def __init__(self, project_root: str = None, jobs: int = None, use_cache: bool = True,
+                 cache_size: int = DEFAULT_MAX_CACHE_BYTES, command_timeout: float = None,
+                 hardlink_assets: bool = False):
         self.project_root = Path(project_root) if project_root else Path(__file__).parent
+        self.jobs = max(1, jobs or DEFAULT_BUILD_JOBS)
         self.backend_dir = self.project_root / "backend"
         self.frontend_dir = self.project_root / "frontend"
         self.mobile_dir = self.project_root / "mobile"
         self.wordpress_dir = self.project_root / "wordpress-plugin"
+        self.cache = BuildCache(self.project_root, max_bytes=cache_size) if use_cache else None
+        self.runner = StreamingCommandRunner()
+        self.command_timeout = command_timeout
+        self.hardlink_assets = hardlink_assets
+        self._step_context = threading.local()
         
-    def run_command(self, command: List[str], cwd: Path = None) -> bool:
-        """Execute a shell command and return success status"""
-        try:
-            result = subprocess.run(
-                command, 
-                cwd=cwd or self.project_root, 
-                check=True, 
-                capture_output=True, 
-                text=True
-            )
-            logger.info(f"✅ Command succeeded: {' '.join(command)}")
+    def run_command(self, command: List[str], cwd: Path = None, timeout: float = None) -> bool:
+        """Execute a shell command, streaming its output, and return success status"""
+        result = self.runner.run(
+            command,
+            cwd=cwd or self.project_root,
+            label=getattr(self._step_context, "name", None),
+            timeout=timeout or self.command_timeout
+        )
+        
+        if result.success:
+            logger.info(f"✅ Command succeeded: {' '.join(command)} ({result.duration:.1f}s)")
             return True
-        except subprocess.CalledProcessError as e:
-            logger.error(f"❌ Command failed: {' '.join(command)}")
-            logger.error(f"Error: {e.stderr}")
-            return False
+        
+        reason = "cancelled" if result.cancelled else "timed out" if result.timed_out else f"exit code {result.exit_code}"
+        logger.error(f"❌ Command failed: {' '.join(command)} ({reason})")
+        if result.tail:
+            logger.error(f"Last {len(result.tail)} line(s) of output:")
+            for line in result.tail:
+                logger.error(f"  {line}")
+        return False
     
     def check_dependencies(self) -> bool:
         """Check if all required dependencies are installed"""
@@ -62,33 +104,80 @@ class ObservatoryDeployer:
             
         return all_ok
     
-    def install_dependencies(self) -> bool:
-        """Install all Node.js dependencies"""
-        logger.info("📦 Installing dependencies...")
-        
-        dirs_to_install = [
+    def install_targets(self) -> List[tuple]:
+        """Directories that need an npm install, as (directory, name) pairs"""
+        return [
             (self.project_root, "root"),
             (self.backend_dir, "backend"),
             (self.frontend_dir, "frontend"),
             (self.mobile_dir, "mobile")
         ]
+    
+    def run_cached(self, step: str, command: List[str], cwd: Path, inputs: List[Path],
+                   outputs: List[Path]) -> bool:
+        """Run a command unless the build cache already holds outputs for identical inputs"""
+        if not self.cache:
+            return self.run_command(command, cwd=cwd)
         
-        for directory, name in dirs_to_install:
-            logger.info(f"Installing {name} dependencies...")
-            if not self.run_command(["npm", "install"], cwd=directory):
-                return False
-                
+        key = self.cache.compute_key(step, inputs, command)
+        if self.cache.restore(step, key, outputs):
+            return True
+        
+        if not self.run_command(command, cwd=cwd):
+            return False
+        
+        self.cache.store(step, key, outputs)
         return True
     
+    def component_inputs(self, directory: Path, *sources: str) -> List[Path]:
+        """Files and trees that determine a component's build output"""
+        inputs = [directory / "package.json", directory / "package-lock.json", directory / "tsconfig.json"]
+        inputs.extend(directory / source for source in sources)
+        inputs.extend(sorted(directory.glob(".env*")))
+        return inputs
+    
+    def install_directory(self, directory: Path, name: str) -> bool:
+        """Install Node.js dependencies for a single directory"""
+        logger.info(f"Installing {name} dependencies...")
+        return self.run_cached(
+            f"install-{name}",
+            ["npm", "install"],
+            cwd=directory,
+            inputs=[directory / "package.json", directory / "package-lock.json"],
+            outputs=[directory / "node_modules"]
+        )
+    
+    def install_dependencies(self) -> bool:
+        """Install all Node.js dependencies"""
+        logger.info("📦 Installing dependencies...")
+        
+        steps = [
+            BuildStep(f"install-{name}", lambda d=directory, n=name: self.install_directory(d, n))
+            for directory, name in self.install_targets()
+        ]
+        return self.run_build_graph(steps)
+    
     def build_backend(self) -> bool:
         """Build the backend TypeScript code"""
         logger.info("🏗️  Building backend...")
-        return self.run_command(["npm", "run", "build"], cwd=self.backend_dir)
+        return self.run_cached(
+            "build-backend",
+            ["npm", "run", "build"],
+            cwd=self.backend_dir,
+            inputs=self.component_inputs(self.backend_dir, "src"),
+            outputs=[self.backend_dir / "dist"]
+        )
     
     def build_frontend(self) -> bool:
         """Build the frontend React app"""
         logger.info("🏗️  Building frontend...")
-        return self.run_command(["npm", "run", "build"], cwd=self.frontend_dir)
+        return self.run_cached(
+            "build-frontend",
+            ["npm", "run", "build"],
+            cwd=self.frontend_dir,
+            inputs=self.component_inputs(self.frontend_dir, "src", "public"),
+            outputs=[self.frontend_dir / "build"]
+        )
     
     def sync_mobile(self) -> bool:
         """Sync mobile app with latest frontend build"""
@@ -102,47 +191,28 @@ class ObservatoryDeployer:
             logger.error("❌ Frontend build not found. Run build_frontend first.")
             return False
         
-        # Remove existing www content
-        if mobile_www.exists():
-            self.run_command(["rm", "-rf", str(mobile_www)])
+        # Mirror only the files that changed since the last sync
+        stamp = self.mobile_dir / CAP_SYNC_STAMP
+        stats = sync_tree(frontend_build, mobile_www, hardlink=self.hardlink_assets)
+        logger.info(f"📁 mobile/www: {stats}")
         
-        # Copy frontend build
-        if not self.run_command(["cp", "-r", str(frontend_build), str(mobile_www)]):
-            return False
+        if not stats.changed and stamp.exists():
+            logger.info("⏭️  Web assets unchanged, skipping Capacitor sync")
+            return True
         
         # Run Capacitor sync
-        return self.run_command(["npx", "cap", "sync"], cwd=self.mobile_dir)
+        stamp.unlink(missing_ok=True)
+        if not self.run_command(["npx", "cap", "sync"], cwd=self.mobile_dir):
+            return False
+        stamp.touch()
+        return True
     
     def create_wordpress_package(self) -> bool:
         """Create a WordPress plugin package"""
         logger.info("📦 Creating WordPress plugin package...")
         
-        package_dir = self.project_root / "dist" / "wordpress-plugin"
-        package_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Copy plugin files
-        plugin_files = [
-            "observatory-booking.php",
-            "assets/",
-            "README.txt"
-        ]
-        
-        for file_pattern in plugin_files:
-            source = self.wordpress_dir / file_pattern
-            if source.exists():
-                if source.is_dir():
-                    self.run_command(["cp", "-r", str(source), str(package_dir)])
-                else:
-                    self.run_command(["cp", str(source), str(package_dir)])
-        
-        # Create zip package
-        zip_name = f"observatory-booking-plugin-v1.0.0.zip"
-        zip_path = self.project_root / "dist" / zip_name
-        
-        return self.run_command([
-            "zip", "-r", str(zip_path), ".",
-            "-x", "*.git*", "node_modules/*", "*.DS_Store"
-        ], cwd=package_dir)
+        packager = WordPressPackager(self.wordpress_dir, self.project_root / "dist")
+        return packager.build() is not None
     
     def deploy_to_server(self, server_config: Dict) -> bool:
         """Deploy to a remote server using SSH"""
@@ -169,45 +239,300 @@ class ObservatoryDeployer:
                 
         return all_passed
     
+    def run_build_graph(self, steps: List[BuildStep]) -> bool:
+        """Run build steps on a bounded worker pool as soon as their dependencies succeed"""
+        by_name = {step.name: step for step in steps}
+        for step in steps:
+            missing = [dep for dep in step.deps if dep not in by_name]
+            if missing:
+                raise ValueError(f"Step {step.name} depends on unknown steps: {', '.join(missing)}")
+        
+        pending = list(steps)
+        running = {}
+        failed = []
+        
+        def timed(step: BuildStep) -> bool:
+            self._step_context.name = step.name
+            started = time.perf_counter()
+            try:
+                return step.func()
+            finally:
+                step.duration = time.perf_counter() - started
+                self._step_context.name = None
+        
+        graph_started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.jobs, thread_name_prefix="build") as pool:
+            while pending or running:
+                if not failed:
+                    ready = [s for s in pending if all(by_name[d].success for d in s.deps)]
+                    for step in ready:
+                        pending.remove(step)
+                        logger.info(f"📋 [{step.name}] started")
+                        running[pool.submit(timed, step)] = step
+                
+                if not running:
+                    # Nothing left that can make progress (failure or dependency cycle)
+                    break
+                
+                try:
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                except KeyboardInterrupt:
+                    logger.warning("🛑 Interrupted, cancelling running commands...")
+                    self.runner.cancel()
+                    raise
+                for future in done:
+                    step = running.pop(future)
+                    try:
+                        step.success = bool(future.result())
+                    except Exception as e:
+                        logger.error(f"❌ [{step.name}] raised: {e}")
+                        step.success = False
+                    
+                    if step.success:
+                        logger.info(f"✅ [{step.name}] finished in {step.duration:.1f}s")
+                    else:
+                        logger.error(f"❌ [{step.name}] failed after {step.duration:.1f}s")
+                        failed.append(step)
+        
+        wall_time = time.perf_counter() - graph_started
+        self.print_build_summary(steps, wall_time)
+        
+        if failed:
+            logger.error(f"❌ Failed at step(s): {', '.join(s.name for s in failed)}")
+            return False
+        if pending:
+            logger.error(f"❌ Steps never ran: {', '.join(s.name for s in pending)}")
+            return False
+        return True
+    
+    def print_build_summary(self, steps: List[BuildStep], wall_time: float) -> None:
+        """Log per-step wall times and the critical path through the build graph"""
+        by_name = {step.name: step for step in steps}
+        finish: Dict[str, float] = {}
+        previous: Dict[str, Optional[str]] = {}
+        
+        def critical(name: str) -> float:
+            if name not in finish:
+                step = by_name[name]
+                deps = [d for d in step.deps if by_name[d].success is not None]
+                slowest = max(deps, key=critical, default=None)
+                previous[name] = slowest
+                finish[name] = step.duration + (finish[slowest] if slowest else 0.0)
+            return finish[name]
+        
+        ran = [step for step in steps if step.success is not None]
+        if not ran:
+            return
+        
+        logger.info("⏱️  Build step timings:")
+        for step in sorted(ran, key=lambda s: s.duration, reverse=True):
+            marker = "✅" if step.success else "❌"
+            logger.info(f"   {marker} {step.name:<20} {step.duration:7.1f}s")
+        
+        tail = max((step.name for step in ran), key=critical)
+        path = []
+        while tail:
+            path.append(tail)
+            tail = previous[tail]
+        path.reverse()
+        
+        serial_time = sum(step.duration for step in ran)
+        logger.info(f"🧭 Critical path ({finish[path[-1]]:.1f}s): {' → '.join(path)}")
+        logger.info(f"   Wall time {wall_time:.1f}s vs {serial_time:.1f}s serial "
+                    f"with {self.jobs} worker(s)")
+    
     def full_build(self) -> bool:
         """Perform a full build of all components"""
         logger.info("🏗️  Starting full build process...")
         
-        steps = [
-            ("Checking dependencies", self.check_dependencies),
-            ("Installing dependencies", self.install_dependencies),
-            ("Building backend", self.build_backend),
-            ("Building frontend", self.build_frontend),
-            ("Syncing mobile app", self.sync_mobile),
-            ("Creating WordPress package", self.create_wordpress_package)
-        ]
+        steps = [BuildStep("check", self.check_dependencies)]
+        for directory, name in self.install_targets():
+            steps.append(BuildStep(
+                f"install-{name}",
+                lambda d=directory, n=name: self.install_directory(d, n),
+                deps=["check"]
+            ))
+        steps.extend([
+            BuildStep("build-backend", self.build_backend, deps=["install-backend"]),
+            BuildStep("build-frontend", self.build_frontend, deps=["install-frontend"]),
+            BuildStep("sync-mobile", self.sync_mobile, deps=["build-frontend", "install-mobile"]),
+            BuildStep("package-wp", self.create_wordpress_package, deps=["check"])
+        ])
         
-        for step_name, step_func in steps:
-            logger.info(f"📋 {step_name}...")
-            if not step_func():
-                logger.error(f"❌ Failed at step: {step_name}")
-                return False
+        if not self.run_build_graph(steps):
+            return False
         
         logger.info("✅ Full build completed successfully!")
         return True
+    
+    def use_redis(self, url: str = DEFAULT_REDIS_URL) -> bool:
+        """Point the backends started from here at a Redis-compatible server, starting the
+        docker-compose redis service when the URL is local and nothing is listening yet"""
+        parts = urlsplit(url)
+        host, port = parts.hostname or "localhost", parts.port or 6379
+        
+        def listening() -> bool:
+            try:
+                with socket.create_connection((host, port), timeout=1):
+                    return True
+            except OSError:
+                return False
+        
+        if not listening():
+            if host not in ("localhost", "127.0.0.1", "::1"):
+                logger.error(f"❌ Nothing is listening at {host}:{port}")
+                return False
+            logger.info("🧰 Starting the redis service from docker-compose.yml...")
+            if not self.run_command(["docker-compose", "up", "-d", "redis"]):
+                return False
+            deadline = time.monotonic() + REDIS_START_TIMEOUT
+            while not listening():
+                if time.monotonic() > deadline:
+                    logger.error(f"❌ Redis did not accept connections on {host}:{port} in time")
+                    return False
+                time.sleep(0.5)
+        
+        # Inherited by every backend, worker and npm script started from here
+        os.environ["REDIS_URL"] = url
+        logger.info(f"🔗 Using Redis at {host}:{port} for caching, Socket.IO and rate limits")
+        return True
+    
+    def bench_rate_limit(self) -> bool:
+        """Check the Redis rate limit script against the in-process store and time both"""
+        logger.info("🚦 Running the rate limit store bench...")
+        return self.run_command(["npm", "run", "bench:ratelimit"], cwd=self.backend_dir)
+    
+    def run_cluster(self, workers: int = None, port: int = DEFAULT_CLUSTER_PORT, seed: bool = False) -> bool:
+        """Build the backend and run it in cluster mode until interrupted"""
+        if not self.build_backend():
+            return False
+        
+        workers = workers or os.cpu_count() or 1
+        env = {"WEB_CONCURRENCY": str(workers)}
+        logger.info(f"🖥️  Launching backend cluster with {workers} worker(s)...")
+        if not os.environ.get("REDIS_URL"):
+            logger.info("   REDIS_URL not set: Socket.IO events and rate limits are shared between local workers only "
+                        "(--redis to use the docker-compose redis service)")
+        
+        backend = LocalBackend(self.backend_dir, port, seed=seed, entry="cluster", env=env, quiet=False)
+        try:
+            with backend as url:
+                logger.info(f"✅ Cluster is up at {url} (Ctrl+C to stop)")
+                while backend.process.poll() is None:
+                    time.sleep(1)
+                logger.error(f"❌ Cluster exited with code {backend.process.returncode}")
+                return False
+        except KeyboardInterrupt:
+            logger.info("🛑 Cluster stopped")
+            return True
+        except RuntimeError as e:
+            logger.error(f"❌ {e}")
+            return False
+    
+    def seed_database(self, scale: int = None, fixture_seed: int = DEFAULT_SEED, anchor: str = None) -> bool:
+        """Seed the demo data, or with a scale, load a synthetic fixture of that many bookings"""
+        if not scale:
+            logger.info("🌱 Seeding demo users and telescopes...")
+            return self.run_command(["npm", "run", "seed"], cwd=self.backend_dir)
+        
+        try:
+            sink = choose_sink(os.environ.get("MONGODB_URI", DEFAULT_MONGO_URI))
+            generate_fixture(scale, sink, fixture_seed,
+                             anchor=datetime.strptime(anchor, "%Y-%m-%d") if anchor else None)
+        except (RuntimeError, OSError, ValueError) as e:
+            logger.error(f"❌ Fixture load failed: {e}")
+            return False
+        
+        logger.info("📊 Rebuilding analytics rollups from the new bookings...")
+        return self.run_command(["npm", "run", "rollups:rebuild"], cwd=self.backend_dir)
+    
+    def cache_command(self, command: str = "stats") -> bool:
+        """Inspect or clear the incremental build cache"""
+        cache = self.cache or BuildCache(self.project_root)
+        
+        if command == "clear":
+            cache.clear()
+            logger.info(f"🧹 Cleared build cache at {cache.cache_dir}")
+            return True
+        
+        stats = cache.stats()
+        logger.info(f"🗄️  Build cache: {stats['cache_dir']}")
+        logger.info(f"   Entries: {stats['entries']} "
+                    f"({format_bytes(stats['size_bytes'])} of {format_bytes(stats['max_bytes'])})")
+        logger.info(f"   Hits: {stats['hits']}  Misses: {stats['misses']}  "
+                    f"Hit rate: {stats['hit_rate'] * 100:.1f}%")
+        for step, key in sorted(stats["steps"].items()):
+            logger.info(f"   {step:<20} {key[:12]}")
+        return True
 
 def main():
     """Main CLI function"""
     parser = argparse.ArgumentParser(description="Observatory Booking App Deployment Utility")
     parser.add_argument("action", choices=[
         "check", "install", "build", "build-backend", "build-frontend", 
-        "sync-mobile", "package-wp", "test", "full-build"
+        "sync-mobile", "package-wp", "test", "full-build", "cache", "bench", "cluster", "seed",
+        "backup", "restore"
     ], help="Action to perform")
+    parser.add_argument("target", nargs="?", help="Sub-command for actions that take one (cache: stats|clear, bench: stress|ratelimit, backup: list|verify|prune)")
     
     parser.add_argument("--project-root", help="Project root directory")
     parser.add_argument("--verbose", "-v", action="store_true", help="Verbose output")
+    parser.add_argument("--jobs", "-j", type=int, default=DEFAULT_BUILD_JOBS,
+                        help="Maximum number of build steps to run in parallel")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore the incremental build cache")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_MAX_CACHE_BYTES // 1024 ** 2,
+                        help="Maximum build cache size in MB")
+    parser.add_argument("--command-timeout", type=float, help="Per-command timeout in seconds")
+    parser.add_argument("--hardlink-assets", action="store_true",
+                        help="Hardlink frontend build files into mobile/www instead of copying")
+    parser.add_argument("--bench-url", help="Benchmark an already running backend at this URL")
+    parser.add_argument("--start-backend", action="store_true", help="Seed and start backend/ for the benchmark")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Concurrent benchmark workers")
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION, help="Benchmark seconds per endpoint")
+    parser.add_argument("--save-baseline", action="store_true", help="Record benchmark results as the baseline")
+    parser.add_argument("--workers", type=int, help="Cluster worker processes (default: one per CPU)")
+    parser.add_argument("--port", type=int, default=DEFAULT_CLUSTER_PORT, help="Port for the local cluster")
+    parser.add_argument("--seed", action="store_true", help="Seed the database before starting the cluster")
+    parser.add_argument("--redis", nargs="?", const=DEFAULT_REDIS_URL,
+                        help=f"cluster/bench: run against this Redis (default {DEFAULT_REDIS_URL}, "
+                             "the docker-compose redis service, started if needed)")
+    parser.add_argument("--scale", type=int, help="seed: load a synthetic fixture with this many bookings")
+    parser.add_argument("--fixture-seed", type=int, default=DEFAULT_SEED, help="seed: random seed for --scale fixtures")
+    parser.add_argument("--anchor", help="seed: date treated as today for --scale fixtures (YYYY-MM-DD)")
+    parser.add_argument("--backup-dir", default=DEFAULT_BACKUP_DIR, help="backup/restore: snapshot and chunk store")
+    parser.add_argument("--mongo-container", help="backup/restore: run the Mongo tools in this container (e.g. observatory-db)")
+    parser.add_argument("--snapshot", help="restore/backup verify: snapshot id or prefix (default: latest)")
+    parser.add_argument("--full", action="store_true", help="backup: take a full database dump instead of a delta")
+    parser.add_argument("--files-only", action="store_true", help="backup/restore: leave the database out")
+    parser.add_argument("--restore-dir", help="restore: where files are written (default: <backup-dir>/restore/<id>)")
+    parser.add_argument("--keep-full", type=int, default=4, help="backup prune: full backup chains to keep")
+    parser.add_argument("--include", action="append", default=[], help="backup: extra directory as PATH or LABEL=PATH, e.g. a volume mountpoint")
+    parser.add_argument("--report", help="Write a JSON report of every command run to this path")
     
     args = parser.parse_args()
     
     if args.verbose:
         logging.getLogger().setLevel(logging.DEBUG)
     
-    deployer = ObservatoryDeployer(args.project_root)
+    deployer = ObservatoryDeployer(
+        args.project_root,
+        jobs=args.jobs,
+        use_cache=not args.no_cache,
+        cache_size=args.cache_size * 1024 ** 2,
+        command_timeout=args.command_timeout,
+        hardlink_assets=args.hardlink_assets
+    )
+    
+    backup_options = dict(
+        backup_dir=args.backup_dir,
+        container=args.mongo_container,
+        snapshot=args.snapshot,
+        full=args.full,
+        include_db=not args.files_only,
+        restore_dir=args.restore_dir,
+        keep_full=args.keep_full,
+        extra_paths=args.include
+    )
     
     actions = {
         "check": deployer.check_dependencies,
@@ -218,12 +543,43 @@ def main():
         "sync-mobile": deployer.sync_mobile,
         "package-wp": deployer.create_wordpress_package,
         "test": deployer.run_tests,
-        "full-build": deployer.full_build
+        "full-build": deployer.full_build,
+        "cache": lambda: deployer.cache_command(args.target or "stats"),
+        "bench": lambda: deployer.bench_rate_limit() if args.target == "ratelimit" else run_stress_test(
+            deployer.project_root,
+            base_url=args.bench_url,
+            concurrency=args.concurrency,
+            start_backend=args.start_backend
+        ) if args.target == "stress" else run_benchmark(
+            deployer.project_root,
+            base_url=args.bench_url,
+            concurrency=args.concurrency,
+            duration=args.duration,
+            save_baseline=args.save_baseline,
+            start_backend=args.start_backend
+        ),
+        "cluster": lambda: deployer.run_cluster(args.workers, args.port, args.seed),
+        "seed": lambda: deployer.seed_database(args.scale, args.fixture_seed, args.anchor),
+        "backup": lambda: run_backup_command(
+            args.target or "backup",
+            deployer.project_root,
+            **backup_options
+        ),
+        "restore": lambda: run_backup_command("restore", deployer.project_root, **backup_options)
     }
     
+    # The rate limit bench exists to exercise the Redis store, so it always needs one
+    redis_url = args.redis or (
+        os.environ.get("REDIS_URL", DEFAULT_REDIS_URL) if args.action == "bench" and args.target == "ratelimit" else None
+    )
+    
     action_func = actions.get(args.action)
     if action_func:
-        success = action_func()
+        try:
+            success = (not redis_url or deployer.use_redis(redis_url)) and action_func()
+        finally:
+            if args.report:
+                deployer.runner.write_report(Path(args.report))
         sys.exit(0 if success else 1)
     else:
         logger.error(f"Unknown action: {args.action}")
@@ -1,16 +1,16 @@
 #!/usr/bin/env python3
 
+from pathlib import Path
+
+from status_engine import StatusEngine, print_report
+
 print("=" * 80)
 print("🔭 OBSERVATORY BOOKING APP - COMPLETION SUMMARY")  
 print("=" * 80)
 print()
 
-print("🟢 CURRENT STATUS:")
-print("-" * 50)
-print("  • Backend: ✅ RUNNING (http://localhost:30001)")
-print("  • Frontend: ✅ RUNNING (http://localhost:30002)")
-print("  • Database: ✅ CONNECTED (MongoDB)")
-print("  • Sample Data: ✅ SEEDED")
+status = StatusEngine(Path(__file__).parent).collect()
+print_report(status)
 print()
 
 print("📋 LOGIN CREDENTIALS:")
@@ -73,6 +73,9 @@ print("  • Mobile: Capacitor (ready for build)")
 print()
 
 print("=" * 80)
-print("🎉 SUCCESS: Full-stack observatory booking app is RUNNING!")
+if all(service["status"] in ("up", "skipped") for service in status["services"]):
+    print("🎉 SUCCESS: Full-stack observatory booking app is RUNNING!")
+else:
+    print("⚠️  Some services are not running - see CURRENT STATUS above")
 print("🌐 Open http://localhost:30002 to start using the application")
 print("=" * 80)
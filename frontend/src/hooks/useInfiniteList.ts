@@ -0,0 +1,64 @@
+import { useCallback, useEffect, useRef, useState } from 'react';
+
+export interface Page<T> {
+  items: T[];
+  nextCursor: string | null;
+}
+
+// Cursor-driven infinite list. Render an element with `sentinelRef` below the
+// list while `hasMore && !loading && !error`; it loads the next page when
+// scrolled into view. After an error, offer `loadMore` as a retry.
+export const useInfiniteList = <T,>(fetchPage: (cursor: string | null) => Promise<Page<T>>) => {
+  const [items, setItems] = useState<T[]>([]);
+  const [hasMore, setHasMore] = useState(true);
+  // Lists load their first page on mount
+  const [loading, setLoading] = useState(true);
+  const [error, setError] = useState(false);
+
+  const fetchRef = useRef(fetchPage);
+  fetchRef.current = fetchPage;
+  const cursorRef = useRef<string | null>(null);
+  const loadingRef = useRef(false);
+  // Bumped by reload so pages requested before it are discarded
+  const generationRef = useRef(0);
+  const observerRef = useRef<IntersectionObserver | null>(null);
+
+  const load = useCallback(async (reset: boolean) => {
+    if (loadingRef.current && !reset) return;
+    const generation = reset ? ++generationRef.current : generationRef.current;
+    loadingRef.current = true;
+    setLoading(true);
+
+    try {
+      const page = await fetchRef.current(reset ? null : cursorRef.current);
+      if (generation !== generationRef.current) return;
+      cursorRef.current = page.nextCursor;
+      setItems(previous => (reset ? page.items : [...previous, ...page.items]));
+      setHasMore(page.nextCursor !== null);
+      setError(false);
+    } catch (err) {
+      if (generation === generationRef.current) setError(true);
+    } finally {
+      if (generation === generationRef.current) {
+        loadingRef.current = false;
+        setLoading(false);
+      }
+    }
+  }, []);
+
+  const reload = useCallback(() => load(true), [load]);
+  const loadMore = useCallback(() => load(false), [load]);
+
+  const sentinelRef = useCallback((node: Element | null) => {
+    observerRef.current?.disconnect();
+    if (!node) return;
+    observerRef.current = new IntersectionObserver(entries => {
+      if (entries[0].isIntersecting) loadMore();
+    }, { rootMargin: '200px' });
+    observerRef.current.observe(node);
+  }, [loadMore]);
+
+  useEffect(() => () => observerRef.current?.disconnect(), []);
+
+  return { items, setItems, hasMore, loading, error, reload, loadMore, sentinelRef };
+};
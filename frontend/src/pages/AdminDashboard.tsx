@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useCallback } from 'react';
 import {
   Container,
   Grid,
@@ -54,6 +54,7 @@ import {
 import dayjs from 'dayjs';
 import api from '../utils/api';
 import { useAuth } from '../hooks/useAuth';
+import { useInfiniteList } from '../hooks/useInfiniteList';
 import toast from 'react-hot-toast';
 
 // Register Chart.js components
@@ -89,6 +90,10 @@ interface DashboardStats {
     };
   };
   recentBookings: any[];
+  snapshot?: {
+    generatedAt: string;
+    ageMs: number;
+  };
 }
 
 interface Analytics {
@@ -103,7 +108,20 @@ const AdminDashboard: React.FC = () => {
   const [loading, setLoading] = useState(true);
   const [stats, setStats] = useState<DashboardStats | null>(null);
   const [analytics, setAnalytics] = useState<Analytics | null>(null);
-  const [bookings, setBookings] = useState<any[]>([]);
+  const fetchBookingsPage = useCallback(async (cursor: string | null) => {
+    const response = await api.get('/admin/bookings', { params: { limit: 50, cursor: cursor || undefined } });
+    return { items: response.data.bookings as any[], nextCursor: response.data.pagination.nextCursor as string | null };
+  }, []);
+  const {
+    items: bookings,
+    setItems: setBookings,
+    hasMore: hasMoreBookings,
+    loading: bookingsLoading,
+    error: bookingsError,
+    reload: reloadBookings,
+    loadMore: loadMoreBookings,
+    sentinelRef: bookingsSentinelRef
+  } = useInfiniteList<any>(fetchBookingsPage);
   const [selectedTab, setSelectedTab] = useState(0);
   const [statusDialog, setStatusDialog] = useState<{
     open: boolean;
@@ -116,20 +134,19 @@ const AdminDashboard: React.FC = () => {
   useEffect(() => {
     if (user?.role === 'admin') {
       loadDashboardData();
+      reloadBookings();
     }
-  }, [user]);
+  }, [user, reloadBookings]);
 
   const loadDashboardData = async () => {
     try {
       setLoading(true);
-      const [statsResponse, bookingsResponse, analyticsResponse] = await Promise.all([
+      const [statsResponse, analyticsResponse] = await Promise.all([
         api.get('/admin/stats'),
-        api.get('/admin/bookings?limit=50'),
         api.get(`/admin/analytics?period=${analyticsFilter}`)
       ]);
 
       setStats(statsResponse.data);
-      setBookings(bookingsResponse.data.bookings);
       setAnalytics(analyticsResponse.data.analytics);
     } catch (error) {
       toast.error('Failed to load dashboard data');
@@ -142,12 +159,15 @@ const AdminDashboard: React.FC = () => {
     if (!statusDialog.booking || !newStatus) return;
 
     try {
-      await api.patch(`/admin/bookings/${statusDialog.booking._id}/status`, {
+      const response = await api.patch(`/admin/bookings/${statusDialog.booking._id}/status`, {
         status: newStatus,
         notes: adminNotes
       });
 
       toast.success('Booking status updated successfully');
+      // Swap the updated row in place; the loaded pages stay where they are
+      const updated = response.data.booking;
+      setBookings(previous => previous.map(booking => (booking._id === updated._id ? updated : booking)));
       loadDashboardData();
       setStatusDialog({ open: false, booking: null });
       setNewStatus('');
@@ -159,28 +179,19 @@ const AdminDashboard: React.FC = () => {
 
   const exportData = async (format: 'json' | 'csv') => {
     try {
+      // The server streams the file, so hand the bytes straight to a download
+      // instead of parsing and re-serializing them
       const response = await api.get(`/admin/export?format=${format}`, {
-        responseType: format === 'csv' ? 'blob' : 'json'
+        responseType: 'blob'
       });
 
-      if (format === 'csv') {
-        const blob = new Blob([response.data], { type: 'text/csv' });
-        const url = window.URL.createObjectURL(blob);
-        const link = document.createElement('a');
-        link.href = url;
-        link.download = 'bookings.csv';
-        link.click();
-        window.URL.revokeObjectURL(url);
-      } else {
-        const dataStr = JSON.stringify(response.data, null, 2);
-        const blob = new Blob([dataStr], { type: 'application/json' });
-        const url = window.URL.createObjectURL(blob);
-        const link = document.createElement('a');
-        link.href = url;
-        link.download = 'bookings.json';
-        link.click();
-        window.URL.revokeObjectURL(url);
-      }
+      const blob = new Blob([response.data], { type: format === 'csv' ? 'text/csv' : 'application/json' });
+      const url = window.URL.createObjectURL(blob);
+      const link = document.createElement('a');
+      link.href = url;
+      link.download = `bookings.${format}`;
+      link.click();
+      window.URL.revokeObjectURL(url);
 
       toast.success(`Data exported as ${format.toUpperCase()}`);
     } catch (error) {
@@ -514,6 +525,20 @@ const AdminDashboard: React.FC = () => {
                 </TableBody>
               </Table>
             </TableContainer>
+            {hasMoreBookings && !bookingsLoading && !bookingsError && <div ref={bookingsSentinelRef} />}
+            {bookingsLoading && (
+              <Box display="flex" justifyContent="center" mt={2}>
+                <CircularProgress size={28} />
+              </Box>
+            )}
+            {bookingsError && (
+              <Box display="flex" justifyContent="center" alignItems="center" mt={2}>
+                <Typography variant="body2" color="error" sx={{ mr: 2 }}>
+                  Failed to load bookings
+                </Typography>
+                <Button size="small" onClick={loadMoreBookings}>Retry</Button>
+              </Box>
+            )}
           </CardContent>
         </Card>
       )}
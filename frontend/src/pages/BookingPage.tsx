@@ -20,10 +20,16 @@ import { AdapterDayjs } from '@mui/x-date-pickers/AdapterDayjs';
 import dayjs, { Dayjs } from 'dayjs';
 import { useNavigate, useSearchParams } from 'react-router-dom';
 import { useAuth } from '../hooks/useAuth';
-import api from '../utils/api';
-import { Telescope, TimeSlot } from '../types';
+import api, { fetchAvailability } from '../utils/api';
+import { AvailabilityMap, Telescope, TimeSlot } from '../types';
 import toast from 'react-hot-toast';
 
+// Availability is fetched a week at a time for every telescope, so switching
+// telescope or moving between nearby dates needs no further requests
+const AVAILABILITY_WINDOW_DAYS = 7;
+const MAX_BOOKING_DAYS_AHEAD = 30;
+const NIGHT_FORMAT = 'YYYY-MM-DD';
+
 const BookingPage: React.FC = () => {
   const navigate = useNavigate();
   const { isAuthenticated } = useAuth();
@@ -32,6 +38,8 @@ const BookingPage: React.FC = () => {
   const [telescopes, setTelescopes] = useState<Telescope[]>([]);
   const [selectedTelescope, setSelectedTelescope] = useState('');
   const [selectedDate, setSelectedDate] = useState<Dayjs | null>(dayjs().add(1, 'day'));
+  const [availability, setAvailability] = useState<AvailabilityMap>({});
+  const [availabilityWindow, setAvailabilityWindow] = useState<{ from: string; to: string } | null>(null);
   const [availableSlots, setAvailableSlots] = useState<TimeSlot[]>([]);
   const [selectedSlot, setSelectedSlot] = useState<TimeSlot | null>(null);
   const [purpose, setPurpose] = useState('');
@@ -71,29 +79,54 @@ const BookingPage: React.FC = () => {
   }, [isAuthenticated, navigate, searchParams]);
 
   useEffect(() => {
-    if (selectedTelescope && selectedDate) {
-      fetchAvailableSlots();
+    if (telescopes.length === 0 || !selectedDate) return;
+
+    const night = selectedDate.format(NIGHT_FORMAT);
+    if (availabilityWindow && night >= availabilityWindow.from && night <= availabilityWindow.to) {
+      return;
     }
-  }, [selectedTelescope, selectedDate]);
+    fetchAvailabilityWindow(selectedDate);
+  }, [telescopes, selectedDate]);
 
-  const fetchAvailableSlots = async () => {
+  useEffect(() => {
     if (!selectedTelescope || !selectedDate) return;
 
+    const nights = availability[selectedTelescope] || {};
+    setAvailableSlots(nights[selectedDate.format(NIGHT_FORMAT)] || []);
+    setSelectedSlot(null);
+  }, [availability, selectedTelescope, selectedDate]);
+
+  const fetchAvailabilityWindow = async (start: Dayjs) => {
+    const lastBookableDay = dayjs().add(MAX_BOOKING_DAYS_AHEAD, 'day');
+    let end = start.add(AVAILABILITY_WINDOW_DAYS - 1, 'day');
+    if (end.isAfter(lastBookableDay, 'day') && !start.isAfter(lastBookableDay, 'day')) {
+      end = lastBookableDay;
+    }
+    const range = { from: start.format(NIGHT_FORMAT), to: end.format(NIGHT_FORMAT) };
+
     setLoadingSlots(true);
     try {
-      const response = await api.get(
-        `/bookings/available/${selectedTelescope}?date=${selectedDate.format('YYYY-MM-DD')}`
-      );
-      setAvailableSlots(response.data);
-      setSelectedSlot(null);
+      const result = await fetchAvailability({
+        ...range,
+        telescopes: telescopes.map((t) => t._id),
+      });
+      setAvailability(result);
+      setAvailabilityWindow(range);
     } catch (err) {
       setError('Failed to load available time slots');
-      setAvailableSlots([]);
+      setAvailability({});
+      setAvailabilityWindow(null);
     } finally {
       setLoadingSlots(false);
     }
   };
 
+  const freeSlotCount = (telescopeId: string) => {
+    if (!selectedDate || !availabilityWindow) return null;
+    const slots = availability[telescopeId]?.[selectedDate.format(NIGHT_FORMAT)];
+    return slots ? slots.length : null;
+  };
+
   const handleSubmit = async (e: React.FormEvent) => {
     e.preventDefault();
     
@@ -174,11 +207,15 @@ const BookingPage: React.FC = () => {
                 onChange={(e) => setSelectedTelescope(e.target.value)}
                 required
               >
-                {telescopes.map((telescope) => (
-                  <MenuItem key={telescope._id} value={telescope._id}>
-                    {telescope.name} - {telescope.location}
-                  </MenuItem>
-                ))}
+                {telescopes.map((telescope) => {
+                  const freeSlots = freeSlotCount(telescope._id);
+                  return (
+                    <MenuItem key={telescope._id} value={telescope._id}>
+                      {telescope.name} - {telescope.location}
+                      {freeSlots !== null && ` (${freeSlots} free)`}
+                    </MenuItem>
+                  );
+                })}
               </TextField>
             </Grid>
 
@@ -189,7 +226,7 @@ const BookingPage: React.FC = () => {
                   value={selectedDate}
                   onChange={(newValue) => setSelectedDate(newValue)}
                   minDate={dayjs().add(1, 'day')}
-                  maxDate={dayjs().add(30, 'day')}
+                  maxDate={dayjs().add(MAX_BOOKING_DAYS_AHEAD, 'day')}
                   sx={{ width: '100%' }}
                 />
               </LocalizationProvider>
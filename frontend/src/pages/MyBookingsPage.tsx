@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useCallback } from 'react';
 import {
   Container,
   Typography,
@@ -27,37 +27,43 @@ import {
 import dayjs from 'dayjs';
 import api from '../utils/api';
 import { Booking, Telescope } from '../types';
+import { useInfiniteList } from '../hooks/useInfiniteList';
 import toast from 'react-hot-toast';
 
+const PAGE_SIZE = 12;
+
 const MyBookingsPage: React.FC = () => {
-  const [bookings, setBookings] = useState<Booking[]>([]);
-  const [loading, setLoading] = useState(true);
-  const [error, setError] = useState('');
+  const fetchPage = useCallback(async (cursor: string | null) => {
+    const response = await api.get('/bookings', { params: { limit: PAGE_SIZE, cursor: cursor || undefined } });
+    return { items: response.data.bookings as Booking[], nextCursor: response.data.nextCursor as string | null };
+  }, []);
+  const {
+    items: bookings,
+    setItems: setBookings,
+    hasMore,
+    loading,
+    error,
+    reload,
+    loadMore,
+    sentinelRef
+  } = useInfiniteList<Booking>(fetchPage);
   const [cancelDialog, setCancelDialog] = useState<{
     open: boolean;
     booking: Booking | null;
   }>({ open: false, booking: null });
 
   useEffect(() => {
-    fetchBookings();
-  }, []);
-
-  const fetchBookings = async () => {
-    try {
-      const response = await api.get('/bookings');
-      setBookings(response.data);
-    } catch (err: any) {
-      setError('Failed to load bookings');
-    } finally {
-      setLoading(false);
-    }
-  };
+    reload();
+  }, [reload]);
 
   const handleCancelBooking = async (booking: Booking) => {
     try {
       await api.delete(`/bookings/${booking._id}`);
       toast.success('Booking cancelled successfully');
-      fetchBookings(); // Refresh the list
+      // Update the loaded row in place rather than refetching every page
+      setBookings(previous => previous.map(item =>
+        item._id === booking._id ? { ...item, status: 'cancelled' as const } : item
+      ));
     } catch (err: any) {
       toast.error(err.response?.data?.error || 'Failed to cancel booking');
     }
@@ -104,7 +110,7 @@ const MyBookingsPage: React.FC = () => {
     return startTime.diff(now, 'hours') >= 2;
   };
 
-  if (loading) {
+  if (loading && bookings.length === 0) {
     return (
       <Box display="flex" justifyContent="center" alignItems="center" minHeight="50vh">
         <CircularProgress />
@@ -119,12 +125,16 @@ const MyBookingsPage: React.FC = () => {
       </Typography>
 
       {error && (
-        <Alert severity="error" sx={{ mb: 3 }}>
-          {error}
+        <Alert
+          severity="error"
+          sx={{ mb: 3 }}
+          action={<Button color="inherit" size="small" onClick={loadMore}>Retry</Button>}
+        >
+          Failed to load bookings
         </Alert>
       )}
 
-      {bookings.length === 0 ? (
+      {bookings.length === 0 && !error ? (
         <Box textAlign="center" mt={6}>
           <TelescopeIcon sx={{ fontSize: 80, color: 'text.secondary', mb: 2 }} />
           <Typography variant="h6" color="textSecondary" gutterBottom>
@@ -216,6 +226,13 @@ const MyBookingsPage: React.FC = () => {
         </Grid>
       )}
 
+      {hasMore && !loading && !error && bookings.length > 0 && <div ref={sentinelRef} />}
+      {loading && bookings.length > 0 && (
+        <Box display="flex" justifyContent="center" mt={3}>
+          <CircularProgress size={28} />
+        </Box>
+      )}
+
       {/* Cancel Confirmation Dialog */}
       <Dialog
         open={cancelDialog.open}
@@ -45,6 +45,15 @@ export interface TimeSlot {
   display: string;
 }
 
+export interface AvailabilityEntry {
+  telescope: string;
+  night: string;
+  slots: TimeSlot[];
+}
+
+// Free slots keyed by telescope ID, then by night (YYYY-MM-DD)
+export type AvailabilityMap = Record<string, Record<string, TimeSlot[]>>;
+
 export interface AuthResponse {
   message: string;
   token: string;
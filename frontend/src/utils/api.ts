@@ -1,4 +1,5 @@
 import axios from 'axios';
+import { AvailabilityEntry, AvailabilityMap } from '../types';
 
 const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://localhost:30001/api';
 
@@ -18,16 +19,85 @@ api.interceptors.request.use((config) => {
   return config;
 });
 
+const handleUnauthorized = () => {
+  localStorage.removeItem('observatory_token');
+  window.location.href = '/login';
+};
+
 // Handle auth errors
 api.interceptors.response.use(
   (response) => response,
   (error) => {
     if (error.response?.status === 401) {
-      localStorage.removeItem('observatory_token');
-      window.location.href = '/login';
+      handleUnauthorized();
     }
     return Promise.reject(error);
   }
 );
 
+export interface AvailabilityQuery {
+  from: string;
+  to?: string;
+  telescopes?: string[];
+}
+
+// Fetch free slots for a date range and set of telescopes in one request.
+// The server streams NDJSON, so onEntry sees each telescope-night as it arrives.
+export const fetchAvailability = async (
+  query: AvailabilityQuery,
+  onEntry?: (entry: AvailabilityEntry) => void
+): Promise<AvailabilityMap> => {
+  const params = new URLSearchParams({ from: query.from });
+  if (query.to) params.append('to', query.to);
+  if (query.telescopes && query.telescopes.length > 0) {
+    params.append('telescopes', query.telescopes.join(','));
+  }
+
+  const headers: Record<string, string> = { Accept: 'application/x-ndjson' };
+  const token = localStorage.getItem('observatory_token');
+  if (token) {
+    headers.Authorization = `Bearer ${token}`;
+  }
+
+  const response = await fetch(`${API_BASE_URL}/bookings/availability?${params.toString()}`, { headers });
+  if (response.status === 401) {
+    handleUnauthorized();
+  }
+  if (!response.ok) {
+    const body = await response.json().catch(() => ({}));
+    throw new Error(body.error || `Availability request failed (${response.status})`);
+  }
+
+  const availability: AvailabilityMap = {};
+  const handleLine = (line: string) => {
+    if (!line.trim()) return;
+    const entry = JSON.parse(line);
+    if (entry.error) {
+      throw new Error(entry.error);
+    }
+    availability[entry.telescope] = availability[entry.telescope] || {};
+    availability[entry.telescope][entry.night] = entry.slots;
+    if (onEntry) onEntry(entry);
+  };
+
+  if (!response.body) {
+    (await response.text()).split('\n').forEach(handleLine);
+    return availability;
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffered = '';
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffered += decoder.decode(value, { stream: true });
+    const lines = buffered.split('\n');
+    buffered = lines.pop() || '';
+    lines.forEach(handleLine);
+  }
+  handleLine(buffered + decoder.decode());
+  return availability;
+};
+
 export default api;
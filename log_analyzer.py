@@ -0,0 +1,742 @@
+#!/usr/bin/env python3
+"""
+Observatory Booking App - Log Analyzer
+Per-endpoint latency, status rates, slow-request and rate-limit timelines, and window diffs from nginx and backend logs
+"""
+
+import argparse
+import calendar
+import gzip
+import json
+import math
+import mmap
+import os
+import re
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Plain files are split into segments of about this size so one large log
+# still spreads across the pool; gzipped files are one task each
+SEGMENT_BYTES = 32 * 1024 * 1024
+GZIP_READ_BYTES = 16 * 1024 * 1024
+# Same threshold the backend uses to always log a request in compact mode
+DEFAULT_SLOW_MS = 1000
+DEFAULT_INTERVAL = "1h"
+DEFAULT_TOP = 25
+DEFAULT_MIN_REQUESTS = 20
+REGRESSION_RATIO = 1.25
+# Log-spaced latency buckets, 5% wide from 0.1ms up, so percentiles stay
+# within a few percent whatever the range
+HIST_BASE_MS = 0.1
+HIST_GROWTH = 1.05
+_LOG_GROWTH = math.log(HIST_GROWTH)
+MONTHS = {name.encode(): number for number, name in enumerate(calendar.month_abbr) if name}
+
+# log_format main in nginx.prod.conf (time, method, path without query, status,
+# request_time); the dev nginx.conf format has no $request_time, so its access
+# logs are skipped as unrecognised
+NGINX_ACCESS = re.compile(
+    rb'(?m)^\S+ - \S+ \[([^\]\n]+)\] "(\S+) ([^"?\s]*)[^"\n]*" (\d{3}) \S+ '
+    rb'"[^"\n]*" "[^"\n]*" "[^"\n]*" ([\d.]+|-)'
+)
+# limit_req rejections (limit_req_status defaults to 503, so they aren't 429s in the access log)
+NGINX_LIMITED = re.compile(
+    rb'(?m)^(\d{4}/\d\d/\d\d \d\d:\d\d:\d\d) \[error\][^\n]*?limiting requests[^\n]*? by zone "([^"\n]+)"'
+)
+NGINX_ERROR_LINE = re.compile(rb"^\d{4}/\d\d/\d\d \d\d:\d\d:\d\d \[")
+# createAccessLog records as winston.format.json() writes them in compact mode:
+# logform serialises with safe-stable-stringify, so keys come out sorted
+# (duration, method, sampleRate, status, time, url). Records laid out any other
+# way fall back to parse_app_json_lines.
+APP_REQUEST = re.compile(
+    rb'"duration":(\d+),"environment":"[^"\n]*",(?:"ip":"[^"\n]*",)?"level":"\w+","message":"Request",'
+    rb'"method":"([A-Z]+)",(?:"pid":\d+,)?"sampleRate":([\d.e-]+),"service":"[^"\n]*","status":(\d+),'
+    rb'"timestamp":"([^"]{19})[^"\n]*","url":"((?:[^"\\\n]+|\\.)*)"'
+)
+# logSecurityEvent('rate_limit_exceeded', ...) records, sorted the same way: (tier, time)
+APP_RATE_LIMITED = re.compile(
+    rb'"details":\{[^\n]*?"tier":"([^"]*)"[^\n]*?"event":"rate_limit_exceeded"[^\n]*?"timestamp":"([^"]{19})'
+)
+ID_SEGMENT = re.compile(
+    r"/(?:[0-9a-fA-F]{24}|[0-9a-fA-F]{8}-(?:[0-9a-fA-F]{4}-){3}[0-9a-fA-F]{12}|\d+|[A-Za-z0-9_-]{32,})(?=/|$)"
+)
+HASHED_ASSET = re.compile(r"\.[0-9a-f]{8,}(\.\w+)$")
+
+
+class Query(NamedTuple):
+    # (start, end) epoch seconds; the first is the window reported on, the
+    # optional second the baseline it is diffed against
+    windows: Tuple[Tuple[float, float], ...]
+    interval: int
+    slow_ms: float
+    prefix: str
+
+
+class Task(NamedTuple):
+    path: str
+    kind: str
+    start: int
+    end: int
+
+
+class EndpointStats:
+    """Weighted request count, status classes and a latency histogram for one endpoint"""
+
+    __slots__ = ("count", "sum_ms", "max_ms", "client_errors", "server_errors", "buckets")
+
+    def __init__(self):
+        self.count = 0.0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+        self.client_errors = 0.0
+        self.server_errors = 0.0
+        self.buckets: Dict[int, float] = {}
+
+    def observe(self, ms: float, bucket: int, status: int, weight: float) -> None:
+        self.count += weight
+        self.sum_ms += ms * weight
+        if ms > self.max_ms:
+            self.max_ms = ms
+        if status >= 500:
+            self.server_errors += weight
+        elif status >= 400:
+            self.client_errors += weight
+        self.buckets[bucket] = self.buckets.get(bucket, 0.0) + weight
+
+    def merge(self, other: "EndpointStats") -> None:
+        self.count += other.count
+        self.sum_ms += other.sum_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+        self.client_errors += other.client_errors
+        self.server_errors += other.server_errors
+        for bucket, weight in other.buckets.items():
+            self.buckets[bucket] = self.buckets.get(bucket, 0.0) + weight
+
+    def quantile(self, q: float) -> float:
+        """Interpolated inside the bucket the rank falls in, as LatencyHistogram does in the backend"""
+        rank = q * self.count
+        seen = 0.0
+        for bucket in sorted(self.buckets):
+            weight = self.buckets[bucket]
+            if seen + weight >= rank:
+                lower = 0.0 if bucket == 0 else HIST_BASE_MS * HIST_GROWTH ** (bucket - 1)
+                upper = min(HIST_BASE_MS * HIST_GROWTH ** bucket, self.max_ms)
+                return lower + (upper - lower) * ((rank - seen) / weight)
+            seen += weight
+        return self.max_ms
+
+    def summary(self) -> Dict:
+        count = self.count or 1
+        return {
+            "requests": round(self.count),
+            "avg": round(self.sum_ms / count, 1),
+            "p50": round(self.quantile(0.5), 1),
+            "p90": round(self.quantile(0.9), 1),
+            "p99": round(self.quantile(0.99), 1),
+            "max": round(self.max_ms, 1),
+            "clientErrorRate": round(self.client_errors / count, 4),
+            "serverErrorRate": round(self.server_errors / count, 4)
+        }
+
+
+def latency_bucket(ms: float) -> int:
+    return 0 if ms <= HIST_BASE_MS else math.ceil(math.log(ms / HIST_BASE_MS) / _LOG_GROWTH)
+
+
+class LogStats:
+    """Everything one task extracts; partial results from the pool are merged into one"""
+
+    def __init__(self, query: Query):
+        self.query = query
+        # (window, source, endpoint) -> stats
+        self.endpoints: Dict[Tuple[int, str, str], EndpointStats] = {}
+        # (window, source, status) -> weighted count
+        self.statuses: Counter = Counter()
+        # (source, interval start) -> [weighted requests, weighted slow requests]
+        self.timeline: Dict[Tuple[str, int], List[float]] = {}
+        # (interval start, "source:tier or zone") -> rejected requests
+        self.rate_limits: Counter = Counter()
+        self.lines = 0
+        self.unparsed = 0
+        self.first: Optional[float] = None
+        self.last: Optional[float] = None
+        # Parse caches, rebuilt in each worker
+        self.moments: Dict = {}
+        self.names: Dict = {}
+
+    def moment(self, ts: float) -> Optional[Tuple[int, int]]:
+        """(window, timeline interval) for a timestamp, or None outside every window"""
+        for index, (start, end) in enumerate(self.query.windows):
+            if start <= ts < end:
+                if self.first is None or ts < self.first:
+                    self.first = ts
+                if self.last is None or ts > self.last:
+                    self.last = ts
+                return index, int(ts // self.query.interval) * self.query.interval
+        return None
+
+    def cached_moment(self, raw, parse) -> Optional[Tuple[int, int]]:
+        """moment() of a raw timestamp; most lines share their second with a neighbour"""
+        try:
+            return self.moments[raw]
+        except KeyError:
+            if len(self.moments) > 100_000:
+                self.moments.clear()
+            moment = self.moments[raw] = self.moment(parse(raw))
+            return moment
+
+    def endpoint(self, method, path) -> Optional[str]:
+        """Method and path with ids folded into :id; None outside --prefix"""
+        try:
+            return self.names[(method, path)]
+        except KeyError:
+            text = path.decode("latin-1") if isinstance(path, bytes) else path.split("?", 1)[0]
+            name = None
+            if text.startswith(self.query.prefix):
+                verb = method.decode("latin-1") if isinstance(method, bytes) else method
+                name = verb + " " + HASHED_ASSET.sub(r".*\1", ID_SEGMENT.sub("/:id", text))
+            # Paths with ids in them would otherwise grow the cache without bound
+            if len(self.names) > 100_000:
+                self.names.clear()
+            self.names[(method, path)] = name
+            return name
+
+    def record(self, moment: Tuple[int, int], source: str, name: str, status: int, ms: float,
+               bucket: int, weight: float = 1.0) -> None:
+        window, slot = moment
+        key = (window, source, name)
+        stats = self.endpoints.get(key)
+        if stats is None:
+            stats = self.endpoints[key] = EndpointStats()
+        stats.observe(ms, bucket, status, weight)
+
+        self.statuses[(window, source, status)] += weight
+
+        point = self.timeline.get((source, slot))
+        if point is None:
+            point = self.timeline[(source, slot)] = [0.0, 0.0]
+        point[0] += weight
+        if ms >= self.query.slow_ms:
+            point[1] += weight
+
+    def rate_limited(self, moment: Optional[Tuple[int, int]], label: str) -> None:
+        if moment is not None:
+            self.rate_limits[(moment[1], label)] += 1
+
+    def merge(self, other: "LogStats") -> None:
+        for key, stats in other.endpoints.items():
+            if key in self.endpoints:
+                self.endpoints[key].merge(stats)
+            else:
+                self.endpoints[key] = stats
+        self.statuses.update(other.statuses)
+        for key, (requests, slow) in other.timeline.items():
+            point = self.timeline.setdefault(key, [0.0, 0.0])
+            point[0] += requests
+            point[1] += slow
+        self.rate_limits.update(other.rate_limits)
+        self.lines += other.lines
+        self.unparsed += other.unparsed
+        for ts in (other.first, other.last):
+            if ts is not None:
+                self.first = ts if self.first is None else min(self.first, ts)
+                self.last = ts if self.last is None else max(self.last, ts)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["moments"] = {}
+        state["names"] = {}
+        return state
+
+
+# Epoch seconds at the start of each minute seen, keyed by the timestamp text up to the minute
+_minutes: Dict = {}
+
+
+def nginx_time(raw: bytes) -> float:
+    """17/Oct/2026:01:16:58 +0000"""
+    key = raw[:17] + raw[20:]
+    minute = _minutes.get(key)
+    if minute is None:
+        offset = (int(raw[22:24]) * 60 + int(raw[24:26])) * 60
+        minute = calendar.timegm((int(raw[7:11]), MONTHS[raw[3:6]], int(raw[0:2]),
+                                  int(raw[12:14]), int(raw[15:17]), 0))
+        minute = _minutes[key] = minute - offset if raw[21:22] == b"+" else minute + offset
+    return minute + int(raw[18:20])
+
+
+def plain_time(raw) -> float:
+    """2026-10-17T01:16:58.123Z, 2026-10-17 01:16:58 or 2026/10/17 01:16:58, all taken as UTC"""
+    key = raw[:16]
+    minute = _minutes.get(key)
+    if minute is None:
+        minute = _minutes[key] = calendar.timegm((int(raw[0:4]), int(raw[5:7]), int(raw[8:10]),
+                                                  int(raw[11:13]), int(raw[14:16]), 0))
+    return minute + int(raw[17:19])
+
+
+# Parsers: one per log kind, each feeding a block of whole lines into LogStats
+
+def parse_nginx_access(block: bytes, stats: LogStats) -> None:
+    # request_time has millisecond resolution, so a handful of distinct values
+    # cover most lines; each is converted and bucketed once
+    latencies: Dict[bytes, Tuple[float, int]] = {}
+    matches = NGINX_ACCESS.findall(block)
+    stats.unparsed += block.count(b"\n") - len(matches)
+    for raw_time, method, path, status, request_time in matches:
+        moment = stats.cached_moment(raw_time, nginx_time)
+        if moment is None or request_time == b"-":
+            continue
+        name = stats.endpoint(method, path)
+        if name is None:
+            continue
+        latency = latencies.get(request_time)
+        if latency is None:
+            ms = float(request_time) * 1000
+            latency = latencies[request_time] = (ms, latency_bucket(ms))
+        stats.record(moment, "nginx", name, int(status), latency[0], latency[1])
+
+
+def parse_nginx_error(block: bytes, stats: LogStats) -> None:
+    for raw_time, zone in NGINX_LIMITED.findall(block):
+        stats.rate_limited(stats.cached_moment(raw_time, plain_time), f"nginx:{zone.decode()}")
+
+
+def parse_app_json(block: bytes, stats: LogStats) -> None:
+    """Compact mode app.log: one JSON record per line"""
+    requests = APP_REQUEST.findall(block)
+    limits = APP_RATE_LIMITED.findall(block)
+    if len(requests) != block.count(b'"message":"Request"') or len(limits) != block.count(b'"rate_limit_exceeded"'):
+        parse_app_json_lines(block, stats)
+        return
+
+    # Every record has the layout the backend writes, so none needs decoding as JSON.
+    # Durations are whole milliseconds and there are only a few sample rates, so
+    # each is converted once per block.
+    latencies: Dict[bytes, Tuple[float, int]] = {}
+    weights: Dict[bytes, float] = {}
+    for duration, method, sample_rate, status, raw_time, url in requests:
+        moment = stats.cached_moment(raw_time, plain_time)
+        if moment is None:
+            continue
+        if b"\\" in url:
+            url = json.loads(b'"' + url + b'"').encode("latin-1", "replace")
+        name = stats.endpoint(method, url.split(b"?", 1)[0])
+        if name is None:
+            continue
+        latency = latencies.get(duration)
+        if latency is None:
+            ms = float(duration)
+            latency = latencies[duration] = (ms, latency_bucket(ms))
+        weight = weights.get(sample_rate)
+        if weight is None:
+            weight = weights[sample_rate] = 1 / (float(sample_rate) or 1)
+        stats.record(moment, "app", name, int(status), latency[0], latency[1], weight)
+    for tier, raw_time in limits:
+        stats.rate_limited(stats.cached_moment(raw_time, plain_time), f"app:{tier.decode()}")
+
+
+def parse_app_json_lines(block: bytes, stats: LogStats) -> None:
+    """Record by record, for blocks with a line parse_app_json's patterns don't cover"""
+    for line in block.split(b"\n"):
+        # Most records are neither; skip them without decoding
+        if b'"message":"Request"' in line:
+            try:
+                record = json.loads(line)
+                moment = stats.cached_moment(record["timestamp"][:19], plain_time)
+                name = stats.endpoint(record["method"], record["url"]) if moment else None
+                if name is not None:
+                    ms = float(record["duration"])
+                    stats.record(moment, "app", name, int(record["status"]), ms, latency_bucket(ms),
+                                 1 / (record.get("sampleRate") or 1))
+            except (ValueError, KeyError, TypeError):
+                stats.unparsed += 1
+        elif b'"rate_limit_exceeded"' in line:
+            try:
+                record = json.loads(line)
+                tier = (record.get("details") or {}).get("tier", "ip")
+                stats.rate_limited(stats.cached_moment(record["timestamp"][:19], plain_time), f"app:{tier}")
+            except (ValueError, KeyError, TypeError):
+                stats.unparsed += 1
+
+
+def parse_app_pretty(block: bytes, stats: LogStats) -> None:
+    """Pretty mode combined/security logs: util.inspect blocks, top-level keys indented two spaces.
+
+    Requests are not in these files (Morgan logs below the default level), so
+    only rate limit events are read.
+    """
+    event = tier = timestamp = None
+    for line in block.split(b"\n"):
+        if line.startswith(b"  event: "):
+            event = line[10:].rstrip(b"',")
+        elif line.startswith(b"  timestamp: "):
+            timestamp = line[14:].rstrip(b"',")
+        elif line.startswith(b"    tier: "):
+            tier = line[11:].rstrip(b"',")
+        elif line.startswith(b"}"):
+            if event == b"rate_limit_exceeded" and timestamp:
+                stats.rate_limited(stats.cached_moment(timestamp[:19], plain_time),
+                                   f"app:{(tier or b'ip').decode()}")
+            event = tier = timestamp = None
+
+
+PARSERS = {
+    "nginx-access": parse_nginx_access,
+    "nginx-error": parse_nginx_error,
+    "app-json": parse_app_json,
+    "app-pretty": parse_app_pretty
+}
+
+
+# Reading
+
+def open_log(path: str):
+    return gzip.open(path, "rb") if path.endswith(".gz") else open(path, "rb")
+
+
+def sniff(path: str) -> Optional[str]:
+    """The log kind, from the first non-empty line"""
+    with open_log(path) as f:
+        head = f.read(64 * 1024)
+    line = next((line for line in head.splitlines() if line.strip()), b"")
+    if line.startswith(b'{"'):
+        return "app-json"
+    if line.rstrip() == b"{" or line.startswith(b"{ "):
+        return "app-pretty"
+    if NGINX_ERROR_LINE.match(line):
+        return "nginx-error"
+    if NGINX_ACCESS.match(line):
+        return "nginx-access"
+    return None
+
+
+def line_blocks(task: Task) -> Iterator[bytes]:
+    """The task's bytes in blocks of whole lines, each ending with a newline"""
+    if task.path.endswith(".gz"):
+        rest = b""
+        with gzip.open(task.path, "rb") as f:
+            while True:
+                data = f.read(GZIP_READ_BYTES)
+                if not data:
+                    break
+                data = rest + data
+                cut = data.rfind(b"\n") + 1
+                rest = data[cut:]
+                if cut:
+                    yield data[:cut]
+        if rest:
+            yield rest + b"\n"
+        return
+
+    if task.end <= task.start:
+        return
+    with open(task.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        block = mapped[task.start:task.end]
+    yield block if block.endswith(b"\n") else block + b"\n"
+
+
+def analyze_task(task: Task, query: Query) -> LogStats:
+    stats = LogStats(query)
+    parse = PARSERS[task.kind]
+    for block in line_blocks(task):
+        stats.lines += block.count(b"\n")
+        parse(block, stats)
+    return stats
+
+
+def plan_tasks(paths: List[str]) -> List[Task]:
+    """Sniff each log and cut plain files into newline-aligned segments"""
+    tasks = []
+    kinds = {}
+    for path in paths:
+        try:
+            kind = sniff(path)
+        except (OSError, EOFError) as e:
+            logger.warning(f"⚠️  Skipping {path}: {e}")
+            continue
+        if kind is None:
+            logger.warning(f"⚠️  Skipping {path}: not a recognised log format")
+            continue
+        kinds[path] = kind
+
+    # Pretty mode writes warnings to combined.log and again to security.log/error.log
+    has_combined = any(kind == "app-pretty" and Path(path).name.startswith("combined")
+                       for path, kind in kinds.items())
+    for path, kind in kinds.items():
+        name = Path(path).name
+        if has_combined and kind == "app-pretty" and name.startswith(("security", "error")):
+            logger.debug(f"Skipping {path}: its records are also in combined.log")
+            continue
+
+        size = os.path.getsize(path)
+        # Multi-line records can't be cut at an arbitrary newline
+        if path.endswith(".gz") or kind == "app-pretty" or size <= SEGMENT_BYTES:
+            tasks.append(Task(path, kind, 0, size))
+            continue
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            start = 0
+            while start < size:
+                newline = mapped.find(b"\n", min(start + SEGMENT_BYTES, size))
+                end = size if newline < 0 else newline + 1
+                tasks.append(Task(path, kind, start, end))
+                start = end
+    return tasks
+
+
+def expand_paths(paths: List[str]) -> List[str]:
+    """Files as given; directories contribute their current and rotated logs (x.log, x.log.1, x.log.2.gz)"""
+    files = []
+    for raw in paths:
+        path = Path(raw)
+        if path.is_dir():
+            files.extend(str(p) for p in sorted(path.iterdir()) if p.is_file() and ".log" in p.name)
+        elif path.is_file():
+            files.append(str(path))
+        else:
+            logger.warning(f"⚠️  Not found: {raw}")
+    return files
+
+
+def analyze(paths: List[str], query: Query, workers: int = None) -> Tuple[LogStats, int]:
+    tasks = plan_tasks(expand_paths(paths))
+    total = LogStats(query)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(tasks) or 1))
+    if workers == 1:
+        for task in tasks:
+            total.merge(analyze_task(task, query))
+        return total, len(tasks)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(analyze_task, task, query) for task in tasks]
+        for future in as_completed(futures):
+            total.merge(future.result())
+    return total, len(tasks)
+
+
+# Reporting
+
+def endpoint_table(stats: LogStats, window: int) -> Dict[str, Dict[str, Dict]]:
+    table: Dict[str, Dict[str, Dict]] = {}
+    for (index, source, name), endpoint in stats.endpoints.items():
+        if index == window:
+            table.setdefault(source, {})[name] = endpoint.summary()
+    return table
+
+
+def status_rates(stats: LogStats, window: int) -> Dict[str, Dict[str, float]]:
+    counts: Dict[str, Counter] = {}
+    for (index, source, status), count in stats.statuses.items():
+        if index == window:
+            counts.setdefault(source, Counter())[status] += count
+    return {
+        source: {str(status): round(count / (sum(statuses.values()) or 1), 4)
+                 for status, count in sorted(statuses.items())}
+        for source, statuses in counts.items()
+    }
+
+
+def window_diff(current: Dict[str, Dict[str, Dict]], baseline: Dict[str, Dict[str, Dict]],
+                min_requests: int) -> List[Dict]:
+    """Endpoints seen often enough in both windows, worst p99 regression first"""
+    rows = []
+    for source, endpoints in current.items():
+        for name, now in endpoints.items():
+            before = baseline.get(source, {}).get(name)
+            if not before or min(before["requests"], now["requests"]) < min_requests:
+                continue
+            rows.append({
+                "source": source,
+                "endpoint": name,
+                "requests": [before["requests"], now["requests"]],
+                "p50": [before["p50"], now["p50"]],
+                "p99": [before["p99"], now["p99"]],
+                "p99Ratio": round(now["p99"] / before["p99"], 2) if before["p99"] else None,
+                "serverErrorRate": [before["serverErrorRate"], now["serverErrorRate"]]
+            })
+    rows.sort(key=lambda row: row["p99Ratio"] or 0, reverse=True)
+    return rows
+
+
+def iso(ts: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%d %H:%M") if ts is not None else None
+
+
+def build_report(stats: LogStats, tasks: int, seconds: float, min_requests: int) -> Dict:
+    current = endpoint_table(stats, 0)
+    report = {
+        "range": {"first": iso(stats.first), "last": iso(stats.last)},
+        "lines": stats.lines,
+        "unparsed": stats.unparsed,
+        "tasks": tasks,
+        "seconds": round(seconds, 2),
+        "slowMs": stats.query.slow_ms,
+        "minRequests": min_requests,
+        "intervalSeconds": stats.query.interval,
+        "endpoints": current,
+        "statusRates": status_rates(stats, 0),
+        "slowRequests": [
+            {"at": iso(at), "source": source, "requests": round(requests), "slow": round(slow)}
+            for (source, at), (requests, slow) in sorted(stats.timeline.items(), key=lambda item: item[0][::-1])
+        ],
+        "rateLimits": [
+            {"at": iso(at), "limiter": label, "rejected": count}
+            for (at, label), count in sorted(stats.rate_limits.items())
+        ]
+    }
+    if len(stats.query.windows) > 1:
+        baseline = endpoint_table(stats, 1)
+        report["baseline"] = {"endpoints": baseline, "statusRates": status_rates(stats, 1)}
+        report["diff"] = window_diff(current, baseline, min_requests)
+    return report
+
+
+def bar(value: float, peak: float, width: int = 30) -> str:
+    return "█" * max(1, round(value / peak * width)) if value and peak else ""
+
+
+def print_report(report: Dict, top: int, sort: str) -> None:
+    """Print a human-readable report"""
+    span = report["range"]
+    print(f"📊 LOG ANALYSIS ({span['first']} → {span['last']} UTC, {report['lines']:,} lines, "
+          f"{report['seconds']}s)")
+    print("-" * 50)
+
+    sort_keys = {
+        "requests": lambda item: item[1]["requests"],
+        "p99": lambda item: item[1]["p99"],
+        "errors": lambda item: item[1]["serverErrorRate"] + item[1]["clientErrorRate"]
+    }
+    for source, endpoints in sorted(report["endpoints"].items()):
+        print(f"🌐 Endpoints ({source}, top {top} by {sort}):")
+        print(f"  {'endpoint':<44} {'requests':>9} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8} {'4xx':>6} {'5xx':>6}")
+        for name, row in sorted(endpoints.items(), key=sort_keys[sort], reverse=True)[:top]:
+            print(f"  {name[:44]:<44} {row['requests']:>9,} {row['p50']:>8.1f} {row['p90']:>8.1f} "
+                  f"{row['p99']:>8.1f} {row['max']:>8.1f} {row['clientErrorRate'] * 100:>5.1f}% "
+                  f"{row['serverErrorRate'] * 100:>5.1f}%")
+        print()
+
+    print("🚦 Status codes:")
+    for source, rates in sorted(report["statusRates"].items()):
+        print(f"  {source:<6} " + "  ".join(f"{status} {rate * 100:.1f}%" for status, rate in rates.items()))
+    print()
+
+    slow = [point for point in report["slowRequests"] if point["slow"]]
+    print(f"🐢 Slow requests (≥{report['slowMs']:g}ms):")
+    peak = max((point["slow"] for point in slow), default=0)
+    for point in slow:
+        print(f"  {point['at']}  {point['source']:<6} {point['slow']:>7,} of {point['requests']:>9,}  "
+              f"{bar(point['slow'], peak)}")
+    if not slow:
+        print("  none")
+    print()
+
+    print("⛔ Rate-limit rejections:")
+    peak = max((point["rejected"] for point in report["rateLimits"]), default=0)
+    for point in report["rateLimits"]:
+        print(f"  {point['at']}  {point['limiter']:<14} {point['rejected']:>7,}  {bar(point['rejected'], peak)}")
+    if not report["rateLimits"]:
+        print("  none")
+
+    if "diff" in report:
+        print()
+        print(f"🔀 Baseline → current (endpoints with ≥ {report['minRequests']} requests in both, worst p99 first):")
+        for row in report["diff"][:top]:
+            ratio = row["p99Ratio"]
+            flag = "⚠️ " if ratio and ratio >= REGRESSION_RATIO else "  "
+            print(f"{flag}{row['source']:<6} {row['endpoint'][:40]:<40} p50 {row['p50'][0]:>7.1f} → {row['p50'][1]:<7.1f} "
+                  f"p99 {row['p99'][0]:>7.1f} → {row['p99'][1]:<7.1f} "
+                  f"{'x' + format(ratio, '.2f') if ratio else '':>6}  "
+                  f"5xx {row['serverErrorRate'][0] * 100:.1f}% → {row['serverErrorRate'][1] * 100:.1f}%")
+
+
+# Command line
+
+def parse_time(value: str, now: datetime) -> float:
+    """An ISO date/time (UTC unless it has an offset), or an age such as 90m, 6h or 7d"""
+    ages = {"m": "minutes", "h": "hours", "d": "days"}
+    if value[-1:] in ages and value[:-1].isdigit():
+        return (now - timedelta(**{ages[value[-1]]: int(value[:-1])})).timestamp()
+    moment = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+def parse_interval(value: str) -> int:
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+    if value[-1:] not in units or not value[:-1].isdigit() or int(value[:-1]) <= 0:
+        raise ValueError(f"Invalid interval: {value} (use e.g. 5m, 1h, 1d)")
+    return int(value[:-1]) * units[value[-1]]
+
+
+def build_query(args, now: datetime) -> Query:
+    since = parse_time(args.since, now) if args.since else float("-inf")
+    until = parse_time(args.until, now) if args.until else float("inf")
+    windows: Tuple[Tuple[float, float], ...] = ((since, until),)
+    if args.split:
+        split = parse_time(args.split, now)
+        windows = ((max(since, split), until), (since, min(until, split)))
+    elif args.baseline:
+        start, _, end = args.baseline.partition("..")
+        windows = ((since, until), (parse_time(start, now), parse_time(end, now) if end else float("inf")))
+    return Query(windows, parse_interval(args.interval), args.slow_ms, args.prefix)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Observatory log analysis over nginx and backend logs")
+    parser.add_argument("paths", nargs="+",
+                        help="Log files or directories (e.g. /var/log/nginx /var/log/observatory-booking); .gz is read directly")
+    parser.add_argument("--since", help="Start of the window (ISO time, or an age like 24h or 7d)")
+    parser.add_argument("--until", help="End of the window")
+    parser.add_argument("--split", help="Diff before vs after this time (e.g. the last deploy)")
+    parser.add_argument("--baseline", help="Diff against this window instead: FROM..TO")
+    parser.add_argument("--interval", default=DEFAULT_INTERVAL, help="Timeline bucket (e.g. 5m, 1h, 1d)")
+    parser.add_argument("--slow-ms", type=float, default=DEFAULT_SLOW_MS, help="Slow request threshold")
+    parser.add_argument("--prefix", default="", help="Only endpoints under this path (e.g. /api)")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="Endpoints per table")
+    parser.add_argument("--sort", choices=["requests", "p99", "errors"], default="requests", help="Endpoint order")
+    parser.add_argument("--min-requests", type=int, default=DEFAULT_MIN_REQUESTS,
+                        help="Diff: ignore endpoints with fewer requests in either window")
+    parser.add_argument("--workers", type=int, help="Parser processes (default: one per CPU)")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Verbose output")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        stream=sys.stderr
+    )
+
+    try:
+        query = build_query(args, datetime.now(timezone.utc))
+    except ValueError as e:
+        logger.error(f"❌ {e}")
+        sys.exit(1)
+
+    started = time.perf_counter()
+    stats, tasks = analyze(args.paths, query, args.workers)
+    if not tasks:
+        logger.error("❌ No readable logs found")
+        sys.exit(1)
+    report = build_report(stats, tasks, time.perf_counter() - started, args.min_requests)
+    logger.info(f"⏱️  Parsed {stats.lines:,} lines in {report['seconds']}s ({tasks} tasks)")
+
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        print_report(report, args.top, args.sort)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,9 @@
 
 import os
 from datetime import datetime
+from pathlib import Path
+
+from status_engine import StatusEngine, print_report
 
 def print_header():
     print("=" * 80)
@@ -40,12 +43,7 @@ def print_completed_work():
     print()
 
 def print_current_status():
-    print("🟢 CURRENT STATUS:")
-    print("-" * 50)
-    print("  • Backend: ✅ RUNNING (http://localhost:30001)")
-    print("  • Frontend: ✅ RUNNING (http://localhost:30002)")
-    print("  • Database: ✅ CONNECTED (MongoDB)")
-    print("  • Sample Data: ✅ SEEDED")
+    print_report(StatusEngine(Path(__file__).parent).collect())
     print()
     
     print("📋 CREDENTIALS:")
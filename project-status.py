@@ -4,11 +4,13 @@ Observatory Booking App - Project Status and Next Steps
 This script provides the current status and guidance for completing the setup.
 """
 
+import argparse
+import json
 import os
-import subprocess
-import sys
 from pathlib import Path
 
+from status_engine import StatusEngine, print_performance, print_report, scrape_metrics
+
 def print_status(message, status="INFO"):
     colors = {
         "INFO": "\033[0;34m",
@@ -19,89 +21,43 @@ def print_status(message, status="INFO"):
     }
     print(f"{colors[status]}[{status}]{colors['RESET']} {message}")
 
-def check_file_exists(path):
-    """Check if a file exists and return status"""
-    return os.path.exists(path)
-
 def main():
+    parser = argparse.ArgumentParser(description="Observatory Booking App project status")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable status only")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore cached probe results")
+    parser.add_argument("--performance", action="store_true",
+                        help="Scrape /api/metrics and summarize per-route latency")
+    parser.add_argument("--metrics-token", default=os.environ.get("METRICS_TOKEN"),
+                        help="Admin JWT for /api/metrics in production (default: $METRICS_TOKEN)")
+    args = parser.parse_args()
+    
+    engine = StatusEngine(Path(__file__).parent)
+    status = engine.collect(use_cache=not args.no_cache)
+    performance, performance_error = None, None
+    if args.performance:
+        try:
+            performance = scrape_metrics(engine.backend_url, args.metrics_token)
+        except (OSError, ValueError) as e:
+            performance_error = str(e)
+    
+    if args.json:
+        if args.performance:
+            status = {**status, "performance": performance or {"error": performance_error}}
+        print(json.dumps(status, indent=2))
+        return
+    
     print("🔭 Observatory Booking App - Project Status Report")
     print("=" * 60)
     
-    # Check project structure
-    project_root = Path.cwd()
-    
-    print_status("Checking project structure...")
-    
-    # Backend status
-    backend_files = [
-        "backend/package.json",
-        "backend/tsconfig.json", 
-        "backend/src/index.ts",
-        "backend/src/models/User.ts",
-        "backend/src/models/Telescope.ts",
-        "backend/src/models/Booking.ts",
-        "backend/src/routes/auth.ts",
-        "backend/src/routes/bookings.ts",
-        "backend/src/routes/telescopes.ts",
-        "backend/src/routes/users.ts",
-        "backend/src/routes/admin.ts",
-        "backend/src/services/emailService.ts",
-        "backend/src/services/reminderService.ts"
-    ]
-    
-    print_status("Backend files:")
-    for file in backend_files:
-        if check_file_exists(file):
-            print_status(f"  ✓ {file}", "SUCCESS")
-        else:
-            print_status(f"  ✗ {file}", "ERROR")
-    
-    # Frontend status
-    frontend_files = [
-        "frontend/package.json",
-        "frontend/src/App.tsx",
-        "frontend/src/index.tsx",
-        "frontend/src/hooks/useAuth.tsx",
-        "frontend/src/components/Header.tsx",
-        "frontend/src/pages/HomePage.tsx",
-        "frontend/src/pages/LoginPage.tsx",
-        "frontend/src/pages/BookingPage.tsx",
-        "frontend/src/pages/AdminDashboard.tsx"
-    ]
-    
-    print_status("Frontend files:")
-    for file in frontend_files:
-        if check_file_exists(file):
-            print_status(f"  ✓ {file}", "SUCCESS")
-        else:
-            print_status(f"  ✗ {file}", "ERROR")
-    
-    # Mobile app status
-    mobile_files = [
-        "mobile/package.json",
-        "mobile/capacitor.config.json"
-    ]
-    
-    print_status("Mobile app files:")
-    for file in mobile_files:
-        if check_file_exists(file):
-            print_status(f"  ✓ {file}", "SUCCESS")
-        else:
-            print_status(f"  ✗ {file}", "ERROR")
-    
-    # WordPress plugin status
-    wp_files = [
-        "wordpress-plugin/observatory-booking.php",
-        "wordpress-plugin/assets/css/booking-app.css",
-        "wordpress-plugin/assets/js/booking-app.js"
-    ]
-    
-    print_status("WordPress plugin files:")
-    for file in wp_files:
-        if check_file_exists(file):
-            print_status(f"  ✓ {file}", "SUCCESS")
-        else:
-            print_status(f"  ✗ {file}", "ERROR")
+    print_status("Checking project structure and services...")
+    print()
+    print_report(status)
+    
+    if performance:
+        print()
+        print_performance(performance)
+    elif performance_error:
+        print_status(f"Could not scrape {engine.backend_url}/api/metrics: {performance_error}", "WARNING")
     
     print("\n🎯 Current Status Summary")
     print("=" * 40)
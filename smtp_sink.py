@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Observatory Booking App - Local SMTP Sink
+A stand-in mail server for exercising the backend mail queue, with optional slowness and failures
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from email import message_from_bytes
+from email.header import decode_header, make_header
+from pathlib import Path
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 1025
+MAX_LINE_BYTES = 1024 * 1024
+
+class SinkStats:
+    """Counters for everything the sink accepted or refused"""
+
+    def __init__(self):
+        self.connections = 0
+        self.accepted = 0
+        self.rejected = 0
+        self.started = time.perf_counter()
+
+    def __str__(self) -> str:
+        elapsed = time.perf_counter() - self.started
+        rate = self.accepted / elapsed if elapsed > 0 else 0.0
+        return (f"{self.connections} connections, {self.accepted} accepted, "
+                f"{self.rejected} rejected ({rate:.1f} msg/s)")
+
+class SmtpSink:
+    """Speaks enough SMTP for nodemailer: EHLO, AUTH PLAIN/LOGIN, MAIL, RCPT, DATA"""
+
+    def __init__(self, delay: float = 0.0, fail_rate: float = 0.0, save_dir: Optional[Path] = None):
+        self.delay = delay
+        self.fail_rate = fail_rate
+        self.save_dir = Path(save_dir) if save_dir else None
+        self.stats = SinkStats()
+        if self.save_dir:
+            self.save_dir.mkdir(parents=True, exist_ok=True)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.stats.connections += 1
+
+        async def reply(line: str) -> None:
+            writer.write(f"{line}\r\n".encode())
+            await writer.drain()
+
+        async def read_line() -> Optional[str]:
+            line = await reader.readline()
+            return line.decode(errors="replace").rstrip("\r\n") if line else None
+
+        await reply("220 observatory-smtp-sink ESMTP ready")
+        sender, recipients = None, []
+        try:
+            while True:
+                line = await read_line()
+                if line is None:
+                    break
+                verb = line.split(" ", 1)[0].upper()
+
+                if verb == "EHLO":
+                    await reply("250-observatory-smtp-sink")
+                    await reply("250-AUTH PLAIN LOGIN")
+                    await reply("250 8BITMIME")
+                elif verb == "HELO":
+                    await reply("250 observatory-smtp-sink")
+                elif verb == "AUTH":
+                    parts = line.split()
+                    mechanism = parts[1].upper() if len(parts) > 1 else ""
+                    if mechanism == "PLAIN" and len(parts) < 3:
+                        await reply("334 ")
+                        await read_line()
+                    elif mechanism == "LOGIN":
+                        await reply("334 VXNlcm5hbWU6")
+                        await read_line()
+                        await reply("334 UGFzc3dvcmQ6")
+                        await read_line()
+                    await reply("235 Authentication succeeded")
+                elif verb == "MAIL":
+                    sender, recipients = line[10:].strip(), []
+                    await reply("250 OK")
+                elif verb == "RCPT":
+                    recipients.append(line[8:].strip())
+                    await reply("250 OK")
+                elif verb == "DATA":
+                    await reply("354 End data with <CR><LF>.<CR><LF>")
+                    body = bytearray()
+                    while True:
+                        raw = await reader.readline()
+                        if not raw or raw in (b".\r\n", b".\n"):
+                            break
+                        body.extend(raw[1:] if raw.startswith(b"..") else raw)
+                    await reply(await self.accept(sender, recipients, bytes(body)))
+                    sender, recipients = None, []
+                elif verb == "RSET":
+                    sender, recipients = None, []
+                    await reply("250 OK")
+                elif verb == "NOOP":
+                    await reply("250 OK")
+                elif verb == "QUIT":
+                    await reply("221 Bye")
+                    break
+                else:
+                    await reply("502 Command not implemented")
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def accept(self, sender: str, recipients: list, body: bytes) -> str:
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if random.random() < self.fail_rate:
+            self.stats.rejected += 1
+            logger.info(f"❌ Rejected message from {sender} (simulated failure)")
+            return "451 Temporary failure, try again later"
+
+        self.stats.accepted += 1
+        message = message_from_bytes(body)
+        subject = str(make_header(decode_header(message.get("Subject", ""))))
+        logger.info(f"📨 #{self.stats.accepted} {', '.join(recipients)}: {subject}")
+        if self.save_dir:
+            (self.save_dir / f"{self.stats.accepted:06d}.eml").write_bytes(body)
+        return "250 OK: queued"
+
+async def serve(host: str, port: int, sink: SmtpSink) -> None:
+    server = await asyncio.start_server(sink.handle, host, port, limit=MAX_LINE_BYTES)
+    logger.info(f"📬 SMTP sink listening on {host}:{port} "
+                f"(delay {sink.delay}s, failure rate {sink.fail_rate:.0%})")
+    logger.info(f"   Point the backend at it with SMTP_HOST={host} SMTP_PORT={port}")
+    async with server:
+        await server.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description="Local SMTP sink for testing the backend mail queue")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Address to listen on")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to listen on")
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds to wait before answering DATA")
+    parser.add_argument("--fail-rate", type=float, default=0.0,
+                        help="Fraction of messages answered with a temporary failure (0-1)")
+    parser.add_argument("--save-dir", help="Write each accepted message to this directory as .eml")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    sink = SmtpSink(delay=args.delay, fail_rate=args.fail_rate, save_dir=args.save_dir)
+    try:
+        asyncio.run(serve(args.host, args.port, sink))
+    except KeyboardInterrupt:
+        pass
+    logger.info(f"📊 {sink.stats}")
+    sys.exit(0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+Observatory Booking App - Project Status Engine
+Discovers project components on disk and probes the running services in parallel
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import re
+import sys
+import time
+import urllib.request
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+DEFAULT_BACKEND_URL = "http://localhost:30001"
+DEFAULT_FRONTEND_URL = "http://localhost:30002"
+DEFAULT_MONGODB_URI = "mongodb://localhost:27017/observatory-booking"
+DEFAULT_BUDGET_SECONDS = 2.0
+DEFAULT_CACHE_TTL = 10.0
+CACHE_FILE = ".status-cache.json"
+SKIPPED_DIRS = {"node_modules", ".git", "dist", "build", "www", "venv", ".venv", "__pycache__", ".build-cache"}
+MAX_RESPONSE_BYTES = 64 * 1024
+SAMPLE_PATTERN = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})?\s+(\S+)')
+LABEL_PATTERN = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+def _read_json(path: str) -> Dict:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _classify(path: str, names: List[str]) -> Optional[str]:
+    if "capacitor.config.json" in names:
+        return "mobile"
+    if "package.json" in names:
+        package = _read_json(os.path.join(path, "package.json"))
+        deps = {**package.get("dependencies", {}), **package.get("devDependencies", {})}
+        if "express" in deps:
+            return "backend"
+        if "react" in deps or "react-scripts" in deps:
+            return "frontend"
+        return "workspace"
+    for name in names:
+        if name.endswith(".php"):
+            with open(os.path.join(path, name), errors="replace") as f:
+                if "Plugin Name:" in f.read(2048):
+                    return "wordpress-plugin"
+    return None
+
+def discover_components(project_root: Path, max_depth: int = 3) -> List[Dict]:
+    """Walk the tree once with os.scandir and describe every component found"""
+    components = []
+    pending = [(str(project_root), 0)]
+    while pending:
+        path, depth = pending.pop()
+        try:
+            with os.scandir(path) as it:
+                entries = list(it)
+        except OSError:
+            continue
+
+        names = [entry.name for entry in entries]
+        kind = _classify(path, names)
+        if kind:
+            components.append({
+                "name": os.path.relpath(path, project_root),
+                "type": kind,
+                "path": path,
+                "has_lockfile": "package-lock.json" in names,
+                "dependencies_installed": "node_modules" in names,
+                "built": any(name in names for name in ("dist", "build", "www"))
+            })
+
+        if depth < max_depth:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False) and entry.name not in SKIPPED_DIRS:
+                    pending.append((entry.path, depth + 1))
+
+    return sorted(components, key=lambda c: c["name"])
+
+async def _open(host: str, port: int, use_ssl: bool = False):
+    return await asyncio.open_connection(host, port, ssl=use_ssl or None)
+
+async def probe_http(name: str, url: str, path: str = "/") -> Dict:
+    """GET a URL over a raw connection and report status and latency"""
+    parts = urlsplit(url)
+    use_ssl = parts.scheme == "https"
+    host = parts.hostname or "localhost"
+    port = parts.port or (443 if use_ssl else 80)
+    started = time.perf_counter()
+
+    reader, writer = await _open(host, port, use_ssl)
+    try:
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode())
+        await writer.drain()
+        # Connection: close, so the response ends at EOF; a single read() may
+        # return only the headers
+        response = b""
+        while len(response) < MAX_RESPONSE_BYTES:
+            chunk = await reader.read(MAX_RESPONSE_BYTES - len(response))
+            if not chunk:
+                break
+            response += chunk
+    finally:
+        writer.close()
+
+    latency_ms = (time.perf_counter() - started) * 1000
+    head, _, body = response.partition(b"\r\n\r\n")
+    status_line = head.split(b"\r\n", 1)[0].decode(errors="replace")
+    code = int(status_line.split()[1]) if len(status_line.split()) > 1 else 0
+
+    result = {"name": name, "target": f"{url}{path}", "status_code": code, "latency_ms": round(latency_ms, 1)}
+    result["status"] = "up" if 200 <= code < 400 else "degraded"
+    try:
+        health = json.loads(body.decode(errors="replace"))
+        if isinstance(health, dict) and "status" in health:
+            result["reported_status"] = health["status"]
+            if health["status"] == "unhealthy":
+                result["status"] = "degraded"
+    except ValueError:
+        pass
+    return result
+
+async def probe_tcp(name: str, host: str, port: int) -> Dict:
+    """Check that something accepts connections on host:port"""
+    started = time.perf_counter()
+    _, writer = await _open(host, port)
+    writer.close()
+    return {
+        "name": name,
+        "target": f"{host}:{port}",
+        "status": "up",
+        "latency_ms": round((time.perf_counter() - started) * 1000, 1)
+    }
+
+def _mongo_target(uri: str):
+    parts = urlsplit(uri)
+    if parts.scheme == "mongodb+srv":
+        return None
+    host = (parts.netloc.rsplit("@", 1)[-1].split(",")[0]) or "localhost"
+    if ":" in host:
+        host, port = host.rsplit(":", 1)
+        return host, int(port)
+    return host, 27017
+
+async def probe_services(budget: float, backend_url: str, frontend_url: str, mongodb_uri: str) -> List[Dict]:
+    """Run every probe concurrently, never waiting longer than the budget"""
+    probes = {
+        "backend": probe_http("backend", backend_url, "/api/health"),
+        "frontend": probe_http("frontend", frontend_url, "/")
+    }
+    mongo = _mongo_target(mongodb_uri)
+    if mongo:
+        probes["database"] = probe_tcp("database", *mongo)
+
+    tasks = {asyncio.ensure_future(coro): name for name, coro in probes.items()}
+    done, pending = await asyncio.wait(tasks, timeout=budget)
+    for task in pending:
+        task.cancel()
+
+    results = []
+    for task, name in tasks.items():
+        if task in pending:
+            results.append({"name": name, "status": "timeout", "error": f"no answer within {budget}s"})
+        elif task.exception():
+            error = task.exception()
+            results.append({"name": name, "status": "down", "error": str(error) or type(error).__name__})
+        else:
+            results.append(task.result())
+
+    if not mongo:
+        results.append({"name": "database", "status": "skipped", "error": "SRV connection strings are not probed"})
+    return sorted(results, key=lambda r: r["name"])
+
+def parse_prometheus(text: str) -> List[Tuple[str, Dict[str, str], float]]:
+    """Parse Prometheus text exposition into (name, labels, value) samples"""
+    samples = []
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        match = SAMPLE_PATTERN.match(line)
+        if not match:
+            continue
+        name, raw_labels, value = match.groups()
+        labels = {key: re.sub(r'\\(.)', lambda m: "\n" if m.group(1) == "n" else m.group(1), val)
+                  for key, val in LABEL_PATTERN.findall(raw_labels or "")}
+        try:
+            samples.append((name, labels, float(value)))
+        except ValueError:
+            continue
+    return samples
+
+def histogram_quantile(q: float, buckets: List[Tuple[float, float]]) -> float:
+    """Estimate a quantile from cumulative (upper bound, count) buckets, like PromQL does"""
+    buckets = sorted(buckets)
+    if not buckets or buckets[-1][1] == 0:
+        return 0.0
+    rank = q * buckets[-1][1]
+    previous_bound, previous_count = 0.0, 0.0
+    for bound, count in buckets:
+        if count >= rank:
+            if math.isinf(bound):
+                return previous_bound
+            span = count - previous_count
+            return previous_bound + (bound - previous_bound) * ((rank - previous_count) / span if span else 0)
+        previous_bound, previous_count = bound, count
+    return previous_bound
+
+def summarize_metrics(text: str) -> Dict:
+    """Per-route latency percentiles (ms), DB/handler split and error counts from /api/metrics"""
+    histograms = defaultdict(lambda: defaultdict(list))
+    counts = defaultdict(lambda: defaultdict(float))
+    gauges = {}
+    prefixes = {
+        "http_request_duration_seconds": "total",
+        "http_request_db_duration_seconds": "db",
+        "http_request_handler_duration_seconds": "handler"
+    }
+
+    for name, labels, value in parse_prometheus(text):
+        if name.endswith("_bucket") and name[:-len("_bucket")] in prefixes:
+            route = (labels.get("method", ""), labels.get("route", ""))
+            bound = math.inf if labels.get("le") == "+Inf" else float(labels.get("le", "inf"))
+            histograms[route][prefixes[name[:-len("_bucket")]]].append((bound, value))
+        elif name == "http_requests_total":
+            counts[(labels.get("method", ""), labels.get("route", ""))][labels.get("status", "")] += value
+        elif not labels:
+            gauges[name] = value
+
+    routes = []
+    for (method, route), series in histograms.items():
+        total = series.get("total", [])
+        summary = {
+            "method": method,
+            "route": route,
+            "count": int(max((count for _, count in total), default=0)),
+            "errors": int(counts[(method, route)].get("5xx", 0))
+        }
+        for kind, buckets in series.items():
+            for q in (0.5, 0.95, 0.99):
+                summary[f"{kind}_p{int(q * 100)}_ms"] = round(histogram_quantile(q, buckets) * 1000, 1)
+        routes.append(summary)
+
+    routes.sort(key=lambda r: r["count"], reverse=True)
+    return {"routes": routes, "gauges": gauges}
+
+def scrape_metrics(backend_url: str, token: Optional[str] = None, timeout: float = DEFAULT_BUDGET_SECONDS) -> Dict:
+    """Fetch /api/metrics in Prometheus format and summarize it"""
+    request = urllib.request.Request(f"{backend_url}/api/metrics?format=prometheus")
+    if token:
+        request.add_header("Authorization", f"Bearer {token}")
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return summarize_metrics(response.read().decode(errors="replace"))
+
+def print_performance(summary: Dict, limit: int = 15) -> None:
+    """Table of the busiest routes with their tail latency"""
+    print("⏱️  PERFORMANCE (since backend start):")
+    print("-" * 50)
+    if not summary["routes"]:
+        print("  No requests recorded yet")
+        return
+    print(f"  {'route':<38} {'count':>7} {'p50':>9} {'p95':>9} {'p99':>9} {'db p95':>9} {'app p95':>9} {'5xx':>5}")
+    for route in summary["routes"][:limit]:
+        name = f"{route['method']} {route['route']}"
+        print(f"  {name[:38]:<38} {route['count']:>7} "
+              f"{route.get('total_p50_ms', 0):>7}ms {route.get('total_p95_ms', 0):>7}ms "
+              f"{route.get('total_p99_ms', 0):>7}ms {route.get('db_p95_ms', 0):>7}ms "
+              f"{route.get('handler_p95_ms', 0):>7}ms {route['errors']:>5}")
+    if len(summary["routes"]) > limit:
+        print(f"  ... and {len(summary['routes']) - limit} more route(s)")
+
+    gauges = summary["gauges"]
+    if "process_resident_memory_bytes" in gauges:
+        print(f"  Memory: {gauges['process_resident_memory_bytes'] / 1024 ** 2:.0f} MB RSS, "
+              f"{gauges.get('http_active_requests', 0):.0f} request(s) in flight")
+
+class StatusEngine:
+    """Collects component and service status, cached on disk for a short TTL"""
+
+    def __init__(self, project_root: Path = None, ttl: float = DEFAULT_CACHE_TTL,
+                 budget: float = DEFAULT_BUDGET_SECONDS):
+        self.project_root = Path(project_root) if project_root else Path(__file__).parent
+        self.ttl = ttl
+        self.budget = budget
+        self.cache_path = self.project_root / CACHE_FILE
+        self.backend_url = os.environ.get("BACKEND_URL", DEFAULT_BACKEND_URL)
+        self.frontend_url = os.environ.get("FRONTEND_URL", DEFAULT_FRONTEND_URL)
+        self.mongodb_uri = os.environ.get("MONGODB_URI", DEFAULT_MONGODB_URI)
+
+    def _cached(self) -> Optional[Dict]:
+        cached = _read_json(str(self.cache_path))
+        if cached and time.time() - cached.get("generated_at", 0) < self.ttl:
+            cached["cached"] = True
+            return cached
+        return None
+
+    def collect(self, use_cache: bool = True) -> Dict:
+        """Return the current project status"""
+        if use_cache and self.ttl > 0:
+            cached = self._cached()
+            if cached:
+                return cached
+
+        started = time.perf_counter()
+        services = asyncio.run(probe_services(self.budget, self.backend_url, self.frontend_url, self.mongodb_uri))
+        components = discover_components(self.project_root)
+        status = {
+            "generated_at": time.time(),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            "components": components,
+            "services": services,
+            "cached": False
+        }
+
+        if self.ttl > 0:
+            tmp_path = self.cache_path.with_suffix(".tmp")
+            try:
+                with open(tmp_path, "w") as f:
+                    json.dump(status, f)
+                os.replace(tmp_path, self.cache_path)
+            except OSError:
+                pass
+        return status
+
+def print_report(status: Dict) -> None:
+    """Human-readable status, using the same colours as the other status scripts"""
+    colors = {"up": "\033[0;32m", "degraded": "\033[1;33m", "skipped": "\033[0;34m", "reset": "\033[0m"}
+    icons = {"up": "✅", "degraded": "⚠️ ", "timeout": "⏰", "down": "❌", "skipped": "⏭️ "}
+
+    print("🟢 SERVICES:")
+    print("-" * 50)
+    for service in status["services"]:
+        color = colors.get(service["status"], "\033[0;31m")
+        detail = f"{service.get('latency_ms', '')}ms" if service["status"] == "up" else service.get("error", "")
+        if "reported_status" in service:
+            detail += f" (reports {service['reported_status']})"
+        print(f"  {icons.get(service['status'], '•')} {service['name']:<10} "
+              f"{color}{service['status'].upper():<9}{colors['reset']} {service.get('target', '')} {detail}")
+    print()
+
+    print("📦 COMPONENTS:")
+    print("-" * 50)
+    for component in status["components"]:
+        flags = [
+            "deps ✓" if component["dependencies_installed"] else "deps ✗",
+            "built ✓" if component["built"] else "built ✗"
+        ]
+        print(f"  • {component['name']:<20} {component['type']:<17} {'  '.join(flags)}")
+    print()
+
+    source = "cache" if status.get("cached") else f"live probe in {status['duration_ms']}ms"
+    print(f"  (status from {source})")
+
+def main():
+    parser = argparse.ArgumentParser(description="Observatory Booking App project status")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore cached results")
+    parser.add_argument("--ttl", type=float, default=DEFAULT_CACHE_TTL, help="Cache lifetime in seconds")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET_SECONDS,
+                        help="Maximum seconds to wait for service probes")
+    parser.add_argument("--project-root", help="Project root directory")
+    args = parser.parse_args()
+
+    engine = StatusEngine(args.project_root, ttl=args.ttl, budget=args.budget)
+    status = engine.collect(use_cache=not args.no_cache)
+
+    if args.json:
+        json.dump(status, sys.stdout, indent=2)
+        print()
+    else:
+        print_report(status)
+
+    sys.exit(0 if all(s["status"] in ("up", "skipped") for s in status["services"]) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Observatory Booking App - Incremental Tree Sync
+Mirrors a build directory into another, touching only files that changed
+"""
+
+import errno
+import hashlib
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, Optional
+import logging
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+FICLONE = 0x40049409  # linux/fs.h, reflink a whole file on btrfs/xfs
+HASH_CHUNK_SIZE = 1024 * 1024
+COPY_CHUNK_SIZE = 64 * 1024 * 1024
+
+class SyncStats:
+    """Counters describing what a sync changed"""
+
+    def __init__(self):
+        self.copied = 0
+        self.unchanged = 0
+        self.deleted = 0
+        self.bytes_copied = 0
+        self.methods: Dict[str, int] = {}
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.copied or self.deleted)
+
+    def __str__(self) -> str:
+        methods = ", ".join(f"{name}: {count}" for name, count in sorted(self.methods.items()))
+        return (f"{self.copied} copied, {self.unchanged} unchanged, {self.deleted} deleted, "
+                f"{self.bytes_copied} bytes" + (f" ({methods})" if methods else ""))
+
+def _file_digest(path: Path) -> str:
+    digest = hashlib.blake2b()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _same_content(source: Path, target: Path, source_stat: os.stat_result) -> bool:
+    """Cheap size/mtime comparison first, content hash only when they disagree"""
+    try:
+        target_stat = target.stat()
+    except FileNotFoundError:
+        return False
+    if source_stat.st_size != target_stat.st_size:
+        return False
+    if source_stat.st_mtime_ns == target_stat.st_mtime_ns:
+        return True
+    if _file_digest(source) != _file_digest(target):
+        return False
+    # Content matches, align mtimes so the next sync takes the fast path
+    os.utime(target, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+    return True
+
+def _clone_or_copy(source: Path, target: Path) -> str:
+    """Copy file data in the kernel where possible: reflink, then copy_file_range"""
+    with open(source, "rb") as src, open(target, "wb") as dst:
+        if fcntl is not None:
+            try:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+                return "reflink"
+            except OSError:
+                pass
+
+        if hasattr(os, "copy_file_range"):
+            try:
+                while os.copy_file_range(src.fileno(), dst.fileno(), COPY_CHUNK_SIZE):
+                    pass
+                return "copy_file_range"
+            except OSError as e:
+                if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+                    raise
+                src.seek(0)
+                dst.seek(0)
+                dst.truncate()
+
+        shutil.copyfileobj(src, dst, COPY_CHUNK_SIZE)
+        return "copy"
+
+def _install_file(source: Path, target: Path, hardlink: bool) -> str:
+    """Place source at target atomically, so readers never see a partial file"""
+    tmp_path = target.with_name(f".{target.name}.sync-tmp")
+    tmp_path.unlink(missing_ok=True)
+
+    method = None
+    if hardlink:
+        try:
+            os.link(source, tmp_path)
+            method = "hardlink"
+        except OSError:
+            pass
+
+    if method is None:
+        method = _clone_or_copy(source, tmp_path)
+        shutil.copystat(source, tmp_path)
+
+    os.replace(tmp_path, target)
+    return method
+
+def sync_tree(source: Path, target: Path, hardlink: bool = False, stats: Optional[SyncStats] = None) -> SyncStats:
+    """Make target an exact mirror of source, copying only files that differ"""
+    stats = stats or SyncStats()
+    source = Path(source)
+    target = Path(target)
+    target.mkdir(parents=True, exist_ok=True)
+
+    with os.scandir(source) as it:
+        source_entries = {entry.name: entry for entry in it}
+
+    with os.scandir(target) as it:
+        for entry in it:
+            source_entry = source_entries.get(entry.name)
+            stale = (
+                source_entry is None
+                or source_entry.is_dir(follow_symlinks=False) != entry.is_dir(follow_symlinks=False)
+            )
+            if not stale:
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                shutil.rmtree(entry.path)
+            else:
+                os.unlink(entry.path)
+            stats.deleted += 1
+
+    for name, entry in sorted(source_entries.items()):
+        target_path = target / name
+        if entry.is_dir(follow_symlinks=False):
+            sync_tree(Path(entry.path), target_path, hardlink, stats)
+            continue
+
+        source_stat = entry.stat()
+        if _same_content(Path(entry.path), target_path, source_stat):
+            stats.unchanged += 1
+            continue
+
+        method = _install_file(Path(entry.path), target_path, hardlink)
+        stats.copied += 1
+        stats.bytes_copied += source_stat.st_size
+        stats.methods[method] = stats.methods.get(method, 0) + 1
+        logger.debug(f"Synced {target_path} via {method}")
+
+    return stats
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Observatory Booking App - WordPress Plugin Packager
+Builds a byte-reproducible plugin zip without shelling out to cp or zip
+"""
+
+import hashlib
+import os
+import re
+import shutil
+import zipfile
+from pathlib import Path
+from typing import List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+PLUGIN_ENTRIES = [
+    "observatory-booking.php",
+    "assets/",
+    "README.txt"
+]
+EXCLUDED_NAMES = {".git", ".gitignore", "node_modules", ".DS_Store"}
+STORED_EXTENSIONS = {
+    ".png", ".jpg", ".jpeg", ".gif", ".webp", ".ico",
+    ".woff", ".woff2", ".zip", ".gz", ".mp3", ".mp4"
+}
+FIXED_TIMESTAMP = (1980, 1, 1, 0, 0, 0)
+HASH_CHUNK_SIZE = 1024 * 1024
+VERSION_PATTERN = re.compile(r"^\s*\*?\s*Version:\s*(\S+)", re.MULTILINE)
+
+class WordPressPackager:
+    """Packages wordpress-plugin/ into dist/ as a deterministic zip"""
+
+    def __init__(self, plugin_dir: Path, dist_dir: Path, main_file: str = "observatory-booking.php"):
+        self.plugin_dir = Path(plugin_dir)
+        self.dist_dir = Path(dist_dir)
+        self.main_file = main_file
+
+    def read_version(self) -> str:
+        """Version from the plugin header, so the zip name never drifts from the plugin"""
+        with open(self.plugin_dir / self.main_file, encoding="utf-8") as f:
+            match = VERSION_PATTERN.search(f.read(8192))
+        return match.group(1) if match else "0.0.0"
+
+    def collect_files(self) -> List[Tuple[str, Path]]:
+        """All files to package as sorted (archive name, path) pairs"""
+        files = []
+        for entry in PLUGIN_ENTRIES:
+            source = self.plugin_dir / entry
+            if source.is_file():
+                files.append((source.relative_to(self.plugin_dir).as_posix(), source))
+            elif source.is_dir():
+                for root, dirs, names in os.walk(source):
+                    dirs[:] = [d for d in dirs if d not in EXCLUDED_NAMES]
+                    for name in names:
+                        if name in EXCLUDED_NAMES:
+                            continue
+                        path = Path(root) / name
+                        files.append((path.relative_to(self.plugin_dir).as_posix(), path))
+        return sorted(files)
+
+    def content_digest(self, version: str, files: List[Tuple[str, Path]]) -> str:
+        digest = hashlib.sha256(version.encode())
+        for arcname, path in files:
+            digest.update(arcname.encode())
+            digest.update(b"\0")
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                    digest.update(chunk)
+        return digest.hexdigest()
+
+    def build(self) -> Optional[Path]:
+        """Write the plugin zip, reusing the previous artifact when nothing changed"""
+        if not (self.plugin_dir / self.main_file).exists():
+            logger.error(f"❌ Plugin entry point not found: {self.plugin_dir / self.main_file}")
+            return None
+
+        version = self.read_version()
+        files = self.collect_files()
+        digest = self.content_digest(version, files)
+
+        zip_path = self.dist_dir / f"observatory-booking-plugin-v{version}.zip"
+        digest_path = zip_path.with_name(zip_path.name + ".sha256")
+        if zip_path.exists() and digest_path.exists() and digest_path.read_text().strip() == digest:
+            logger.info(f"⏭️  WordPress package unchanged: {zip_path.name}")
+            return zip_path
+
+        self.dist_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = zip_path.with_suffix(".zip.tmp")
+        with zipfile.ZipFile(tmp_path, "w") as archive:
+            for arcname, path in files:
+                info = zipfile.ZipInfo(arcname, date_time=FIXED_TIMESTAMP)
+                info.external_attr = 0o100644 << 16
+                info.create_system = 3  # Unix, regardless of the build host
+                if path.suffix.lower() in STORED_EXTENSIONS:
+                    info.compress_type = zipfile.ZIP_STORED
+                else:
+                    info.compress_type = zipfile.ZIP_DEFLATED
+                with open(path, "rb") as src, archive.open(info, "w") as dst:
+                    shutil.copyfileobj(src, dst, HASH_CHUNK_SIZE)
+        os.replace(tmp_path, zip_path)
+        digest_path.write_text(digest + "\n")
+
+        logger.info(f"✅ WordPress package created: {zip_path} ({len(files)} files)")
+        return zip_path